@@ -0,0 +1,39 @@
+"""Add approvals (approver_id, decision_date DESC) index
+
+Revision ID: add_approvals_decision_idx
+Revises: add_effective_access
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_approvals_decision_idx'
+down_revision = 'add_effective_access'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # NULLS LAST matches the /my-decisions ORDER BY, so the first page is read
+    # from the front of the index
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_approvals_approver_decision_date',
+            'approvals',
+            ['approver_id', 'decision_date'],
+            postgresql_ops={'decision_date': 'DESC NULLS LAST'},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_approvals_approver_decision_date',
+            table_name='approvals',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,37 @@
+"""Add approvals (approver_id, status, request_id) index
+
+Revision ID: add_approvals_inbox_idx
+Revises: add_request_number_seq
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_approvals_inbox_idx'
+down_revision = 'add_request_number_seq'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_approvals_approver_status_request',
+            'approvals',
+            ['approver_id', 'status', 'request_id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_approvals_approver_status_request',
+            table_name='approvals',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
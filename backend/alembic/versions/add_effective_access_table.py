@@ -0,0 +1,60 @@
+"""Add effective access table
+
+Revision ID: add_effective_access
+Revises: add_recommendation_tables
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_effective_access'
+down_revision = 'add_recommendation_tables'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'effective_access',
+        sa.Column('request_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('system_id', sa.Integer(), nullable=False),
+        sa.Column('subsystem_id', sa.Integer(), nullable=True),
+        sa.Column('access_role_id', sa.Integer(), nullable=False),
+        sa.Column('request_number', sa.String(50), nullable=False),
+        sa.Column('status', postgresql.ENUM(name='requeststatus', create_type=False), nullable=False),
+        sa.Column('is_temporary', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('valid_from', sa.Date(), nullable=True),
+        sa.Column('valid_until', sa.Date(), nullable=True),
+        sa.Column('granted_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('request_id'),
+        sa.ForeignKeyConstraint(['request_id'], ['access_requests.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['system_id'], ['systems.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['subsystem_id'], ['subsystems.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['access_role_id'], ['access_roles.id'], ondelete='CASCADE'),
+    )
+    op.create_index('ix_effective_access_user_request', 'effective_access', ['user_id', 'request_id'])
+    op.create_index('ix_effective_access_system_user', 'effective_access', ['system_id', 'user_id'])
+
+    # Backfill from existing data
+    op.execute("""
+        INSERT INTO effective_access (
+            request_id, user_id, system_id, subsystem_id, access_role_id, request_number,
+            status, is_temporary, valid_from, valid_until, granted_at
+        )
+        SELECT id, target_user_id, system_id, subsystem_id, access_role_id, request_number,
+               status, is_temporary, valid_from, valid_until, coalesce(completed_at, created_at)
+        FROM access_requests
+        WHERE status IN ('APPROVED', 'IMPLEMENTED')
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_effective_access_system_user', table_name='effective_access')
+    op.drop_index('ix_effective_access_user_request', table_name='effective_access')
+    op.drop_table('effective_access')
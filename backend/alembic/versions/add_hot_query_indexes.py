@@ -0,0 +1,55 @@
+"""Add composite and partial indexes for hot query shapes
+
+Revision ID: add_hot_query_indexes
+Revises: add_approvals_inbox_idx
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_hot_query_indexes'
+down_revision = 'add_approvals_inbox_idx'
+branch_labels = None
+depends_on = None
+
+
+# (name, table, columns, partial index predicate)
+INDEXES = [
+    # SoD existing-role checks, effective roles, user access report
+    ('ix_access_requests_target_user_status', 'access_requests', ['target_user_id', 'status'], None),
+    # /requests/my-requests ordered by (created_at, id)
+    ('ix_access_requests_requester_created', 'access_requests', ['requester_id', 'created_at', 'id'], None),
+    # Expiry and revocation jobs (temporary grants only)
+    ('ix_access_requests_temporary_expiry', 'access_requests', ['status', 'valid_until'], 'is_temporary'),
+    # Request detail approvals, decide/next-step lookups
+    ('ix_approvals_request_approver_status', 'approvals', ['request_id', 'approver_id', 'status'], None),
+    # Admin audit log listing ordered by (created_at, id)
+    ('ix_audit_logs_created_id', 'audit_logs', ['created_at', 'id'], None),
+    # Request history; cascade deletes from access_requests
+    ('ix_audit_logs_request_id', 'audit_logs', ['request_id'], None),
+    # SoD conflict lookups from either side; cascade deletes from access_roles
+    ('ix_sod_conflicts_role_a_id', 'sod_conflicts', ['role_a_id'], None),
+    ('ix_sod_conflicts_role_b_id', 'sod_conflicts', ['role_b_id'], None),
+]
+
+
+def upgrade():
+    # CONCURRENTLY avoids locking writes on large tables; it cannot run in a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+    op.execute("ANALYZE access_requests, approvals, audit_logs, sod_conflicts")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
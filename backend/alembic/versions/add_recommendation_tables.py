@@ -0,0 +1,62 @@
+"""Add recommendation frequency tables
+
+Revision ID: add_recommendation_tables
+Revises: add_request_number_prefix_idx
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_recommendation_tables'
+down_revision = 'add_request_number_prefix_idx'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'recommendation_department_system',
+        sa.Column('department', sa.String(255), nullable=False),
+        sa.Column('system_id', sa.Integer(), nullable=False),
+        sa.Column('request_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('department', 'system_id'),
+        sa.ForeignKeyConstraint(['system_id'], ['systems.id'], ondelete='CASCADE'),
+    )
+    op.create_table(
+        'recommendation_position_role',
+        sa.Column('position', sa.String(255), nullable=False),
+        sa.Column('system_id', sa.Integer(), nullable=False),
+        sa.Column('access_role_id', sa.Integer(), nullable=False),
+        sa.Column('request_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('position', 'system_id', 'access_role_id'),
+        sa.ForeignKeyConstraint(['system_id'], ['systems.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['access_role_id'], ['access_roles.id'], ondelete='CASCADE'),
+    )
+    op.create_table(
+        'recommendation_popular_system',
+        sa.Column('system_id', sa.Integer(), nullable=False),
+        sa.Column('request_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('system_id'),
+        sa.ForeignKeyConstraint(['system_id'], ['systems.id'], ondelete='CASCADE'),
+    )
+    op.create_index('ix_recommendation_popular_system_count', 'recommendation_popular_system', ['request_count'])
+    op.create_table(
+        'recommendation_popular_role',
+        sa.Column('system_id', sa.Integer(), nullable=False),
+        sa.Column('access_role_id', sa.Integer(), nullable=False),
+        sa.Column('request_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('system_id', 'access_role_id'),
+        sa.ForeignKeyConstraint(['system_id'], ['systems.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['access_role_id'], ['access_roles.id'], ondelete='CASCADE'),
+    )
+
+
+def downgrade():
+    op.drop_table('recommendation_popular_role')
+    op.drop_index('ix_recommendation_popular_system_count', table_name='recommendation_popular_system')
+    op.drop_table('recommendation_popular_system')
+    op.drop_table('recommendation_position_role')
+    op.drop_table('recommendation_department_system')
@@ -0,0 +1,39 @@
+"""Add text_pattern_ops index for request number prefix lookups
+
+Revision ID: add_request_number_prefix_idx
+Revises: add_search_trgm_indexes
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_request_number_prefix_idx'
+down_revision = 'add_search_trgm_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The unique index on request_number follows the database collation and
+    # cannot serve LIKE 'prefix%' unless the collation is C
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_access_requests_request_number_prefix',
+            'access_requests',
+            ['request_number'],
+            postgresql_ops={'request_number': 'text_pattern_ops'},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_access_requests_request_number_prefix',
+            table_name='access_requests',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,38 @@
+"""Add per-year request number sequences
+
+Revision ID: add_request_number_seq
+Revises: add_status_counters
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_request_number_seq'
+down_revision = 'add_status_counters'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'request_number_sequences',
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('last_value', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('year'),
+    )
+
+    # Continue numbering after the highest existing REQ-YYYY-NNNNN per year
+    op.execute("""
+        INSERT INTO request_number_sequences (year, last_value)
+        SELECT split_part(request_number, '-', 2)::int, max(split_part(request_number, '-', 3)::int)
+        FROM access_requests
+        WHERE request_number ~ '^REQ-[0-9]{4}-[0-9]+$'
+        GROUP BY 1
+    """)
+
+
+def downgrade():
+    op.drop_table('request_number_sequences')
@@ -0,0 +1,97 @@
+"""Add dashboard summary tables
+
+Revision ID: add_request_stats
+Revises: add_ad_fields
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_request_stats'
+down_revision = 'add_ad_fields'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    request_status = postgresql.ENUM(name='requeststatus', create_type=False)
+
+    op.create_table(
+        'request_stats_monthly',
+        sa.Column('month', sa.String(7), nullable=False),
+        sa.Column('status', request_status, nullable=False),
+        sa.Column('request_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('month', 'status'),
+    )
+    op.create_table(
+        'request_stats_system',
+        sa.Column('system_id', sa.Integer(), nullable=False),
+        sa.Column('status', request_status, nullable=False),
+        sa.Column('request_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('system_id', 'status'),
+        sa.ForeignKeyConstraint(['system_id'], ['systems.id'], ondelete='CASCADE'),
+    )
+    op.create_table(
+        'request_stats_requester',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('request_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('user_id'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    )
+    op.create_index('ix_request_stats_requester_count', 'request_stats_requester', ['request_count'])
+    op.create_table(
+        'approval_stats_monthly',
+        sa.Column('month', sa.String(7), nullable=False),
+        sa.Column('approved_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('timed_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_hours', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('min_hours', sa.Float(), nullable=True),
+        sa.Column('max_hours', sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint('month'),
+    )
+
+    # Backfill from existing data
+    op.execute("""
+        INSERT INTO request_stats_monthly (month, status, request_count)
+        SELECT to_char(timezone('UTC', created_at), 'YYYY-MM'), status, count(*)
+        FROM access_requests
+        GROUP BY 1, 2
+    """)
+    op.execute("""
+        INSERT INTO request_stats_system (system_id, status, request_count)
+        SELECT system_id, status, count(*)
+        FROM access_requests
+        GROUP BY 1, 2
+    """)
+    op.execute("""
+        INSERT INTO request_stats_requester (user_id, request_count)
+        SELECT requester_id, count(*)
+        FROM access_requests
+        WHERE requester_id IS NOT NULL
+        GROUP BY 1
+    """)
+    op.execute("""
+        INSERT INTO approval_stats_monthly (month, approved_count, timed_count, total_hours, min_hours, max_hours)
+        SELECT month, count(*), count(hours), coalesce(sum(hours), 0), min(hours), max(hours)
+        FROM (
+            SELECT to_char(timezone('UTC', a.decision_date), 'YYYY-MM') AS month,
+                   CASE WHEN extract(epoch FROM a.decision_date - r.submitted_at) > 0
+                        THEN extract(epoch FROM a.decision_date - r.submitted_at) / 3600 END AS hours
+            FROM approvals a
+            LEFT JOIN access_requests r ON r.id = a.request_id
+            WHERE a.status = 'APPROVED' AND a.decision_date IS NOT NULL
+        ) t
+        GROUP BY month
+    """)
+
+
+def downgrade():
+    op.drop_table('approval_stats_monthly')
+    op.drop_index('ix_request_stats_requester_count', table_name='request_stats_requester')
+    op.drop_table('request_stats_requester')
+    op.drop_table('request_stats_system')
+    op.drop_table('request_stats_monthly')
@@ -0,0 +1,38 @@
+"""Add request status counters
+
+Revision ID: add_status_counters
+Revises: add_request_stats
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_status_counters'
+down_revision = 'add_request_stats'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'request_status_counters',
+        sa.Column('status', postgresql.ENUM(name='requeststatus', create_type=False), nullable=False),
+        sa.Column('request_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('status'),
+    )
+
+    # Backfill from existing data
+    op.execute("""
+        INSERT INTO request_status_counters (status, request_count)
+        SELECT status, count(*)
+        FROM access_requests
+        GROUP BY status
+    """)
+
+
+def downgrade():
+    op.drop_table('request_status_counters')
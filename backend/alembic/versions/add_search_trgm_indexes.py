@@ -0,0 +1,54 @@
+"""Add pg_trgm indexes for request search
+
+Revision ID: add_search_trgm_indexes
+Revises: add_hot_query_indexes
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_search_trgm_indexes'
+down_revision = 'add_hot_query_indexes'
+branch_labels = None
+depends_on = None
+
+
+# (name, table, column)
+TRGM_INDEXES = [
+    ('ix_access_requests_request_number_trgm', 'access_requests', 'request_number'),
+    ('ix_access_requests_purpose_trgm', 'access_requests', 'purpose'),
+    ('ix_systems_name_trgm', 'systems', 'name'),
+    ('ix_subsystems_name_trgm', 'subsystems', 'name'),
+    ('ix_users_full_name_trgm', 'users', 'full_name'),
+]
+
+# Foreign keys the search joins from matched systems/subsystems
+FK_INDEXES = [
+    ('ix_access_requests_system_id', 'access_requests', 'system_id'),
+    ('ix_access_requests_subsystem_id', 'access_requests', 'subsystem_id'),
+]
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        for name, table, column in TRGM_INDEXES:
+            op.create_index(
+                name, table, [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        for name, table, column in FK_INDEXES:
+            op.create_index(name, table, [column], postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, column in FK_INDEXES + TRGM_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    # The pg_trgm extension is left installed
@@ -1,8 +1,10 @@
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from app.db.session import get_db, async_session
 from app.core.security import decode_token
+from app.core.principal_cache import principal_cache, build_principal, attach_user, snapshot_user
 from app.models import User
 from typing import Optional
 
@@ -11,10 +13,16 @@ security = HTTPBearer(auto_error=False)
 
 async def get_current_user(
     request: Request,
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db)
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
 ) -> User:
-    """Get current authenticated user from cookie or Authorization header"""
+    """Get current authenticated user from cookie or Authorization header.
+
+    Opens no request-scoped session: on a principal cache miss the user is
+    loaded through a short-lived async session whose connection is returned
+    to the pool right away. The returned User is a detached snapshot (column
+    values only); endpoints that change the user or read its relationships
+    use get_current_db_user.
+    """
     # Try to get token from httpOnly cookie first
     token = request.cookies.get("access_token")
 
@@ -44,20 +52,39 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
         )
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
-    
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Inactive user",
-        )
-    
-    return user
+    iat = payload.get("iat")
+
+    principal = principal_cache.get(user_id, iat)
+    if principal is None:
+        async with async_session() as auth_db:
+            user = (await auth_db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
+            if user is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found",
+                )
+
+            if not user.is_active:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Inactive user",
+                )
+
+            principal = await auth_db.run_sync(build_principal, user, iat)
+        principal_cache.set(principal)
+
+    request.state.principal = principal
+    return snapshot_user(principal)
+
+
+async def get_current_db_user(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> User:
+    """Current user attached to the request's sync session (no query), for
+    endpoints that update the user or read its relationships"""
+    return attach_user(db, request.state.principal)
 
 
 async def get_current_superuser(
@@ -99,26 +126,11 @@ async def get_admin_writer(
 def check_permission(resource: str, action: str):
     """Check if user has specific permission"""
     async def permission_checker(
-        current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        request: Request,
+        current_user: User = Depends(get_current_user)
     ) -> User:
-        # Superuser has all permissions
-        if current_user.is_superuser:
-            return current_user
-        
-        # Check user's roles and permissions
-        from app.models import Permission
-        
-        has_permission = False
-        for role in current_user.roles:
-            for permission in role.permissions:
-                if permission.resource == resource and permission.action == action:
-                    has_permission = True
-                    break
-            if has_permission:
-                break
-        
-        if not has_permission:
+        # Superuser has all permissions; others are checked against the cached principal
+        if not request.state.principal.has_permission(resource, action):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Permission denied: {resource}:{action}",
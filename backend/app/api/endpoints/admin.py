@@ -1,12 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session, joinedload
-from typing import List
+from typing import List, Optional
 from datetime import date
 from app.db.session import get_db
 from app.schemas.user import RoleCreate, RoleUpdate, RoleResponse, PermissionResponse
 from app.models import Role, Permission, User, AuditLog, AccessRequest
 from app.models.request import RequestStatus
 from app.api.deps import get_current_superuser, get_admin_reader, get_admin_writer
+from app.core.permission_index import permission_index
+from app.services.audit_export import (
+    EXPORT_FORMATS, EXPORT_FORMAT_PATTERN, audit_log_filters, stream_audit_logs
+)
+from app.core.pagination import (
+    TOTAL_MODE_PATTERN, keyset_after, next_cursor, resolve_total_mode, count_total
+)
 
 router = APIRouter()
 
@@ -49,6 +56,7 @@ async def create_role(
     db.add(role)
     db.commit()
     db.refresh(role)
+    permission_index.reload(db)
     return role
 
 
@@ -90,6 +98,7 @@ async def update_role(
 
     db.commit()
     db.refresh(role)
+    permission_index.reload(db)
     return role
 
 
@@ -118,6 +127,7 @@ async def delete_role(
 
     db.delete(role)
     db.commit()
+    permission_index.reload(db)
 
     return {"message": "Role deleted successfully"}
 
@@ -142,55 +152,47 @@ async def get_audit_logs(
     date_from: str = None,
     date_to: str = None,
     search: str = None,
+    cursor: Optional[str] = None,
+    total: Optional[str] = Query(None, pattern=TOTAL_MODE_PATTERN),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_admin_reader)
 ):
-    """Get audit logs with full details and filters"""
-    from datetime import datetime
+    """Get audit logs with full details and filters.
 
+    Pass next_cursor back as cursor for the following page; skip is kept
+    for old clients. total: exact | estimate | none (default: exact on the
+    first page, none when paging by cursor).
+    """
     query = db.query(AuditLog).options(
         joinedload(AuditLog.user),
         joinedload(AuditLog.request).joinedload(AccessRequest.system),
         joinedload(AuditLog.request).joinedload(AccessRequest.target_user)
-    )
-
-    # Apply filters
-    if user_id:
-        query = query.filter(AuditLog.user_id == user_id)
-
-    if action:
-        query = query.filter(AuditLog.action == action)
-
-    if request_id:
-        query = query.filter(AuditLog.request_id == request_id)
-
-    if date_from:
-        try:
-            from_date = datetime.fromisoformat(date_from.replace('Z', '+00:00'))
-            query = query.filter(AuditLog.created_at >= from_date)
-        except ValueError:
-            pass
+    ).filter(*audit_log_filters(
+        user_id=user_id,
+        action=action,
+        request_id=request_id,
+        date_from=date_from,
+        date_to=date_to,
+        search=search,
+    ))
+
+    # Total over the filtered set, before the keyset condition
+    total_count = count_total(db, query, resolve_total_mode(total, cursor))
+
+    if cursor:
+        query = query.filter(keyset_after((AuditLog.created_at, AuditLog.id), cursor))
+    elif skip:
+        query = query.offset(skip)
 
-    if date_to:
-        try:
-            to_date = datetime.fromisoformat(date_to.replace('Z', '+00:00'))
-            query = query.filter(AuditLog.created_at <= to_date)
-        except ValueError:
-            pass
-
-    if search:
-        search_pattern = f"%{search}%"
-        query = query.filter(AuditLog.details.ilike(search_pattern))
-
-    # Get total count for pagination
-    total = query.count()
-
-    # Apply ordering and pagination
     logs = query.order_by(
-        AuditLog.created_at.desc()
-    ).offset(skip).limit(limit).all()
+        AuditLog.created_at.desc(), AuditLog.id.desc()
+    ).limit(limit).all()
 
-    return {"logs": logs, "total": total}
+    return {
+        "logs": logs,
+        "total": total_count,
+        "next_cursor": next_cursor(logs, limit, lambda log: (log.created_at, log.id)),
+    }
 
 
 @router.get("/audit-logs/actions")
@@ -234,65 +236,34 @@ async def export_audit_logs(
     date_from: str = None,
     date_to: str = None,
     search: str = None,
-    format: str = "csv",
-    db: Session = Depends(get_db),
+    format: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN),
+    gzip: bool = False,
     current_user: User = Depends(get_admin_reader)
 ):
-    """Export audit logs to CSV"""
-    from datetime import datetime
+    """Export audit logs as CSV or NDJSON (streamed, optionally gzip-compressed)"""
     from fastapi.responses import StreamingResponse
-    import io
-    import csv
 
-    query = db.query(AuditLog).options(
-        joinedload(AuditLog.user),
-        joinedload(AuditLog.request)
+    body = stream_audit_logs(
+        format=format,
+        compress=gzip,
+        user_id=user_id,
+        action=action,
+        request_id=request_id,
+        date_from=date_from,
+        date_to=date_to,
+        search=search,
     )
 
-    # Apply same filters as list
-    if user_id:
-        query = query.filter(AuditLog.user_id == user_id)
-    if action:
-        query = query.filter(AuditLog.action == action)
-    if request_id:
-        query = query.filter(AuditLog.request_id == request_id)
-    if date_from:
-        try:
-            from_date = datetime.fromisoformat(date_from.replace('Z', '+00:00'))
-            query = query.filter(AuditLog.created_at >= from_date)
-        except ValueError:
-            pass
-    if date_to:
-        try:
-            to_date = datetime.fromisoformat(date_to.replace('Z', '+00:00'))
-            query = query.filter(AuditLog.created_at <= to_date)
-        except ValueError:
-            pass
-    if search:
-        query = query.filter(AuditLog.details.ilike(f"%{search}%"))
-
-    logs = query.order_by(AuditLog.created_at.desc()).limit(10000).all()
-
-    # Generate CSV
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(['Date', 'User', 'Action', 'Details', 'Request ID', 'IP Address'])
-
-    for log in logs:
-        writer.writerow([
-            log.created_at.isoformat() if log.created_at else '',
-            log.user.full_name if log.user else 'System',
-            log.action,
-            log.details or '',
-            log.request_id or '',
-            log.ip_address or ''
-        ])
-
-    output.seek(0)
+    filename = f"audit_logs.{format}"
+    media_type = EXPORT_FORMATS[format]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+
     return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=audit_logs.csv"}
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
 
 
@@ -852,6 +823,20 @@ async def clear_ldap_cache(
     }
 
 
+@router.get("/metrics/db-pool")
+async def get_db_pool_metrics(
+    current_user: User = Depends(get_current_superuser)
+):
+    """Get database connection pool metrics of the worker serving this request.
+
+    Per-worker only: each call may land on a different gunicorn worker.
+    The idm_db_pool_* series of /api/metrics cover all workers.
+    """
+    from app.db.pool_metrics import get_pool_stats
+
+    return get_pool_stats()
+
+
 # ============== DEMO USERS ==============
 
 @router.get("/demo-users")
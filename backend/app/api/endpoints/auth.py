@@ -12,7 +12,7 @@ limiter = Limiter(key_func=get_remote_address)
 from app.schemas.user import LoginRequest, Token, UserResponse
 from app.models import User
 from app.core.security import verify_password, create_access_token, create_refresh_token, get_password_hash
-from app.api.deps import get_current_user
+from app.api.deps import get_current_db_user
 from app.core.config import settings
 from app.core.ldap_auth import ldap_service
 from pydantic import BaseModel
@@ -435,7 +435,7 @@ async def refresh_token_endpoint(
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_db_user)
 ):
     """Get current user information"""
     return current_user
@@ -1,13 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, UploadFile, File, Form
 from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select, func, and_, or_
+from sqlalchemy.orm import Session, joinedload, aliased
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime, timezone
 import os
 import uuid
 import shutil
 import logging
-from app.db.session import get_db
+from app.db.session import get_db, get_async_db
 
 logger = logging.getLogger(__name__)
 from app.schemas.request import (
@@ -26,6 +28,16 @@ from app.models import (
 )
 from app.api.deps import get_current_user
 from app.core.constants import ApproverRoles
+from app.core.pagination import NEXT_CURSOR_HEADER, keyset_after, next_cursor
+from app.services.request_numbers import allocate_request_numbers
+from app.services.request_search import escape_like, request_match_scores
+from app.services.autocomplete import autocomplete_index
+from app.services.recommendations import recommend_systems, recommend_roles
+from app.services.request_stats import (
+    get_status_totals, get_dashboard_aggregates,
+    record_requests_created, record_status_change, record_approval_decision
+)
+from app.services.effective_access import record_access_change
 
 # Configuration for file uploads
 UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), "uploads", "attachments")
@@ -49,241 +61,33 @@ async def get_recommendations(
 
     Algorithm uses 3 signals:
     1. User's past approved requests (weight 40%)
-    2. Colleagues from same department/position (weight 35%)
+    2. Colleagues from same department (systems) / position (roles) (weight 35%)
     3. Popular systems/roles in organization over 3 months (weight 25%)
-    """
-    from sqlalchemy import func, and_, or_
-    from datetime import datetime, timedelta
-    from app.models.system import System, AccessRole
 
+    Signals 2 and 3 are read from precomputed frequency tables
+    (see app.services.recommendations).
+    """
     user_id = target_user_id or current_user.id
     user = db.query(User).filter(User.id == user_id).first()
 
     if not user:
         return RecommendationsResponse(recommended_systems=[], recommended_roles=[])
 
-    recommended_systems = []
-    recommended_roles = []
-
-    # Time window for popularity: last 3 months
-    three_months_ago = datetime.now() - timedelta(days=90)
-
     if not system_id:
-        # ===== RECOMMEND SYSTEMS =====
-        system_scores = {}  # {system_id: {'score': float, 'reasons': []}}
-
-        # Signal 1: User's past approved requests (40%)
-        user_approved_requests = db.query(
-            AccessRequest.system_id,
-            func.count(AccessRequest.id).label('count')
-        ).filter(
-            AccessRequest.target_user_id == user_id,
-            AccessRequest.status.in_([RequestStatus.APPROVED, RequestStatus.IMPLEMENTED])
-        ).group_by(AccessRequest.system_id).all()
-
-        max_user_count = max([r.count for r in user_approved_requests], default=1)
-        for req in user_approved_requests:
-            if req.system_id not in system_scores:
-                system_scores[req.system_id] = {'score': 0, 'reasons': []}
-            normalized_score = (req.count / max_user_count) * 40
-            system_scores[req.system_id]['score'] += normalized_score
-            system_scores[req.system_id]['reasons'].append('user_history')
-
-        # Signal 2: Colleagues from same department (35%)
-        if user.department:
-            colleague_requests = db.query(
-                AccessRequest.system_id,
-                func.count(AccessRequest.id).label('count')
-            ).join(
-                User, User.id == AccessRequest.target_user_id
-            ).filter(
-                User.department == user.department,
-                User.id != user_id,
-                AccessRequest.status.in_([RequestStatus.APPROVED, RequestStatus.IMPLEMENTED]),
-                AccessRequest.created_at >= three_months_ago
-            ).group_by(AccessRequest.system_id).all()
-
-            max_colleague_count = max([r.count for r in colleague_requests], default=1)
-            for req in colleague_requests:
-                if req.system_id not in system_scores:
-                    system_scores[req.system_id] = {'score': 0, 'reasons': []}
-                normalized_score = (req.count / max_colleague_count) * 35
-                system_scores[req.system_id]['score'] += normalized_score
-                system_scores[req.system_id]['reasons'].append('department')
-
-        # Signal 3: Popular systems in organization (25%)
-        popular_systems = db.query(
-            AccessRequest.system_id,
-            func.count(AccessRequest.id).label('count')
-        ).filter(
-            AccessRequest.status.in_([RequestStatus.APPROVED, RequestStatus.IMPLEMENTED]),
-            AccessRequest.created_at >= three_months_ago
-        ).group_by(AccessRequest.system_id).order_by(func.count(AccessRequest.id).desc()).limit(10).all()
-
-        max_popular_count = max([r.count for r in popular_systems], default=1)
-        for req in popular_systems:
-            if req.system_id not in system_scores:
-                system_scores[req.system_id] = {'score': 0, 'reasons': []}
-            normalized_score = (req.count / max_popular_count) * 25
-            system_scores[req.system_id]['score'] += normalized_score
-            system_scores[req.system_id]['reasons'].append('popular')
-
-        # Get system details and build response
-        if system_scores:
-            systems_list = db.query(System).filter(
-                System.id.in_(list(system_scores.keys())),
-                System.is_active == True
-            ).all()
-
-            for sys in systems_list:
-                data = system_scores[sys.id]
-                # Determine primary reason
-                reasons = data['reasons']
-                if 'user_history' in reasons:
-                    reason = "На основе ваших заявок"
-                elif 'department' in reasons:
-                    reason = "Популярно в вашем отделе"
-                else:
-                    reason = "Популярно в организации"
-
-                recommended_systems.append(SystemRecommendation(
-                    system_id=sys.id,
-                    system_name=sys.name,
-                    system_code=sys.code,
-                    score=round(data['score'], 1),
-                    reason=reason
-                ))
-
-            # Sort by score descending and limit to top 5
-            recommended_systems.sort(key=lambda x: x.score, reverse=True)
-            recommended_systems = recommended_systems[:5]
-
-    else:
-        # ===== RECOMMEND ROLES FOR SELECTED SYSTEM =====
-        role_scores = {}  # {role_id: {'score': float, 'reasons': []}}
-
-        # Signal 1: User's past role choices for this system (45%)
-        user_role_requests = db.query(
-            AccessRequest.access_role_id,
-            func.count(AccessRequest.id).label('count')
-        ).filter(
-            AccessRequest.target_user_id == user_id,
-            AccessRequest.system_id == system_id,
-            AccessRequest.status.in_([RequestStatus.APPROVED, RequestStatus.IMPLEMENTED])
-        ).group_by(AccessRequest.access_role_id).all()
-
-        max_user_role_count = max([r.count for r in user_role_requests], default=1)
-        for req in user_role_requests:
-            if req.access_role_id not in role_scores:
-                role_scores[req.access_role_id] = {'score': 0, 'reasons': []}
-            normalized_score = (req.count / max_user_role_count) * 45
-            role_scores[req.access_role_id]['score'] += normalized_score
-            role_scores[req.access_role_id]['reasons'].append('user_history')
-
-        # Signal 2: Colleagues' role choices for this system (35%)
-        if user.department:
-            colleague_role_requests = db.query(
-                AccessRequest.access_role_id,
-                func.count(AccessRequest.id).label('count')
-            ).join(
-                User, User.id == AccessRequest.target_user_id
-            ).filter(
-                User.department == user.department,
-                User.id != user_id,
-                AccessRequest.system_id == system_id,
-                AccessRequest.status.in_([RequestStatus.APPROVED, RequestStatus.IMPLEMENTED]),
-                AccessRequest.created_at >= three_months_ago
-            ).group_by(AccessRequest.access_role_id).all()
-
-            max_colleague_role_count = max([r.count for r in colleague_role_requests], default=1)
-            for req in colleague_role_requests:
-                if req.access_role_id not in role_scores:
-                    role_scores[req.access_role_id] = {'score': 0, 'reasons': []}
-                normalized_score = (req.count / max_colleague_role_count) * 35
-                role_scores[req.access_role_id]['score'] += normalized_score
-                role_scores[req.access_role_id]['reasons'].append('department')
-
-        # Signal 3: Popular roles for this system (20%)
-        popular_roles = db.query(
-            AccessRequest.access_role_id,
-            func.count(AccessRequest.id).label('count')
-        ).filter(
-            AccessRequest.system_id == system_id,
-            AccessRequest.status.in_([RequestStatus.APPROVED, RequestStatus.IMPLEMENTED]),
-            AccessRequest.created_at >= three_months_ago
-        ).group_by(AccessRequest.access_role_id).order_by(func.count(AccessRequest.id).desc()).limit(10).all()
-
-        max_popular_role_count = max([r.count for r in popular_roles], default=1)
-        for req in popular_roles:
-            if req.access_role_id not in role_scores:
-                role_scores[req.access_role_id] = {'score': 0, 'reasons': []}
-            normalized_score = (req.count / max_popular_role_count) * 20
-            role_scores[req.access_role_id]['score'] += normalized_score
-            role_scores[req.access_role_id]['reasons'].append('popular')
-
-        # Get role details and build response
-        if role_scores:
-            roles_list = db.query(AccessRole).filter(
-                AccessRole.id.in_(list(role_scores.keys())),
-                AccessRole.is_active == True
-            ).all()
-
-            for role in roles_list:
-                data = role_scores[role.id]
-                # Determine primary reason
-                reasons = data['reasons']
-                if 'user_history' in reasons:
-                    reason = "На основе ваших заявок"
-                elif 'department' in reasons:
-                    reason = "Популярно в вашем отделе"
-                else:
-                    reason = "Популярно для этой системы"
-
-                recommended_roles.append(RoleRecommendation(
-                    access_role_id=role.id,
-                    role_name=role.name,
-                    access_level=role.access_level.value if role.access_level else "read",
-                    risk_level=role.risk_level,
-                    score=round(data['score'], 1),
-                    reason=reason
-                ))
-
-            # Sort by score descending and limit to top 5
-            recommended_roles.sort(key=lambda x: x.score, reverse=True)
-            recommended_roles = recommended_roles[:5]
+        return RecommendationsResponse(
+            recommended_systems=[SystemRecommendation(**item) for item in recommend_systems(db, user)],
+            recommended_roles=[]
+        )
 
     return RecommendationsResponse(
-        recommended_systems=recommended_systems,
-        recommended_roles=recommended_roles
+        recommended_systems=[],
+        recommended_roles=[RoleRecommendation(**item) for item in recommend_roles(db, user, system_id)]
     )
 
 
 def generate_request_number(db: Session) -> str:
     """Generate unique request number like REQ-2025-00001"""
-    from datetime import date
-    from sqlalchemy import func
-
-    year = date.today().year
-    prefix = f"REQ-{year}-"
-
-    # Get max request number
-    result = db.query(
-        func.max(AccessRequest.request_number)
-    ).filter(
-        AccessRequest.request_number.like(f"{prefix}%")
-    ).scalar()
-
-    if result:
-        # Extract number from REQ-2025-00001 format
-        try:
-            last_num = int(result.split('-')[-1])
-            next_num = last_num + 1
-        except (ValueError, IndexError):
-            next_num = 1
-    else:
-        next_num = 1
-
-    return f"{prefix}{next_num:05d}"
+    return allocate_request_numbers(db, 1)[0]
 
 
 def create_audit_log(db: Session, request_id: int, user_id: int, action: str, details: str = None, ip_address: str = None):
@@ -299,29 +103,106 @@ def create_audit_log(db: Session, request_id: int, user_id: int, action: str, de
     db.flush()  # Ensure log is persisted within current transaction
 
 
-@router.get("/my-requests", response_model=List[AccessRequestResponse])
-async def get_my_requests(
-    skip: int = 0,
-    limit: int = 20,
-    status_filter: RequestStatus = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Get current user's requests"""
-    query = db.query(AccessRequest).options(
+async def count_my_pending_approvals(db: AsyncSession, user_id: int) -> int:
+    """Count approval steps waiting for the user's decision"""
+    return await db.scalar(
+        select(func.count()).select_from(Approval).where(
+            Approval.approver_id == user_id,
+            Approval.status == ApprovalStatus.PENDING
+        )
+    )
+
+
+def my_requests_statement(user_id: int, status_filter: Optional[RequestStatus] = None):
+    """The user's requests with their display relations, newest first"""
+    query = select(AccessRequest).options(
         joinedload(AccessRequest.requester),
         joinedload(AccessRequest.target_user),
         joinedload(AccessRequest.system),
         joinedload(AccessRequest.subsystem),
         joinedload(AccessRequest.access_role)
-    ).filter(
-        AccessRequest.requester_id == current_user.id
+    ).where(
+        AccessRequest.requester_id == user_id
     )
 
     if status_filter:
-        query = query.filter(AccessRequest.status == status_filter)
+        query = query.where(AccessRequest.status == status_filter)
+
+    return query.order_by(AccessRequest.created_at.desc(), AccessRequest.id.desc())
+
+
+def my_decisions_statement(approver_id: int, statuses: List[ApprovalStatus]):
+    """Requests with the approver's latest decision, most recent decision first.
+
+    Rows are (AccessRequest, status, decision_date, comment). The latest
+    decision per request is picked with NOT EXISTS (no later decision by the
+    same approver) rather than a window over all decisions, so the first
+    pages read about `limit` rows from ix_approvals_approver_decision_date.
+    """
+    later = aliased(Approval)
+    has_later_decision = select(later.id).where(
+        later.request_id == Approval.request_id,
+        later.approver_id == approver_id,
+        later.status.in_(statuses),
+        or_(
+            later.decision_date > Approval.decision_date,
+            and_(Approval.decision_date.is_(None), later.decision_date.is_not(None)),
+            and_(later.decision_date == Approval.decision_date, later.id > Approval.id),
+            and_(Approval.decision_date.is_(None), later.decision_date.is_(None), later.id > Approval.id),
+        )
+    ).exists()
 
-    requests = query.order_by(AccessRequest.created_at.desc()).offset(skip).limit(limit).all()
+    return select(
+        AccessRequest, Approval.status, Approval.decision_date, Approval.comment
+    ).join(
+        Approval, Approval.request_id == AccessRequest.id
+    ).options(
+        joinedload(AccessRequest.requester),
+        joinedload(AccessRequest.target_user),
+        joinedload(AccessRequest.system),
+        joinedload(AccessRequest.subsystem),
+        joinedload(AccessRequest.access_role)
+    ).where(
+        Approval.approver_id == approver_id,
+        Approval.status.in_(statuses),
+        ~has_later_decision
+    ).order_by(
+        Approval.decision_date.desc().nullslast(), AccessRequest.id.desc()
+    )
+
+
+def get_pending_approval(db: Session, request_id: int, approver_id: int) -> Optional[Approval]:
+    """The approver's pending approval step of a request"""
+    return db.query(Approval).filter(
+        Approval.request_id == request_id,
+        Approval.approver_id == approver_id,
+        Approval.status == ApprovalStatus.PENDING
+    ).first()
+
+
+@router.get("/my-requests", response_model=List[AccessRequestResponse])
+async def get_my_requests(
+    response: Response,
+    skip: int = 0,
+    limit: int = 20,
+    status_filter: RequestStatus = None,
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get current user's requests (next page cursor in the X-Next-Cursor header)"""
+    query = my_requests_statement(current_user.id, status_filter)
+
+    if cursor:
+        query = query.where(keyset_after((AccessRequest.created_at, AccessRequest.id), cursor))
+    elif skip:
+        query = query.offset(skip)
+
+    requests = (await db.execute(query.limit(limit))).scalars().all()
+
+    cursor_value = next_cursor(requests, limit, lambda req: (req.created_at, req.id))
+    if cursor_value:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_value
 
     # Enrich with names (now using pre-loaded relationships)
     result = []
@@ -342,30 +223,29 @@ async def get_my_pending_approvals(
     skip: int = 0,
     limit: int = 20,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get requests pending my approval"""
-    # Find approvals assigned to current user with pending status
-    pending_approvals = db.query(Approval).filter(
+    # Semi-join on approvals (served by ix_approvals_approver_status_request);
+    # pagination happens in SQL, so only the requested window is loaded
+    pending_for_me = select(Approval.id).where(
+        Approval.request_id == AccessRequest.id,
         Approval.approver_id == current_user.id,
         Approval.status == ApprovalStatus.PENDING
-    ).all()
-
-    request_ids = [approval.request_id for approval in pending_approvals]
-
-    if not request_ids:
-        return []
-
-    requests = db.query(AccessRequest).options(
-        joinedload(AccessRequest.requester),
-        joinedload(AccessRequest.target_user),
-        joinedload(AccessRequest.system),
-        joinedload(AccessRequest.subsystem),
-        joinedload(AccessRequest.access_role)
-    ).filter(
-        AccessRequest.id.in_(request_ids),
-        AccessRequest.status == RequestStatus.IN_REVIEW
-    ).order_by(AccessRequest.created_at).offset(skip).limit(limit).all()
+    ).exists()
+
+    requests = (await db.execute(
+        select(AccessRequest).options(
+            joinedload(AccessRequest.requester),
+            joinedload(AccessRequest.target_user),
+            joinedload(AccessRequest.system),
+            joinedload(AccessRequest.subsystem),
+            joinedload(AccessRequest.access_role)
+        ).where(
+            pending_for_me,
+            AccessRequest.status == RequestStatus.IN_REVIEW
+        ).order_by(AccessRequest.created_at, AccessRequest.id).offset(skip).limit(limit)
+    )).scalars().all()
 
     # Enrich with names (now using pre-loaded relationships)
     result = []
@@ -387,53 +267,19 @@ async def get_my_decisions(
     limit: int = 50,
     decision_filter: ApprovalStatus = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get requests where current user has made a decision (approved/rejected) - approval history"""
-    # Build query for approvals where user made a decision
-    query = db.query(Approval).filter(
-        Approval.approver_id == current_user.id,
-        Approval.status.in_([ApprovalStatus.APPROVED, ApprovalStatus.REJECTED])
-    )
-
-    # Apply decision filter if provided
-    if decision_filter and decision_filter in [ApprovalStatus.APPROVED, ApprovalStatus.REJECTED]:
-        query = query.filter(Approval.status == decision_filter)
+    statuses = [ApprovalStatus.APPROVED, ApprovalStatus.REJECTED]
+    if decision_filter in statuses:
+        statuses = [decision_filter]
 
-    # Order by decision date descending
-    completed_approvals = query.order_by(Approval.decision_date.desc()).all()
+    rows = (await db.execute(
+        my_decisions_statement(current_user.id, statuses).offset(skip).limit(limit)
+    )).all()
 
-    request_ids = [approval.request_id for approval in completed_approvals]
-
-    if not request_ids:
-        return []
-
-    # Preserve order from approvals (by decision_date) with eager loading
-    requests = db.query(AccessRequest).options(
-        joinedload(AccessRequest.requester),
-        joinedload(AccessRequest.target_user),
-        joinedload(AccessRequest.system),
-        joinedload(AccessRequest.subsystem),
-        joinedload(AccessRequest.access_role)
-    ).filter(
-        AccessRequest.id.in_(request_ids)
-    ).all()
-
-    # Create a map for quick lookup
-    request_map = {req.id: req for req in requests}
-
-    # Build result in order of decision_date
     result = []
-    seen_ids = set()
-    for approval in completed_approvals:
-        if approval.request_id in seen_ids:
-            continue
-        seen_ids.add(approval.request_id)
-
-        req = request_map.get(approval.request_id)
-        if not req:
-            continue
-
+    for req, decision, decision_date, decision_comment in rows:
         req_dict = AccessRequestResponse.model_validate(req).model_dump()
         req_dict['requester_name'] = req.requester.full_name if req.requester else None
         req_dict['target_user_name'] = req.target_user.full_name if req.target_user else None
@@ -441,41 +287,31 @@ async def get_my_decisions(
         req_dict['subsystem_name'] = req.subsystem.name if req.subsystem else None
         req_dict['access_role_name'] = req.access_role.name if req.access_role else None
         # Add user's decision info
-        req_dict['my_decision'] = approval.status.value
-        req_dict['my_decision_date'] = approval.decision_date.isoformat() if approval.decision_date else None
-        req_dict['my_decision_comment'] = approval.comment
+        req_dict['my_decision'] = decision.value
+        req_dict['my_decision_date'] = decision_date.isoformat() if decision_date else None
+        req_dict['my_decision_comment'] = decision_comment
         result.append(AccessRequestResponse(**req_dict))
 
-        if len(result) >= limit:
-            break
-
-    return result[skip:skip+limit]
+    return result
 
 
 @router.get("/statistics", response_model=RequestStatistics)
 async def get_request_statistics(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get request statistics"""
-    total = db.query(AccessRequest).count()
-    pending = db.query(AccessRequest).filter(AccessRequest.status == RequestStatus.IN_REVIEW).count()
-    approved = db.query(AccessRequest).filter(AccessRequest.status == RequestStatus.APPROVED).count()
-    rejected = db.query(AccessRequest).filter(AccessRequest.status == RequestStatus.REJECTED).count()
-    implemented = db.query(AccessRequest).filter(AccessRequest.status == RequestStatus.IMPLEMENTED).count()
-    
+    status_totals = await db.run_sync(get_status_totals)
+
     # My pending approvals
-    my_approvals = db.query(Approval).filter(
-        Approval.approver_id == current_user.id,
-        Approval.status == ApprovalStatus.PENDING
-    ).count()
-    
+    my_approvals = await count_my_pending_approvals(db, current_user.id)
+
     return {
-        "total_requests": total,
-        "pending_approval": pending,
-        "approved": approved,
-        "rejected": rejected,
-        "implemented": implemented,
+        "total_requests": sum(status_totals.values()),
+        "pending_approval": status_totals.get(RequestStatus.IN_REVIEW, 0),
+        "approved": status_totals.get(RequestStatus.APPROVED, 0),
+        "rejected": status_totals.get(RequestStatus.REJECTED, 0),
+        "implemented": status_totals.get(RequestStatus.IMPLEMENTED, 0),
         "my_pending_approvals": my_approvals
     }
 
@@ -483,108 +319,47 @@ async def get_request_statistics(
 @router.get("/dashboard", response_model=DashboardStats)
 async def get_dashboard_stats(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get comprehensive dashboard statistics with charts data"""
-    from sqlalchemy import func, extract
-    from datetime import timedelta
-    from app.models import System
-
-    # Basic counts
-    total = db.query(AccessRequest).count()
-    pending = db.query(AccessRequest).filter(AccessRequest.status == RequestStatus.IN_REVIEW).count()
-    approved = db.query(AccessRequest).filter(AccessRequest.status == RequestStatus.APPROVED).count()
-    rejected = db.query(AccessRequest).filter(AccessRequest.status == RequestStatus.REJECTED).count()
-    implemented = db.query(AccessRequest).filter(AccessRequest.status == RequestStatus.IMPLEMENTED).count()
-
-    my_approvals = db.query(Approval).filter(
-        Approval.approver_id == current_user.id,
-        Approval.status == ApprovalStatus.PENDING
-    ).count()
+    """Get comprehensive dashboard statistics with charts data.
+
+    All chart data is read from the pre-aggregated summary tables
+    (see app.services.request_stats), not from access_requests.
+    """
+    aggregates = await db.run_sync(get_dashboard_aggregates, 6)
+    status_totals = aggregates['status_totals']
+
+    my_approvals = await count_my_pending_approvals(db, current_user.id)
 
     # Monthly trend (last 6 months)
-    from sqlalchemy import case, Integer
-
-    six_months_ago = datetime.now(timezone.utc) - timedelta(days=180)
-    monthly_data = db.query(
-        func.to_char(AccessRequest.created_at, 'YYYY-MM').label('month'),
-        func.count().label('total'),
-        func.sum(case((AccessRequest.status == RequestStatus.APPROVED, 1), else_=0)).label('approved'),
-        func.sum(case((AccessRequest.status == RequestStatus.REJECTED, 1), else_=0)).label('rejected')
-    ).filter(
-        AccessRequest.created_at >= six_months_ago
-    ).group_by(
-        func.to_char(AccessRequest.created_at, 'YYYY-MM')
-    ).order_by('month').all()
-
-    monthly_trend = [
-        MonthlyStats(
-            month=row.month,
-            total=row.total or 0,
-            approved=int(row.approved or 0),
-            rejected=int(row.rejected or 0)
-        )
-        for row in monthly_data
-    ]
+    monthly_trend = [MonthlyStats(**row) for row in aggregates['monthly_trend']]
 
     # Requests by system (top 5)
-    system_data = db.query(
-        System.id,
-        System.name,
-        System.code,
-        func.count(AccessRequest.id).label('total'),
-        func.sum(case((AccessRequest.status == RequestStatus.APPROVED, 1), else_=0)).label('approved'),
-        func.sum(case((AccessRequest.status == RequestStatus.IN_REVIEW, 1), else_=0)).label('pending')
-    ).join(
-        AccessRequest, AccessRequest.system_id == System.id
-    ).group_by(
-        System.id, System.name, System.code
-    ).order_by(
-        func.count(AccessRequest.id).desc()
-    ).limit(5).all()
-
     requests_by_system = [
         SystemStats(
             system_id=row.id,
             system_name=row.name,
             system_code=row.code,
-            total=row.total or 0,
+            total=int(row.total or 0),
             approved=int(row.approved or 0),
             pending=int(row.pending or 0)
         )
-        for row in system_data
+        for row in aggregates['top_systems']
     ]
 
     # Status distribution
-    status_counts = db.query(
-        AccessRequest.status,
-        func.count().label('count')
-    ).group_by(AccessRequest.status).all()
-
-    total_for_percentage = sum(row.count for row in status_counts) or 1
+    total = sum(status_totals.values())
+    total_for_percentage = total or 1
     status_distribution = [
         StatusDistribution(
-            status=row.status.value,
-            count=row.count,
-            percentage=round((row.count / total_for_percentage) * 100, 1)
+            status=request_status.value,
+            count=count,
+            percentage=round((count / total_for_percentage) * 100, 1)
         )
-        for row in status_counts
+        for request_status, count in status_totals.items() if count > 0
     ]
 
     # Top requesters (top 5)
-    requester_data = db.query(
-        User.id,
-        User.full_name,
-        User.department,
-        func.count(AccessRequest.id).label('total_requests')
-    ).join(
-        AccessRequest, AccessRequest.requester_id == User.id
-    ).group_by(
-        User.id, User.full_name, User.department
-    ).order_by(
-        func.count(AccessRequest.id).desc()
-    ).limit(5).all()
-
     top_requesters = [
         TopRequester(
             user_id=row.id,
@@ -592,50 +367,24 @@ async def get_dashboard_stats(
             department=row.department,
             total_requests=row.total_requests
         )
-        for row in requester_data
+        for row in aggregates['top_requesters']
     ]
 
     # Approval metrics
-    current_month_start = datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-
-    approved_this_month = db.query(Approval).filter(
-        Approval.status == ApprovalStatus.APPROVED,
-        Approval.decision_date >= current_month_start
-    ).count()
-
-    # Calculate approval times (for approved requests)
-    approval_times = db.query(
-        func.extract('epoch', Approval.decision_date - AccessRequest.submitted_at) / 3600
-    ).join(
-        AccessRequest, AccessRequest.id == Approval.request_id
-    ).filter(
-        Approval.status == ApprovalStatus.APPROVED,
-        Approval.decision_date.isnot(None),
-        AccessRequest.submitted_at.isnot(None)
-    ).all()
-
-    approval_hours = [t[0] for t in approval_times if t[0] is not None and t[0] > 0]
-
-    if approval_hours:
-        avg_time = sum(approval_hours) / len(approval_hours)
-        min_time = min(approval_hours)
-        max_time = max(approval_hours)
-    else:
-        avg_time = min_time = max_time = 0
-
+    metrics = aggregates['approval_metrics']
     approval_metrics = ApprovalMetrics(
-        avg_approval_time_hours=round(avg_time, 1),
-        min_approval_time_hours=round(min_time, 1),
-        max_approval_time_hours=round(max_time, 1),
-        total_approved_this_month=approved_this_month
+        avg_approval_time_hours=round(metrics['avg_hours'], 1),
+        min_approval_time_hours=round(metrics['min_hours'], 1),
+        max_approval_time_hours=round(metrics['max_hours'], 1),
+        total_approved_this_month=metrics['approved_this_month']
     )
 
     return DashboardStats(
         total_requests=total,
-        pending_approval=pending,
-        approved=approved,
-        rejected=rejected,
-        implemented=implemented,
+        pending_approval=status_totals.get(RequestStatus.IN_REVIEW, 0),
+        approved=status_totals.get(RequestStatus.APPROVED, 0),
+        rejected=status_totals.get(RequestStatus.REJECTED, 0),
+        implemented=status_totals.get(RequestStatus.IMPLEMENTED, 0),
         my_pending_approvals=my_approvals,
         monthly_trend=monthly_trend,
         requests_by_system=requests_by_system,
@@ -653,43 +402,27 @@ async def create_request(
     db: Session = Depends(get_db)
 ):
     """Create new access request"""
-    from app.models.sod import SodConflict, SodSeverity
-    from sqlalchemy import or_, and_
+    from app.api.endpoints.sod import get_user_existing_roles
+    from app.services.sod_graph import get_hard_block_conflicts
 
     # ===== SoD CHECK =====
     # Get user's existing approved/implemented roles
-    existing_role_ids = db.query(AccessRequest.access_role_id).filter(
-        AccessRequest.target_user_id == request_in.target_user_id,
-        AccessRequest.status.in_([RequestStatus.APPROVED, RequestStatus.IMPLEMENTED])
-    ).distinct().all()
-    existing_role_ids = [r[0] for r in existing_role_ids]
+    existing_role_ids = get_user_existing_roles(db, request_in.target_user_id)
 
     if existing_role_ids:
-        # Check for hard block conflicts
-        hard_block_conflicts = db.query(SodConflict).filter(
-            SodConflict.is_active == True,
-            SodConflict.severity == SodSeverity.HARD_BLOCK,
-            or_(
-                and_(
-                    SodConflict.role_a_id == request_in.access_role_id,
-                    SodConflict.role_b_id.in_(existing_role_ids)
-                ),
-                and_(
-                    SodConflict.role_b_id == request_in.access_role_id,
-                    SodConflict.role_a_id.in_(existing_role_ids)
-                )
-            )
-        ).all()
+        # Check for hard block conflicts (read from the database, not the
+        # process-local graph, so rules changed in other workers apply at once)
+        hard_block_conflicts = get_hard_block_conflicts(db, request_in.access_role_id, existing_role_ids)
 
         if hard_block_conflicts:
-            conflict = hard_block_conflicts[0]
+            conflict = min(hard_block_conflicts.values(), key=lambda c: c['conflict_id'])
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail={
                     "error": "sod_violation",
-                    "message": f"SoD конфликт: {conflict.conflict_name}",
-                    "description": conflict.description or "Запрошенная роль конфликтует с существующими правами пользователя",
-                    "conflict_id": conflict.id
+                    "message": f"SoD конфликт: {conflict['conflict_name']}",
+                    "description": conflict['description'] or "Запрошенная роль конфликтует с существующими правами пользователя",
+                    "conflict_id": conflict['conflict_id']
                 }
             )
 
@@ -706,6 +439,7 @@ async def create_request(
     )
     db.add(request)
     db.flush()
+    record_requests_created(db, [request])
     
     # Create audit log
     create_audit_log(db, request.id, current_user.id, "created", "Request created", http_request.client.host if http_request.client else None)
@@ -769,120 +503,31 @@ async def create_bulk_requests(
     """Create multiple access requests for different users at once.
 
     Available to all users (not just admins).
-    Maximum 20 users per bulk request.
+    Maximum 1000 users per bulk request.
     """
-    from app.models.system import ApprovalChain
-
-    created_ids = []
-    skipped = []
-
-    for user_id in request_in.user_ids:
-        try:
-            # Verify target user exists
-            target_user = db.query(User).filter(User.id == user_id).first()
-            if not target_user:
-                skipped.append({"user_id": user_id, "reason": "User not found"})
-                continue
-
-            if not target_user.is_active:
-                skipped.append({"user_id": user_id, "reason": "User is inactive"})
-                continue
-
-            # Generate request number
-            request_number = generate_request_number(db)
-
-            # Create request
-            access_request = AccessRequest(
-                request_number=request_number,
-                requester_id=current_user.id,
-                target_user_id=user_id,
-                system_id=request_in.system_id,
-                subsystem_id=request_in.subsystem_id,
-                access_role_id=request_in.access_role_id,
-                request_type=request_in.request_type,
-                purpose=request_in.purpose,
-                is_temporary=request_in.is_temporary,
-                valid_from=request_in.valid_from,
-                valid_until=request_in.valid_until,
-                status=RequestStatus.DRAFT,
-                current_step=1
-            )
-            db.add(access_request)
-            db.flush()
-
-            # Create audit log
-            create_audit_log(
-                db,
-                access_request.id,
-                current_user.id,
-                "created",
-                f"Bulk request created for user {target_user.full_name}",
-                http_request.client.host if http_request.client else None
-            )
-
-            # Load approval chain
-            approval_chains = db.query(ApprovalChain).filter(
-                ApprovalChain.system_id == request_in.system_id
-            ).order_by(ApprovalChain.step_number).all()
-
-            # Create approvals from chain
-            if approval_chains:
-                for chain in approval_chains:
-                    approval = Approval(
-                        request_id=access_request.id,
-                        step_number=chain.step_number,
-                        approver_id=chain.approver_id,
-                        approver_role=chain.approver_role,
-                        status=ApprovalStatus.PENDING
-                    )
-                    db.add(approval)
-            else:
-                # Default fallback if no chain configured
-                if target_user.manager_id:
-                    approval = Approval(
-                        request_id=access_request.id,
-                        step_number=1,
-                        approver_id=target_user.manager_id,
-                        approver_role=ApproverRoles.MANAGER,
-                        status=ApprovalStatus.PENDING
-                    )
-                    db.add(approval)
-
-                security_user = db.query(User).filter(User.is_superuser == True).first()
-                if security_user:
-                    approval = Approval(
-                        request_id=access_request.id,
-                        step_number=2,
-                        approver_id=security_user.id,
-                        approver_role=ApproverRoles.SECURITY_OFFICER,
-                        status=ApprovalStatus.PENDING
-                    )
-                    db.add(approval)
-
-            created_ids.append(access_request.id)
-
-        except Exception as e:
-            skipped.append({"user_id": user_id, "reason": str(e)})
-            continue
+    from app.services.bulk_requests import create_bulk_requests as run_bulk_create
 
+    result = run_bulk_create(
+        db,
+        request_in,
+        current_user,
+        http_request.client.host if http_request.client else None
+    )
     db.commit()
 
-    return BulkRequestResponse(
-        total=len(request_in.user_ids),
-        created=len(created_ids),
-        skipped=skipped,
-        request_ids=created_ids
-    )
+    return BulkRequestResponse(**result)
 
 
 @router.get("/{request_id}", response_model=AccessRequestDetailResponse)
 async def get_request(
     request_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get request details"""
-    request = db.query(AccessRequest).filter(AccessRequest.id == request_id).first()
+    """Get request details (3 queries: request with approvals, comments, attachments)"""
+    from app.services.request_detail import request_detail_statement, serialize_request_detail
+
+    request = (await db.execute(request_detail_statement(request_id))).unique().scalar_one_or_none()
     
     if not request:
         raise HTTPException(
@@ -904,51 +549,7 @@ async def get_request(
             detail="Not authorized to view this request"
         )
     
-    # Enrich response with names
-    result = AccessRequestDetailResponse.model_validate(request).model_dump()
-    result['requester_name'] = request.requester.full_name if request.requester else None
-    result['target_user_name'] = request.target_user.full_name if request.target_user else None
-    result['system_name'] = request.system.name if request.system else None
-    result['subsystem_name'] = request.subsystem.name if request.subsystem else None
-    result['access_role_name'] = request.access_role.name if request.access_role else None
-
-    # Enrich approvals
-    approvals_enriched = []
-    for approval in request.approvals:
-        approval_dict = approval.__dict__.copy()
-        approval_dict['approver_name'] = approval.approver.full_name if approval.approver else None
-        approval_dict['approver_email'] = approval.approver.email if approval.approver else None
-        approvals_enriched.append(approval_dict)
-    
-    result['approvals'] = approvals_enriched
-    
-    # Enrich comments
-    comments_enriched = []
-    for comment in request.comments:
-        comment_dict = comment.__dict__.copy()
-        comment_dict['user_name'] = comment.user.full_name if comment.user else None
-        comments_enriched.append(comment_dict)
-
-    result['comments'] = comments_enriched
-
-    # Enrich attachments
-    attachments_enriched = []
-    for attachment in request.attachments:
-        attachments_enriched.append({
-            'id': attachment.id,
-            'filename': attachment.filename,
-            'file_size': attachment.file_size,
-            'content_type': attachment.content_type,
-            'description': attachment.description,
-            'attachment_type': attachment.attachment_type,
-            'uploaded_by_id': attachment.uploaded_by_id,
-            'uploaded_by_name': attachment.uploaded_by.full_name if attachment.uploaded_by else None,
-            'uploaded_at': attachment.uploaded_at
-        })
-
-    result['attachments'] = attachments_enriched
-
-    return result
+    return serialize_request_detail(request)
 
 
 @router.post("/{request_id}/submit")
@@ -970,8 +571,11 @@ async def submit_request(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only draft requests can be submitted")
     
     # Update status
+    old_status = request.status
     request.status = RequestStatus.IN_REVIEW
     request.submitted_at = datetime.now(timezone.utc)
+    record_status_change(db, request, old_status)
+    record_access_change(db, request, old_status)
 
     # Create audit log
     create_audit_log(db, request.id, current_user.id, "submitted", "Request submitted for approval")
@@ -1008,20 +612,19 @@ async def approve_request(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Request not found")
     
     # Find current user's pending approval
-    approval = db.query(Approval).filter(
-        Approval.request_id == request_id,
-        Approval.approver_id == current_user.id,
-        Approval.status == ApprovalStatus.PENDING
-    ).first()
+    approval = get_pending_approval(db, request_id, current_user.id)
     
     if not approval:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No pending approval found")
     
+    old_status = request.status
+
     # Update approval
     if decision.decision == ApprovalStatus.APPROVED:
         approval.status = ApprovalStatus.APPROVED
         approval.decision_date = datetime.now(timezone.utc)
         approval.comment = decision.comment
+        record_approval_decision(db, approval, request)
         
         # Check if there are more approvals needed
         next_approval = db.query(Approval).filter(
@@ -1053,7 +656,9 @@ async def approve_request(
         
         create_audit_log(db, request.id, current_user.id, "rejected", 
                        f"Rejected at step {approval.step_number}: {decision.comment}")
-    
+
+    record_status_change(db, request, old_status)
+    record_access_change(db, request, old_status)
     db.commit()
     
     return {"message": "Decision recorded successfully"}
@@ -1093,65 +698,44 @@ async def add_comment(
 async def get_search_suggestions(
     q: str = "",
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get search suggestions for autocomplete"""
-    from app.models import System, Subsystem
+    """Get search suggestions for autocomplete.
 
+    Systems, subsystems and users come from the in-process autocomplete
+    index; request numbers are matched by prefix.
+    """
     if len(q) < 2:
         return {"suggestions": []}
 
     suggestions = []
     q_lower = q.lower()
 
-    # Search in systems
-    systems = db.query(System).filter(
-        System.name.ilike(f"%{q}%"),
-        System.is_active == True
-    ).limit(3).all()
-    for system in systems:
-        suggestions.append({
-            "type": "system",
-            "id": system.id,
-            "label": f"System: {system.name}",
-            "value": system.name
-        })
-
-    # Search in subsystems
-    subsystems = db.query(Subsystem).filter(
-        Subsystem.name.ilike(f"%{q}%")
-    ).limit(3).all()
-    for subsystem in subsystems:
-        suggestions.append({
-            "type": "subsystem",
-            "id": subsystem.id,
-            "label": f"Subsystem: {subsystem.name}",
-            "value": subsystem.name
-        })
+    if not autocomplete_index.loaded:
+        await db.run_sync(autocomplete_index.rebuild)
 
-    # Search in users
-    users = db.query(User).filter(
-        User.full_name.ilike(f"%{q}%"),
-        User.is_active == True
-    ).limit(3).all()
-    for user in users:
-        suggestions.append({
-            "type": "user",
-            "id": user.id,
-            "label": f"User: {user.full_name}",
-            "value": user.full_name
-        })
+    matches = autocomplete_index.search(q, per_kind=3)
+    for kind, label in (("system", "System"), ("subsystem", "Subsystem"), ("user", "User")):
+        for entry in matches.get(kind, []):
+            suggestions.append({
+                "type": kind,
+                "id": entry.id,
+                "label": f"{label}: {entry.name}",
+                "value": entry.name
+            })
 
-    # Search in request numbers
-    requests = db.query(AccessRequest).filter(
-        AccessRequest.request_number.ilike(f"%{q}%")
-    ).limit(3).all()
-    for req in requests:
+    # Search in request numbers (REQ-YYYY-NNNNN, prefix match on ix_access_requests_request_number_prefix)
+    requests = (await db.execute(
+        select(AccessRequest.id, AccessRequest.request_number).where(
+            AccessRequest.request_number.like(escape_like(q.upper()) + "%", escape="\\")
+        ).order_by(AccessRequest.request_number).limit(3)
+    )).all()
+    for request_id, request_number in requests:
         suggestions.append({
             "type": "request",
-            "id": req.id,
-            "label": f"Request: {req.request_number}",
-            "value": req.request_number
+            "id": request_id,
+            "label": f"Request: {request_number}",
+            "value": request_number
         })
 
     # Status suggestions
@@ -1184,55 +768,60 @@ async def global_search(
     status_filter: str = None,
     limit: int = 20,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Global search across requests"""
-    from app.models import System, Subsystem
-
-    query = db.query(AccessRequest)
-
-    # Text search in multiple fields
-    if q:
-        query = query.join(AccessRequest.system).outerjoin(AccessRequest.subsystem).outerjoin(AccessRequest.target_user).filter(
-            (AccessRequest.request_number.ilike(f"%{q}%")) |
-            (AccessRequest.purpose.ilike(f"%{q}%")) |
-            (System.name.ilike(f"%{q}%")) |
-            (Subsystem.name.ilike(f"%{q}%")) |
-            (User.full_name.ilike(f"%{q}%"))
-        )
+    """Global search across requests (text matches ranked by relevance)"""
+    conditions = []
 
     # Filter by system
     if system_id:
-        query = query.filter(AccessRequest.system_id == system_id)
+        conditions.append(AccessRequest.system_id == system_id)
 
     # Filter by subsystem
     if subsystem_id:
-        query = query.filter(AccessRequest.subsystem_id == subsystem_id)
+        conditions.append(AccessRequest.subsystem_id == subsystem_id)
 
     # Filter by user (target user)
     if user_id:
-        query = query.filter(
+        conditions.append(
             (AccessRequest.target_user_id == user_id) |
             (AccessRequest.requester_id == user_id)
         )
 
     # Filter by role
     if role_id:
-        query = query.filter(AccessRequest.access_role_id == role_id)
+        conditions.append(AccessRequest.access_role_id == role_id)
 
     # Filter by status
     if status_filter:
         try:
             status_enum = RequestStatus(status_filter.upper())
-            query = query.filter(AccessRequest.status == status_enum)
+            conditions.append(AccessRequest.status == status_enum)
         except ValueError:
             pass
 
-    # Get total count
-    total = query.count()
+    query = select(AccessRequest).where(*conditions)
+    order_by = [AccessRequest.created_at.desc()]
 
-    # Get results
-    requests = query.order_by(AccessRequest.created_at.desc()).limit(limit).all()
+    # Text search in multiple fields (trigram-indexed, see app.services.request_search).
+    # A broad term only ranks the newest matches of each field
+    if q:
+        matches = request_match_scores(q, *conditions)
+        query = query.join(matches, matches.c.request_id == AccessRequest.id)
+        order_by.insert(0, matches.c.score.desc())
+
+    # Get total count
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
+
+    # Get results (relationships must be eager-loaded: no lazy loads on AsyncSession)
+    requests = (await db.execute(
+        query.options(
+            joinedload(AccessRequest.requester),
+            joinedload(AccessRequest.target_user),
+            joinedload(AccessRequest.system),
+            joinedload(AccessRequest.subsystem)
+        ).order_by(*order_by).limit(limit)
+    )).scalars().all()
 
     # Format results
     results = []
@@ -1,12 +1,17 @@
 """Segregation of Duties (SoD) API endpoints"""
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import or_, and_
 from typing import List, Optional
-from app.db.session import get_db
+import json
+from app.db.session import get_db, SessionLocal
 from app.api.deps import get_current_user
 from app.models import User, AccessRequest, RequestStatus, SodConflict, SodSeverity
 from app.models.system import AccessRole, System
+from app.services.sod_graph import sod_graph
+from app.services.sod_scan import scan_sod_violations, summarize_sod_violations
+from app.core.pagination import NEXT_CURSOR_HEADER, keyset_after, next_cursor
 from app.schemas.sod import (
     SodConflictCreate, SodConflictUpdate, SodConflictResponse,
     SodCheckRequest, SodCheckResponse, SodViolation,
@@ -37,52 +42,7 @@ def check_sod_conflicts(
     if not existing_role_ids:
         return []
 
-    # Find conflicts where requested role is either role_a or role_b
-    # and one of user's existing roles is the other side
-    conflicts = db.query(SodConflict).filter(
-        SodConflict.is_active == True,
-        or_(
-            and_(
-                SodConflict.role_a_id == requested_role_id,
-                SodConflict.role_b_id.in_(existing_role_ids)
-            ),
-            and_(
-                SodConflict.role_b_id == requested_role_id,
-                SodConflict.role_a_id.in_(existing_role_ids)
-            )
-        )
-    ).all()
-
-    violations = []
-    for conflict in conflicts:
-        # Determine which role is the existing one
-        if conflict.role_a_id == requested_role_id:
-            existing_role_id = conflict.role_b_id
-        else:
-            existing_role_id = conflict.role_a_id
-
-        # Get role details
-        requested_role = db.query(AccessRole).filter(AccessRole.id == requested_role_id).first()
-        existing_role = db.query(AccessRole).filter(AccessRole.id == existing_role_id).first()
-
-        if requested_role and existing_role:
-            requested_system = db.query(System).filter(System.id == requested_role.system_id).first()
-            existing_system = db.query(System).filter(System.id == existing_role.system_id).first()
-
-            violations.append({
-                'conflict_id': conflict.id,
-                'conflict_name': conflict.conflict_name,
-                'description': conflict.description,
-                'severity': conflict.severity.value if hasattr(conflict.severity, 'value') else conflict.severity,
-                'requested_role_id': requested_role.id,
-                'requested_role_name': requested_role.name,
-                'requested_role_system': requested_system.name if requested_system else 'Unknown',
-                'existing_role_id': existing_role.id,
-                'existing_role_name': existing_role.name,
-                'existing_role_system': existing_system.name if existing_system else 'Unknown',
-            })
-
-    return violations
+    return sod_graph.find_conflicts(db, requested_role_id, existing_role_ids)
 
 
 # ============ SoD CHECK ENDPOINTS ============
@@ -136,10 +96,8 @@ async def check_sod_bulk(
         all_violations.extend([SodViolation(**v) for v in violations_data])
 
     # Check conflicts between requested roles themselves
-    for i, role_a in enumerate(check_request.role_ids):
-        for role_b in check_request.role_ids[i+1:]:
-            violations_data = check_sod_conflicts(db, role_a, [role_b])
-            inter_request_violations.extend([SodViolation(**v) for v in violations_data])
+    violations_data = sod_graph.find_pairwise_conflicts(db, check_request.role_ids)
+    inter_request_violations.extend([SodViolation(**v) for v in violations_data])
 
     combined_violations = all_violations + inter_request_violations
     has_hard_blocks = any(v.severity == 'hard_block' for v in combined_violations)
@@ -165,49 +123,100 @@ async def get_user_violations(
     """
     existing_role_ids = get_user_existing_roles(db, user_id)
 
-    violations = []
     # Check every pair of user's roles for conflicts
-    for i, role_a in enumerate(existing_role_ids):
-        for role_b in existing_role_ids[i+1:]:
-            violations_data = check_sod_conflicts(db, role_a, [role_b])
-            violations.extend([SodViolation(**v) for v in violations_data])
+    violations_data = sod_graph.find_pairwise_conflicts(db, existing_role_ids)
 
-    return violations
+    return [SodViolation(**v) for v in violations_data]
+
+
+@router.get("/violations/scan")
+async def scan_violations(
+    system_id: Optional[int] = None,
+    severity: Optional[SodSeverity] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream all current SoD violations across the organization as NDJSON. Admin only.
+
+    One line per (user, violated conflict rule), ordered by user.
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    def generate():
+        # Own session: the request-scoped one is closed before the body is streamed
+        db = SessionLocal()
+        try:
+            for violation in scan_sod_violations(db, system_id=system_id, severity=severity):
+                yield json.dumps(violation, ensure_ascii=False) + "\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=sod_violations.ndjson"}
+    )
+
+
+@router.get("/violations/summary")
+async def get_violations_summary(
+    system_id: Optional[int] = None,
+    severity: Optional[SodSeverity] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get organization-wide SoD violation counts per severity. Admin only."""
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    return summarize_sod_violations(db, system_id=system_id, severity=severity)
 
 
 # ============ SOD CONFLICT MANAGEMENT (ADMIN) ============
 
 @router.get("/conflicts", response_model=List[SodConflictResponse])
 async def list_sod_conflicts(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     is_active: Optional[bool] = None,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """List all SoD conflict rules. Admin only."""
+    """List all SoD conflict rules. Admin only.
+
+    The next page cursor is returned in the X-Next-Cursor header.
+    """
     if not current_user.is_superuser:
         raise HTTPException(status_code=403, detail="Admin access required")
 
-    query = db.query(SodConflict)
+    query = db.query(SodConflict).options(
+        joinedload(SodConflict.role_a).joinedload(AccessRole.system),
+        joinedload(SodConflict.role_b).joinedload(AccessRole.system),
+        joinedload(SodConflict.created_by)
+    )
 
     if is_active is not None:
         query = query.filter(SodConflict.is_active == is_active)
 
-    conflicts = query.order_by(SodConflict.created_at.desc()).offset(skip).limit(limit).all()
+    if cursor:
+        query = query.filter(keyset_after((SodConflict.created_at, SodConflict.id), cursor))
+    elif skip:
+        query = query.offset(skip)
+
+    conflicts = query.order_by(SodConflict.created_at.desc(), SodConflict.id.desc()).limit(limit).all()
+
+    cursor_value = next_cursor(conflicts, limit, lambda conflict: (conflict.created_at, conflict.id))
+    if cursor_value:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_value
 
     result = []
     for conflict in conflicts:
-        # Get role and system names
-        role_a = db.query(AccessRole).filter(AccessRole.id == conflict.role_a_id).first()
-        role_b = db.query(AccessRole).filter(AccessRole.id == conflict.role_b_id).first()
-
-        role_a_system = None
-        role_b_system = None
-        if role_a:
-            role_a_system = db.query(System).filter(System.id == role_a.system_id).first()
-        if role_b:
-            role_b_system = db.query(System).filter(System.id == role_b.system_id).first()
+        role_a = conflict.role_a
+        role_b = conflict.role_b
+        role_a_system = role_a.system if role_a else None
+        role_b_system = role_b.system if role_b else None
 
         result.append(SodConflictResponse(
             id=conflict.id,
@@ -281,6 +290,7 @@ async def create_sod_conflict(
     db.add(conflict)
     db.commit()
     db.refresh(conflict)
+    sod_graph.invalidate()
 
     # Get enriched response
     role_a_system = db.query(System).filter(System.id == role_a.system_id).first()
@@ -327,6 +337,7 @@ async def update_sod_conflict(
 
     db.commit()
     db.refresh(conflict)
+    sod_graph.invalidate()
 
     # Get enriched response
     role_a = db.query(AccessRole).filter(AccessRole.id == conflict.role_a_id).first()
@@ -369,5 +380,6 @@ async def delete_sod_conflict(
 
     db.delete(conflict)
     db.commit()
+    sod_graph.invalidate()
 
     return {"message": "Conflict rule deleted successfully"}
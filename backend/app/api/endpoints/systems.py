@@ -8,6 +8,7 @@ from app.schemas.system import (
 )
 from app.models import System, AccessRole, User
 from app.api.deps import get_current_user
+from app.services.sod_graph import sod_graph
 
 router = APIRouter()
 
@@ -88,6 +89,7 @@ async def update_system(
     
     db.commit()
     db.refresh(system)
+    sod_graph.invalidate()  # System names are denormalized into the SoD graph
     return system
 
 
@@ -141,4 +143,5 @@ async def delete_system(
         )
     db.delete(system)
     db.commit()
+    sod_graph.invalidate()
     return None
@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Response
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
 from pydantic import BaseModel, EmailStr
 import os
@@ -7,8 +7,9 @@ import uuid
 from app.db.session import get_db
 from app.schemas.user import UserCreate, UserUpdate, UserResponse, UserPasswordUpdate
 from app.models import User, Role
-from app.api.deps import get_current_user, get_current_superuser
+from app.api.deps import get_current_user, get_current_db_user, get_current_superuser
 from app.core.security import get_password_hash
+from app.core.pagination import NEXT_CURSOR_HEADER, keyset_after, next_cursor
 
 
 # Profile update schema
@@ -29,15 +30,26 @@ router = APIRouter()
 
 @router.get("", response_model=List[UserResponse])
 async def list_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """List all users with roles"""
-    users = db.query(User).options(
-        joinedload(User.roles)
-    ).offset(skip).limit(limit).all()
+    """List all users with roles in id order (next page cursor in the X-Next-Cursor header)"""
+    query = db.query(User).options(selectinload(User.roles))
+
+    if cursor:
+        query = query.filter(keyset_after((User.id,), cursor, descending=False))
+    elif skip:
+        query = query.offset(skip)
+
+    users = query.order_by(User.id).limit(limit).all()
+
+    cursor_value = next_cursor(users, limit, lambda user: (user.id,))
+    if cursor_value:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_value
     return users
 
 
@@ -82,7 +94,7 @@ async def create_user(
 @router.post("/me/tour-complete", response_model=UserResponse)
 async def complete_tour(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_db_user)
 ):
     """Mark onboarding tour as completed for current user"""
     current_user.tour_completed = True
@@ -94,7 +106,7 @@ async def complete_tour(
 @router.post("/me/tour-reset", response_model=UserResponse)
 async def reset_tour(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_db_user)
 ):
     """Reset onboarding tour for current user (to see it again)"""
     current_user.tour_completed = False
@@ -105,7 +117,7 @@ async def reset_tour(
 
 @router.get("/me/profile", response_model=UserResponse)
 async def get_my_profile(
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_db_user)
 ):
     """Get current user's profile"""
     return current_user
@@ -115,7 +127,7 @@ async def get_my_profile(
 async def update_my_profile(
     profile_update: ProfileUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_db_user)
 ):
     """Update current user's profile (name, email, phone, etc.)"""
     update_data = profile_update.model_dump(exclude_unset=True)
@@ -142,7 +154,7 @@ async def update_my_profile(
 async def upload_avatar(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_db_user)
 ):
     """Upload profile avatar"""
     # Validate file type
@@ -188,7 +200,7 @@ async def upload_avatar(
 @router.delete("/me/avatar", response_model=UserResponse)
 async def delete_avatar(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_db_user)
 ):
     """Delete profile avatar"""
     if current_user.avatar_url:
@@ -270,7 +282,7 @@ async def change_password(
     user_id: int,
     password_update: UserPasswordUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_db_user)
 ):
     """Change user password"""
     if current_user.id != user_id:
@@ -11,6 +11,19 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    # Connection pools per worker process: the sync engine (write endpoints,
+    # services, scheduler) and the async engine (read endpoints). A worker may
+    # open up to DB_POOL_SIZE + DB_MAX_OVERFLOW + DB_ASYNC_POOL_SIZE +
+    # DB_ASYNC_MAX_OVERFLOW connections; keep that times the number of
+    # workers below the server's max_connections (PostgreSQL default 100).
+    # The defaults allow 4 workers * 20 = 80.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 5
+    DB_ASYNC_POOL_SIZE: int = 5
+    DB_ASYNC_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT: int = 30  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a connection is replaced (-1 = never)
+    DB_POOL_PRE_PING: bool = True
     
     # Security
     SECRET_KEY: str
@@ -52,10 +65,20 @@ class Settings(BaseSettings):
     LDAP_VERIFY_CERT: bool = False  # Set to True in production with proper CA cert
     LDAP_TIMEOUT: int = 10
     
+    # SQL profiling (debug/test only): query count headers, N+1 detection, query budgets
+    SQL_PROFILING: bool = False
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5  # Same statement shape repeated this often in one request is flagged
+    SQL_QUERY_BUDGETS: str = '{}'  # JSON, added to / overriding query_profiler.HOT_ROUTE_BUDGETS, e.g. {"GET /api/admin/roles": 3}
+
     # Pagination
     DEFAULT_PAGE_SIZE: int = 20
     MAX_PAGE_SIZE: int = 100
     
+    # Background export jobs
+    EXPORT_DIR: str = "/opt/idm-system/backend/exports"  # Shared by all workers
+    EXPORT_WORKERS: int = 2  # Export threads per worker process
+    EXPORT_RETENTION_HOURS: int = 24  # Finished jobs and artifacts are deleted after this
+
     # Access recertification
     RECERTIFICATION_PERIOD_MONTHS: int = 6
 
@@ -73,6 +96,14 @@ class Settings(BaseSettings):
         except:
             return ["http://localhost:3000"]
     
+    @property
+    def sql_query_budgets(self) -> dict:
+        """Parse per-route SQL query budgets from JSON string"""
+        try:
+            return json.loads(self.SQL_QUERY_BUDGETS)
+        except:
+            return {}
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
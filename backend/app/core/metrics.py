@@ -0,0 +1,141 @@
+"""
+Prometheus metrics for HTTP requests and database queries.
+
+Request metrics are recorded by the metrics middleware in app.main; database
+query count and time are attributed to the current request through a context
+variable that the SQLAlchemy cursor events below update.
+
+Under gunicorn every worker is a separate process. When PROMETHEUS_MULTIPROC_DIR
+is set (see deployment/systemd/idm-backend.service), prometheus_client writes
+samples to per-process files in that directory and /api/metrics aggregates
+all workers; gunicorn.conf.py cleans up after exited workers.
+"""
+from contextvars import ContextVar
+from typing import Optional
+import os
+import re
+import time
+
+from prometheus_client import (
+    Counter, Histogram, Gauge, CollectorRegistry, REGISTRY,
+    generate_latest, CONTENT_TYPE_LATEST
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+_IN_LIST = re.compile(r'IN \((?:\s*(?:%\(\w+\)s|\$\d+|\?)\s*,?)+\)')
+
+HTTP_REQUESTS = Counter(
+    'idm_http_requests_total', 'HTTP requests',
+    ['method', 'route', 'status']
+)
+HTTP_LATENCY = Histogram(
+    'idm_http_request_duration_seconds', 'HTTP request latency',
+    ['method', 'route'], buckets=LATENCY_BUCKETS
+)
+HTTP_IN_FLIGHT = Gauge(
+    'idm_http_requests_in_flight', 'HTTP requests currently being served',
+    ['method'], multiprocess_mode='livesum'
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    'idm_http_response_size_bytes', 'HTTP response body size (when Content-Length is known)',
+    ['method', 'route'], buckets=SIZE_BUCKETS
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    'idm_db_queries_per_request', 'Database queries executed per HTTP request',
+    ['method', 'route'], buckets=QUERY_COUNT_BUCKETS
+)
+DB_TIME_PER_REQUEST = Histogram(
+    'idm_db_query_seconds_per_request', 'Total database query time per HTTP request',
+    ['method', 'route'], buckets=LATENCY_BUCKETS
+)
+DB_QUERIES = Counter(
+    'idm_db_queries_total', 'Database queries (including background jobs)'
+)
+
+
+class RequestQueryStats:
+    """Mutable per-request database query counters"""
+    __slots__ = ('count', 'total_time', 'statements')
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.statements = None  # Counter of statement shapes, only in profiling mode
+
+
+# Set by the middleware; copied into threadpool workers and child tasks
+current_query_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar('current_query_stats', default=None)
+
+
+def start_request_tracking() -> RequestQueryStats:
+    """Start attributing database queries to the current request"""
+    stats = RequestQueryStats()
+    current_query_stats.set(stats)
+    return stats
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a statement so executions differing only in parameters compare equal"""
+    # Expanded IN lists: IN (%(id_1_1)s, %(id_1_2)s, ...) / IN ($1, $2, ...)
+    return _IN_LIST.sub('IN (...)', statement)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+    DB_QUERIES.inc()
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.total_time += elapsed
+        if stats.statements is not None:
+            stats.statements[statement_shape(statement)] += 1
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    """Drop the start time of a failed statement (after_cursor_execute is not called for it)"""
+    conn = exception_context.connection
+    if conn is None or exception_context.execution_context is None:
+        return  # Failed before a statement was sent (connecting, compiling)
+    starts = conn.info.get('query_start_time')
+    if starts:
+        starts.pop()
+
+
+def route_label(request) -> str:
+    """Route template (e.g. /api/requests/{request_id}) to keep label cardinality bounded"""
+    route = request.scope.get('route')
+    return getattr(route, 'path', None) or 'unmatched'
+
+
+def observe_request(method: str, route: str, status_code: int, elapsed: float,
+                    response_size: Optional[int], query_stats: RequestQueryStats):
+    """Record a finished HTTP request"""
+    HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+    HTTP_LATENCY.labels(method, route).observe(elapsed)
+    if response_size is not None:
+        HTTP_RESPONSE_SIZE.labels(method, route).observe(response_size)
+    DB_QUERIES_PER_REQUEST.labels(method, route).observe(query_stats.count)
+    DB_TIME_PER_REQUEST.labels(method, route).observe(query_stats.total_time)
+
+
+def render_metrics():
+    """Return (body, content_type) in Prometheus text exposition format"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,128 @@
+"""
+Keyset (cursor) pagination helpers.
+
+OFFSET pagination makes the database produce and throw away every row before
+the requested page, so deep pages get linearly slower, and listing endpoints
+ran an extra COUNT(*) on every page. With keyset pagination the client passes
+back an opaque cursor holding the sort key of the last row it received, and
+the next page is read with WHERE (created_at, id) < (:created_at, :id) from
+the same index that serves page 1.
+
+Cursors are urlsafe base64 of a JSON array of the sort key values; datetimes
+are tagged so they round-trip. Decoded values are checked against the types
+of the key columns, so a tampered cursor is a 400 rather than a database
+error. Totals are optional: "exact" runs COUNT(*),
+"estimate" takes the planner's row estimate (EXPLAIN) and "none" skips it.
+"""
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+import base64
+import json
+
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_, BigInteger, SmallInteger
+from sqlalchemy.orm import Session
+
+TOTAL_MODES = ("exact", "estimate", "none")
+
+# Query parameter pattern for the total mode
+TOTAL_MODE_PATTERN = "^(exact|estimate|none)$"
+
+# Response header with the cursor of the next page (list responses)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode sort key values into an opaque cursor"""
+    payload = [
+        {"dt": value.isoformat()} if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid pagination cursor"
+    )
+
+
+def decode_cursor(cursor: str, size: int) -> Tuple:
+    """Decode a cursor into sort key values (400 on a malformed cursor)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != size:
+            raise ValueError("cursor size mismatch")
+        return tuple(
+            datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value
+            for value in payload
+        )
+    except (ValueError, TypeError, KeyError):
+        raise _invalid_cursor()
+
+
+def _key_value(column, value):
+    """Check a decoded cursor value against the type of its key column (400 on mismatch)"""
+    python_type = column.type.python_type
+    if python_type is int:
+        # bool is an int subclass; bounds keep Postgres from raising "out of range"
+        bits = 63 if isinstance(column.type, BigInteger) else 15 if isinstance(column.type, SmallInteger) else 31
+        if isinstance(value, int) and not isinstance(value, bool) and -2 ** bits <= value < 2 ** bits:
+            return value
+    elif python_type is float:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+    elif isinstance(value, python_type):
+        return value
+    raise _invalid_cursor()
+
+
+def keyset_after(columns: Sequence, cursor: str, descending: bool = True):
+    """WHERE clause selecting rows after the cursor in (columns...) order"""
+    values = tuple(
+        _key_value(column, value)
+        for column, value in zip(columns, decode_cursor(cursor, len(columns)))
+    )
+    key = tuple_(*columns)
+    return key < tuple_(*values) if descending else key > tuple_(*values)
+
+
+def next_cursor(rows: List, limit: int, key) -> Optional[str]:
+    """Cursor of the page after rows, or None on the last page.
+
+    key maps a row to its sort key values.
+    """
+    if limit <= 0 or len(rows) < limit:
+        return None
+    return encode_cursor(key(rows[-1]))
+
+
+def resolve_total_mode(total: Optional[str], cursor: Optional[str]) -> str:
+    """Default to an exact total on the first page and none on later pages"""
+    if total:
+        return total
+    return "none" if cursor else "exact"
+
+
+def estimate_count(db: Session, query) -> int:
+    """Planner row estimate of an ORM query (no table scan)"""
+    bind = db.get_bind()
+    compiled = query.statement.compile(dialect=bind.dialect, compile_kwargs={"render_postcompile": True})
+    plan = db.connection().exec_driver_sql(
+        "EXPLAIN (FORMAT JSON) " + compiled.string, compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_total(db: Session, query, mode: str) -> Optional[int]:
+    """Total rows of an (unpaginated) ORM query according to mode"""
+    if mode == "exact":
+        return query.order_by(None).count()
+    if mode == "estimate":
+        return estimate_count(db, query.order_by(None))
+    return None
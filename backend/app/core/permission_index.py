@@ -0,0 +1,78 @@
+"""
+Compiled role -> permission index.
+
+All role_permissions rows are loaded once into a dict of frozensets of
+(resource, action) keyed by role id, so resolving a user's permissions never
+walks role.permissions relationships. The index is reloaded by the role admin
+endpoints after create/update/delete, and at most INDEX_TTL seconds after the
+last load so other workers pick up role changes too.
+"""
+from typing import Dict, FrozenSet, Tuple, Iterable, Optional
+import threading
+import time
+import logging
+
+from sqlalchemy.orm import Session
+
+from app.models import Permission
+from app.models.user import role_permissions
+
+logger = logging.getLogger(__name__)
+
+# Maximum age of the index before it is reloaded
+INDEX_TTL = 60  # seconds
+
+EMPTY_PERMISSIONS: FrozenSet[Tuple[str, str]] = frozenset()
+
+
+class PermissionIndex:
+    """Thread-safe process-wide role -> frozenset((resource, action)) index"""
+
+    def __init__(self, ttl: int = INDEX_TTL):
+        self._ttl = ttl
+        self._lock = threading.RLock()
+        self._role_permissions: Dict[int, FrozenSet[Tuple[str, str]]] = {}
+        self._loaded_at: Optional[float] = None
+
+    def reload(self, db: Session):
+        """Compile permission sets of all roles with one query"""
+        rows = db.query(
+            role_permissions.c.role_id, Permission.resource, Permission.action
+        ).join(
+            Permission, Permission.id == role_permissions.c.permission_id
+        ).all()
+
+        compiled = {}
+        for role_id, resource, action in rows:
+            compiled.setdefault(role_id, set()).add((resource, action))
+
+        with self._lock:
+            self._role_permissions = {role_id: frozenset(perms) for role_id, perms in compiled.items()}
+            self._loaded_at = time.monotonic()
+        logger.debug(f"Permission index compiled: {len(compiled)} roles")
+
+    def _snapshot(self, db: Session) -> Dict[int, FrozenSet[Tuple[str, str]]]:
+        """Return compiled index, reloading if never loaded or expired"""
+        with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at > self._ttl:
+                self.reload(db)
+            return self._role_permissions
+
+    def invalidate(self):
+        """Force reload on next lookup"""
+        with self._lock:
+            self._loaded_at = None
+
+    def permissions_for(self, db: Session, role_ids: Iterable[int]) -> FrozenSet[Tuple[str, str]]:
+        """Union of the permission sets of the given roles"""
+        index = self._snapshot(db)
+        sets = [index[role_id] for role_id in role_ids if role_id in index]
+        if not sets:
+            return EMPTY_PERMISSIONS
+        if len(sets) == 1:
+            return sets[0]
+        return frozenset().union(*sets)
+
+
+# Global instance
+permission_index = PermissionIndex()
@@ -0,0 +1,168 @@
+"""
+Per-process cache of authenticated principals.
+
+get_current_user used to run a SELECT on users for every request, and
+permission checks lazily loaded roles and permissions on top of that. The
+principal cache keeps a compact immutable snapshot of the user row plus the
+user's permission set (resolved through the compiled role index in
+app.core.permission_index), keyed by (user_id, token iat), for a short TTL.
+
+Entries are invalidated automatically when any session in this process
+commits a flush touching User, Role or Permission rows (user update, role
+assignment, deactivation, role permission changes). Invalidation is local
+to this process; other workers see the change once their entry expires:
+
+- user row and role assignment changes: within CACHE_TTL (30s);
+- role permission changes: within CACHE_TTL + INDEX_TTL (about 90s), since
+  an expired principal may be rebuilt from a permission index that is
+  itself up to INDEX_TTL old in that worker.
+
+Only ORM flushes are seen. Core and bulk statements (update(User),
+insert(user_roles), db.query(User).update(...), raw SQL) bypass the flush
+events, so code that writes users, role assignments, roles or permissions
+that way must call principal_cache.invalidate_user() (or clear(), and
+permission_index.invalidate() for role permissions) after committing, or
+stale principals stay authorized for up to CACHE_TTL in this process too.
+"""
+from types import MappingProxyType
+from typing import NamedTuple, FrozenSet, Tuple, Optional, Mapping, Any
+import threading
+import logging
+
+from cachetools import TTLCache
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.models import User, Role, Permission
+from app.models.user import user_roles
+from app.core.permission_index import permission_index
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+CACHE_TTL = 30  # seconds
+CACHE_MAXSIZE = 2000  # Maximum cached principals
+
+
+class Principal(NamedTuple):
+    """Immutable snapshot of an authenticated user"""
+    user_id: int
+    iat: Optional[int]
+    is_active: bool
+    is_superuser: bool
+    is_demo: bool
+    role_ids: FrozenSet[int]
+    permissions: FrozenSet[Tuple[str, str]]  # (resource, action)
+    attributes: Mapping[str, Any]  # Column values of the users row
+
+    def has_permission(self, resource: str, action: str) -> bool:
+        """Superusers have every permission"""
+        return self.is_superuser or (resource, action) in self.permissions
+
+
+def load_role_ids(db: Session, user_id: int) -> FrozenSet[int]:
+    """Load ids of the user's roles in one query"""
+    rows = db.query(user_roles.c.role_id).filter(user_roles.c.user_id == user_id).all()
+    return frozenset(role_id for (role_id,) in rows)
+
+
+def build_principal(db: Session, user: User, iat: Optional[int]) -> Principal:
+    """Snapshot a loaded user row"""
+    attributes = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+    role_ids = load_role_ids(db, user.id)
+    return Principal(
+        user_id=user.id,
+        iat=iat,
+        is_active=user.is_active,
+        is_superuser=user.is_superuser,
+        is_demo=user.is_demo,
+        role_ids=role_ids,
+        permissions=permission_index.permissions_for(db, role_ids),
+        attributes=MappingProxyType(attributes),
+    )
+
+
+def snapshot_user(principal: Principal) -> User:
+    """Detached User built from the snapshot without a session.
+
+    Column attributes are available; relationships cannot be loaded (use
+    attach_user() to work with the user in a session).
+    """
+    user = User(**principal.attributes)
+    make_transient_to_detached(user)
+    return user
+
+
+def attach_user(db: Session, principal: Principal) -> User:
+    """Rebuild a persistent User in the session from the snapshot without a SELECT.
+
+    Relationships (roles, manager, ...) still lazy-load on access and changes
+    to the returned instance are flushed as usual.
+    """
+    return db.merge(snapshot_user(principal), load=False)
+
+
+class PrincipalCache:
+    """Thread-safe TTL cache of principals keyed by (user_id, iat)"""
+
+    def __init__(self, ttl: int = CACHE_TTL, maxsize: int = CACHE_MAXSIZE):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.RLock()
+
+    def get(self, user_id: int, iat: Optional[int]) -> Optional[Principal]:
+        """Get cached principal"""
+        with self._lock:
+            return self._cache.get((user_id, iat))
+
+    def set(self, principal: Principal):
+        """Cache principal"""
+        with self._lock:
+            self._cache[(principal.user_id, principal.iat)] = principal
+
+    def invalidate_user(self, user_id: int):
+        """Drop all cached tokens of a user"""
+        with self._lock:
+            for key in [k for k in self._cache.keys() if k[0] == user_id]:
+                self._cache.pop(key, None)
+
+    def clear(self):
+        """Drop all cached principals"""
+        with self._lock:
+            self._cache.clear()
+
+
+# Global instance
+principal_cache = PrincipalCache()
+
+
+# ===== Automatic invalidation =====
+
+@event.listens_for(Session, "before_flush")
+def _collect_principal_changes(session, flush_context, instances):
+    """Remember which users (or all principals) a flush affects"""
+    pending = session.info.setdefault('principal_invalidation', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            if obj.id is not None:
+                pending.add(obj.id)
+        elif isinstance(obj, (Role, Permission)):
+            pending.add('*')
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_principal_changes(session):
+    """Invalidate cached principals once the changes are committed"""
+    pending = session.info.pop('principal_invalidation', None)
+    if not pending:
+        return
+    if '*' in pending:
+        permission_index.invalidate()
+        principal_cache.clear()
+    else:
+        for user_id in pending:
+            principal_cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_principal_changes(session):
+    session.info.pop('principal_invalidation', None)
@@ -0,0 +1,86 @@
+"""
+SQL profiling mode (settings.SQL_PROFILING).
+
+Builds on the per-request query tracking in app.core.metrics: every statement
+executed while serving a request is counted by shape, so lazy loads in loops
+(N+1) show up as one shape repeated many times. Each response gets
+X-DB-Query-Count / X-DB-Time-Ms headers, and routes can be given a query
+budget (HOT_ROUTE_BUDGETS plus settings.SQL_QUERY_BUDGETS). A request over
+budget is logged and reported in the headers; the response itself is left
+alone, since its transaction may already be committed. The tests in
+tests/test_query_budgets.py fail when a hot route exceeds its budget.
+"""
+from collections import Counter
+from typing import Optional, Dict, Any
+import logging
+
+from app.core.config import settings
+from app.core.metrics import RequestQueryStats
+
+logger = logging.getLogger(__name__)
+
+# Statements per request of the hot routes, with 3 to spare for the
+# principal lookup of get_current_user on a cache miss
+HOT_ROUTE_BUDGETS: Dict[str, int] = {
+    "GET /api/requests/my-requests": 4,
+    "GET /api/requests/dashboard": 9,
+    "GET /api/requests/search/suggestions": 4,
+    "GET /api/requests/{request_id}": 6,
+    "GET /api/requests/{request_id}/attachments": 6,
+}
+
+# Parsed once; keys are "METHOD /route/template" or "/route/template"
+QUERY_BUDGETS: Dict[str, int] = {**HOT_ROUTE_BUDGETS, **settings.sql_query_budgets}
+
+# Longest statement excerpt written to logs
+MAX_LOGGED_STATEMENT = 300
+
+
+def enable_statement_tracking(stats: RequestQueryStats):
+    """Count statement shapes for this request"""
+    stats.statements = Counter()
+
+
+def get_query_budget(method: str, route: str) -> Optional[int]:
+    """Query budget of a route (method-specific entry wins)"""
+    budget = QUERY_BUDGETS.get(f"{method} {route}")
+    if budget is None:
+        budget = QUERY_BUDGETS.get(route)
+    return budget
+
+
+def analyze_request(method: str, route: str, stats: RequestQueryStats) -> Dict[str, Any]:
+    """Find repeated statement shapes and check the route's query budget"""
+    repeated = {
+        shape: count for shape, count in (stats.statements or {}).items()
+        if count >= settings.SQL_N_PLUS_ONE_THRESHOLD
+    }
+    budget = get_query_budget(method, route)
+    over_budget = budget is not None and stats.count > budget
+
+    for shape, count in repeated.items():
+        logger.warning(
+            f"Possible N+1 in {method} {route}: statement executed {count} times: "
+            f"{shape[:MAX_LOGGED_STATEMENT]}"
+        )
+    if over_budget:
+        logger.warning(f"Query budget exceeded in {method} {route}: {stats.count} queries (budget {budget})")
+
+    return {
+        'repeated': repeated,
+        'budget': budget,
+        'over_budget': over_budget,
+    }
+
+
+def apply_profiling(method: str, route: str, stats: RequestQueryStats, response):
+    """Add profiling headers"""
+    report = analyze_request(method, route, stats)
+
+    response.headers["X-DB-Query-Count"] = str(stats.count)
+    response.headers["X-DB-Time-Ms"] = f"{stats.total_time * 1000:.1f}"
+    if report['repeated']:
+        response.headers["X-DB-Repeated-Statements"] = str(len(report['repeated']))
+    if report['budget'] is not None:
+        response.headers["X-DB-Query-Budget"] = str(report['budget'])
+    return response
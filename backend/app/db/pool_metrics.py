@@ -0,0 +1,219 @@
+"""
+Connection pool instrumentation.
+
+The engines in app.db.session use the pool classes below, which time every
+connection checkout (including the wait for a free connection) and count
+checkout timeouts. Physical connects and closes are counted as well, so
+connection churn is visible. Async sessions wait for a free slot before
+they check out a connection (see app.db.session.async_session); that wait
+is recorded as the queue time of the async pool.
+
+Everything is exported as Prometheus metrics (idm_db_pool_*, labelled by
+pool), which /api/metrics aggregates over all gunicorn workers through the
+multiprocess registry (see app.core.metrics). The JSON returned by
+get_pool_stats() and the /api/admin/metrics/db-pool endpoint only covers
+the worker process that serves the call (identified by its pid).
+"""
+from bisect import bisect_left
+from typing import Dict
+import os
+import threading
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+# Checkout latency histogram bucket upper bounds (ms)
+CHECKOUT_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    'idm_db_pool_checkout_seconds', 'Connection checkout time, including the wait for a free connection',
+    ['pool'], buckets=[bound / 1000 for bound in CHECKOUT_BUCKETS_MS]
+)
+DB_POOL_QUEUE_SECONDS = Histogram(
+    'idm_db_pool_queue_seconds', 'Wait for a session slot before the connection checkout',
+    ['pool'], buckets=[bound / 1000 for bound in CHECKOUT_BUCKETS_MS]
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    'idm_db_pool_checkout_timeouts_total', 'Connection checkouts that timed out',
+    ['pool']
+)
+DB_POOL_CONNECTS = Counter(
+    'idm_db_pool_connects_total', 'Physical database connections opened',
+    ['pool']
+)
+DB_POOL_CLOSES = Counter(
+    'idm_db_pool_closes_total', 'Physical database connections closed',
+    ['pool']
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    'idm_db_pool_checked_out_connections', 'Connections currently checked out',
+    ['pool'], multiprocess_mode='livesum'
+)
+DB_POOL_MAX_CONNECTIONS = Gauge(
+    'idm_db_pool_max_connections', 'Connections the pools may open (pool_size + max_overflow)',
+    ['pool'], multiprocess_mode='livesum'
+)
+
+
+class PoolMetrics:
+    """Thread-safe counters and checkout latency histogram for one pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = [0] * (len(CHECKOUT_BUCKETS_MS) + 1)  # Last bucket is +Inf
+        self._stats = {
+            'checkouts': 0,
+            'checkout_timeouts': 0,
+            'checkout_time_ms_total': 0.0,
+            'checkout_time_ms_max': 0.0,
+            'queue_waits': 0,
+            'queue_time_ms_total': 0.0,
+            'queue_time_ms_max': 0.0,
+            'connects': 0,
+            'closes': 0,
+        }
+
+    def observe_checkout(self, elapsed_ms: float, timed_out: bool = False):
+        """Record one checkout attempt"""
+        with self._lock:
+            self._buckets[bisect_left(CHECKOUT_BUCKETS_MS, elapsed_ms)] += 1
+            self._stats['checkouts'] += 1
+            self._stats['checkout_time_ms_total'] += elapsed_ms
+            if elapsed_ms > self._stats['checkout_time_ms_max']:
+                self._stats['checkout_time_ms_max'] = elapsed_ms
+            if timed_out:
+                self._stats['checkout_timeouts'] += 1
+
+    def observe_queue(self, elapsed_ms: float):
+        """Record the wait for a session slot"""
+        with self._lock:
+            self._stats['queue_waits'] += 1
+            self._stats['queue_time_ms_total'] += elapsed_ms
+            if elapsed_ms > self._stats['queue_time_ms_max']:
+                self._stats['queue_time_ms_max'] = elapsed_ms
+
+    def increment(self, key: str):
+        """Increment a counter"""
+        with self._lock:
+            self._stats[key] += 1
+
+    def snapshot(self) -> Dict:
+        """Get counters and cumulative histogram"""
+        with self._lock:
+            stats = dict(self._stats)
+            buckets = list(self._buckets)
+
+        histogram = []
+        cumulative = 0
+        for bound, count in zip(CHECKOUT_BUCKETS_MS + ['+Inf'], buckets):
+            cumulative += count
+            histogram.append({'le': bound, 'count': cumulative})
+
+        checkouts = stats['checkouts']
+        stats['checkout_time_ms_total'] = round(stats['checkout_time_ms_total'], 3)
+        stats['checkout_time_ms_max'] = round(stats['checkout_time_ms_max'], 3)
+        stats['checkout_time_ms_avg'] = round(stats['checkout_time_ms_total'] / checkouts, 3) if checkouts else 0
+        queue_waits = stats['queue_waits']
+        stats['queue_time_ms_total'] = round(stats['queue_time_ms_total'], 3)
+        stats['queue_time_ms_max'] = round(stats['queue_time_ms_max'], 3)
+        stats['queue_time_ms_avg'] = round(stats['queue_time_ms_total'] / queue_waits, 3) if queue_waits else 0
+        stats['checkout_histogram_ms'] = histogram
+        return stats
+
+
+# Metrics per pool name; survives pool re-creation on engine.dispose()
+_metrics: Dict[str, PoolMetrics] = {}
+_pools: Dict[str, QueuePool] = {}
+_registry_lock = threading.Lock()
+
+
+class _InstrumentedPoolMixin:
+    """Times _do_get() (queue wait + new connection) and counts timeouts"""
+    metrics_name = 'default'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        with _registry_lock:
+            self.metrics = _metrics.setdefault(self.metrics_name, PoolMetrics())
+            _pools[self.metrics_name] = self
+        DB_POOL_MAX_CONNECTIONS.labels(self.metrics_name).set(self.size() + max(self._max_overflow, 0))
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            conn = super()._do_get()
+            DB_POOL_CHECKED_OUT.labels(self.metrics_name).inc()
+            return conn
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.metrics.observe_checkout(elapsed * 1000, timed_out)
+            DB_POOL_CHECKOUT_SECONDS.labels(self.metrics_name).observe(elapsed)
+            if timed_out:
+                DB_POOL_CHECKOUT_TIMEOUTS.labels(self.metrics_name).inc()
+
+    def _do_return_conn(self, record):
+        DB_POOL_CHECKED_OUT.labels(self.metrics_name).dec()
+        return super()._do_return_conn(record)
+
+    def _create_connection(self):
+        self.metrics.increment('connects')
+        DB_POOL_CONNECTS.labels(self.metrics_name).inc()
+        return super()._create_connection()
+
+    def _close_connection(self, *args, **kwargs):
+        self.metrics.increment('closes')
+        DB_POOL_CLOSES.labels(self.metrics_name).inc()
+        return super()._close_connection(*args, **kwargs)
+
+
+def observe_queue_wait(pool_name: str, elapsed: float):
+    """Record `elapsed` seconds of waiting for a session slot of a pool"""
+    with _registry_lock:
+        metrics = _metrics.setdefault(pool_name, PoolMetrics())
+    metrics.observe_queue(elapsed * 1000)
+    DB_POOL_QUEUE_SECONDS.labels(pool_name).observe(elapsed)
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """QueuePool of the sync (psycopg2) engine"""
+    metrics_name = 'sync'
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool of the async (asyncpg) engine"""
+    metrics_name = 'async'
+
+
+def get_pool_stats() -> Dict:
+    """Get gauges and counters of all instrumented pools in this worker"""
+    with _registry_lock:
+        pools = dict(_pools)
+
+    result = {}
+    for name, pool in pools.items():
+        size = pool.size()
+        max_overflow = pool._max_overflow
+        result[name] = {
+            'pool_size': size,
+            'max_overflow': max_overflow,
+            'max_connections': size + max(max_overflow, 0),
+            'timeout_seconds': pool.timeout(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow_in_use': max(pool.overflow(), 0),
+            **pool.metrics.snapshot(),
+        }
+
+    return {
+        'pid': os.getpid(),
+        'pools': result,
+        # Upper bound of server connections this worker can open
+        'max_connections': sum(p['max_connections'] for p in result.values()),
+    }
+
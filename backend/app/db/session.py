@@ -1,19 +1,60 @@
-from sqlalchemy import create_engine
+from contextlib import asynccontextmanager
+import asyncio
+import time
+import weakref
+
+from sqlalchemy import create_engine, event, DDL, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.pool_metrics import InstrumentedQueuePool, InstrumentedAsyncQueuePool, observe_queue_wait
+
+POOL_OPTIONS = dict(
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE
+)
 
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    **POOL_OPTIONS
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine (asyncpg) for endpoints that should not block the event loop
+async_engine = create_async_engine(
+    make_url(settings.DATABASE_URL).set(drivername="postgresql+asyncpg"),
+    poolclass=InstrumentedAsyncQueuePool,
+    pool_size=settings.DB_ASYNC_POOL_SIZE,
+    max_overflow=settings.DB_ASYNC_MAX_OVERFLOW,
+    **POOL_OPTIONS
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False  # Attribute access after commit must not trigger implicit IO
+)
+
+# Async sessions admitted at once per event loop; one connection each
+ASYNC_SESSION_SLOTS = settings.DB_ASYNC_POOL_SIZE + settings.DB_ASYNC_MAX_OVERFLOW
+_async_session_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+    weakref.WeakKeyDictionary()
+
 Base = declarative_base()
 
+# pg_trgm provides the gin_trgm_ops search indexes declared on the models
+event.listen(
+    Base.metadata, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+
 
 def get_db():
     """Dependency for getting database session"""
@@ -22,3 +63,42 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+@asynccontextmanager
+async def async_session():
+    """AsyncSession that waits its turn for a connection in arrival order.
+
+    The async pool waits on an asyncio.Queue, where a new checkout can take
+    a returned connection ahead of the waiter that was woken for it; that
+    waiter goes back to the end of the queue. Under load a few requests
+    then wait many times longer than the rest. Sessions are therefore
+    admitted through a FIFO semaphore with one slot per pool connection, so
+    the pool itself never queues.
+    """
+    loop = asyncio.get_running_loop()
+    slots = _async_session_slots.get(loop)
+    if slots is None:
+        slots = _async_session_slots[loop] = asyncio.Semaphore(ASYNC_SESSION_SLOTS)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(slots.acquire(), settings.DB_POOL_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise exc.TimeoutError(
+            f"No async session slot free after {settings.DB_POOL_TIMEOUT}s ({ASYNC_SESSION_SLOTS} slots)"
+        ) from None
+    finally:
+        observe_queue_wait('async', time.perf_counter() - start)
+
+    try:
+        async with AsyncSessionLocal() as db:
+            yield db
+    finally:
+        slots.release()
+
+
+async def get_async_db():
+    """Dependency for getting async database session"""
+    async with async_session() as db:
+        yield db
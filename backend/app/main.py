@@ -2,14 +2,22 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from app.core.config import settings
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.metrics import (
+    HTTP_IN_FLIGHT, start_request_tracking, observe_request, route_label, render_metrics
+)
+from app.core.query_profiler import enable_statement_tracking, apply_profiling
 from app.api.endpoints import auth, users, systems, requests, admin, subsystems, approval_chain, export, dashboard_cards, sod, push
-from app.services.scheduler import start_scheduler, stop_scheduler
+from app.services.scheduler import start_scheduler, stop_scheduler, build_autocomplete_index
+from app.services.export_jobs import shutdown_export_jobs
+from app.db.session import async_engine
 import os
+import time
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -24,10 +32,14 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting background scheduler...")
     start_scheduler()
+    logger.info("Building autocomplete index...")
+    build_autocomplete_index()
     yield
     # Shutdown
     logger.info("Stopping background scheduler...")
     stop_scheduler()
+    shutdown_export_jobs()
+    await async_engine.dispose()
 
 
 app = FastAPI(
@@ -48,6 +60,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["Authorization", "Content-Type", "Accept", "Origin", "X-Requested-With"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 
@@ -66,6 +79,33 @@ async def add_security_headers(request: Request, call_next):
     return response
 
 
+# Metrics middleware (outermost, so latency includes all other middleware)
+@app.middleware("http")
+async def collect_metrics(request: Request, call_next):
+    method = request.method
+    query_stats = start_request_tracking()
+    if settings.SQL_PROFILING:
+        enable_statement_tracking(query_stats)
+    HTTP_IN_FLIGHT.labels(method).inc()
+    start = time.perf_counter()
+    status_code = 500
+    response_size = None
+    try:
+        response = await call_next(request)
+        if settings.SQL_PROFILING:
+            response = apply_profiling(method, route_label(request), query_stats, response)
+        status_code = response.status_code
+        content_length = response.headers.get("content-length")
+        response_size = int(content_length) if content_length else None
+        return response
+    finally:
+        HTTP_IN_FLIGHT.labels(method).dec()
+        observe_request(
+            method, route_label(request), status_code,
+            time.perf_counter() - start, response_size, query_stats
+        )
+
+
 # Static files for uploaded icons
 UPLOAD_DIR = "/opt/idm-system/backend/uploads/icons"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
@@ -97,3 +137,10 @@ async def root():
 @app.get("/api/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/api/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics of all workers (restricted to localhost in nginx)"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
@@ -1,10 +1,16 @@
 from app.models.user import User, Role, Permission
 from app.models.system import System, AccessRole, ApprovalChain, SystemType, AccessLevel, CriticalityLevel
-from app.models.request import AccessRequest, Approval, RequestComment, AuditLog, RequestAttachment, RequestType, RequestStatus, ApprovalStatus
+from app.models.request import AccessRequest, Approval, RequestComment, AuditLog, RequestAttachment, RequestNumberSequence, RequestType, RequestStatus, ApprovalStatus
 from app.models.recertification import AccessRecertification, RecertificationStatus
 from app.models.dashboard_card import DashboardCard, IconType
 from app.models.sod import SodConflict, SodSeverity
 from app.models.push_subscription import PushSubscription
+from app.models.stats import RequestStatusCounter, RequestStatsMonthly, RequestStatsSystem, RequestStatsRequester, ApprovalStatsMonthly
+from app.models.recommendation import (
+    RecommendationDepartmentSystem, RecommendationPositionRole,
+    RecommendationPopularSystem, RecommendationPopularRole
+)
+from app.models.effective_access import EffectiveAccess
 
 __all__ = [
     "User",
@@ -20,6 +26,7 @@ __all__ = [
     "RequestComment",
     "AuditLog",
     "RequestAttachment",
+    "RequestNumberSequence",
     "RequestType",
     "RequestStatus",
     "ApprovalStatus",
@@ -30,5 +37,15 @@ __all__ = [
     "SodConflict",
     "SodSeverity",
     "PushSubscription",
+    "RequestStatusCounter",
+    "RequestStatsMonthly",
+    "RequestStatsSystem",
+    "RequestStatsRequester",
+    "ApprovalStatsMonthly",
+    "RecommendationDepartmentSystem",
+    "RecommendationPositionRole",
+    "RecommendationPopularSystem",
+    "RecommendationPopularRole",
+    "EffectiveAccess",
 ]
 from .subsystem import Subsystem
@@ -0,0 +1,35 @@
+"""Effective (currently granted) access, denormalized for the access report.
+
+One row per approved / implemented request, maintained by
+app.services.effective_access in the same transaction as every status
+change, so the user access report reads this table (grouped by user) instead
+of filtering access_requests. The scheduler rebuilds it nightly to repair drift.
+"""
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, ForeignKey, Enum, Index
+from app.db.session import Base
+from app.models.request import RequestStatus
+
+
+class EffectiveAccess(Base):
+    """A granted access (system / role) of a user"""
+    __tablename__ = "effective_access"
+
+    request_id = Column(Integer, ForeignKey('access_requests.id', ondelete='CASCADE'), primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    system_id = Column(Integer, ForeignKey('systems.id', ondelete='CASCADE'), nullable=False)
+    subsystem_id = Column(Integer, ForeignKey('subsystems.id', ondelete='SET NULL'), nullable=True)
+    access_role_id = Column(Integer, ForeignKey('access_roles.id', ondelete='CASCADE'), nullable=False)
+
+    request_number = Column(String(50), nullable=False)
+    status = Column(Enum(RequestStatus), nullable=False)
+    is_temporary = Column(Boolean, default=False, nullable=False)
+    valid_from = Column(Date, nullable=True)
+    valid_until = Column(Date, nullable=True)
+    granted_at = Column(DateTime(timezone=True), nullable=False)  # completed_at, else created_at
+
+    __table_args__ = (
+        # Report pages: users in id order, their accesses in request order
+        Index('ix_effective_access_user_request', 'user_id', 'request_id'),
+        # Report filtered by system
+        Index('ix_effective_access_system_user', 'system_id', 'user_id'),
+    )
@@ -0,0 +1,49 @@
+"""Precomputed frequency tables for access recommendations.
+
+Rebuilt periodically by app.services.recommendations from granted
+(approved / implemented) requests created within the popularity window, so
+/requests/recommendations only reads a few rows instead of aggregating
+access_requests on every call.
+"""
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from app.db.session import Base
+
+
+class RecommendationDepartmentSystem(Base):
+    """Granted requests per target user department and system"""
+    __tablename__ = "recommendation_department_system"
+
+    department = Column(String(255), primary_key=True)
+    system_id = Column(Integer, ForeignKey('systems.id', ondelete='CASCADE'), primary_key=True)
+    request_count = Column(Integer, default=0, nullable=False)
+
+
+class RecommendationPositionRole(Base):
+    """Granted requests per target user position and role"""
+    __tablename__ = "recommendation_position_role"
+
+    position = Column(String(255), primary_key=True)
+    system_id = Column(Integer, ForeignKey('systems.id', ondelete='CASCADE'), primary_key=True)
+    access_role_id = Column(Integer, ForeignKey('access_roles.id', ondelete='CASCADE'), primary_key=True)
+    request_count = Column(Integer, default=0, nullable=False)
+
+
+class RecommendationPopularSystem(Base):
+    """Granted requests per system across the organization"""
+    __tablename__ = "recommendation_popular_system"
+
+    system_id = Column(Integer, ForeignKey('systems.id', ondelete='CASCADE'), primary_key=True)
+    request_count = Column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        Index('ix_recommendation_popular_system_count', 'request_count'),
+    )
+
+
+class RecommendationPopularRole(Base):
+    """Granted requests per role across the organization"""
+    __tablename__ = "recommendation_popular_role"
+
+    system_id = Column(Integer, ForeignKey('systems.id', ondelete='CASCADE'), primary_key=True)
+    access_role_id = Column(Integer, ForeignKey('access_roles.id', ondelete='CASCADE'), primary_key=True)
+    request_count = Column(Integer, default=0, nullable=False)
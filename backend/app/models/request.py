@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum, Date
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum, Date, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -71,6 +71,43 @@ class AccessRequest(Base):
     audit_logs = relationship("AuditLog", back_populates="request", cascade="all, delete-orphan")
     attachments = relationship("RequestAttachment", back_populates="request", cascade="all, delete-orphan", order_by="RequestAttachment.uploaded_at.desc()")
 
+    __table_args__ = (
+        # Roles held by a user (SoD checks, access reports)
+        Index('ix_access_requests_target_user_status', 'target_user_id', 'status'),
+        # "My requests" listing, keyset-paginated on (created_at, id)
+        Index('ix_access_requests_requester_created', 'requester_id', 'created_at', 'id'),
+        # Expiry jobs: only temporary grants are ever scanned by valid_until
+        Index(
+            'ix_access_requests_temporary_expiry', 'status', 'valid_until',
+            postgresql_where=text('is_temporary')
+        ),
+        # Search: requests of matched systems/subsystems
+        Index('ix_access_requests_system_id', 'system_id'),
+        Index('ix_access_requests_subsystem_id', 'subsystem_id'),
+        # Suggestions: request number prefix (LIKE 'REQ-2026-%' regardless of collation)
+        Index(
+            'ix_access_requests_request_number_prefix', 'request_number',
+            postgresql_ops={'request_number': 'text_pattern_ops'}
+        ),
+        # Search: ILIKE '%q%' on request number and purpose (pg_trgm)
+        Index(
+            'ix_access_requests_request_number_trgm', 'request_number',
+            postgresql_using='gin', postgresql_ops={'request_number': 'gin_trgm_ops'}
+        ),
+        Index(
+            'ix_access_requests_purpose_trgm', 'purpose',
+            postgresql_using='gin', postgresql_ops={'purpose': 'gin_trgm_ops'}
+        ),
+    )
+
+
+class RequestNumberSequence(Base):
+    """Per-year counter used to allocate request numbers (REQ-YYYY-NNNNN)"""
+    __tablename__ = "request_number_sequences"
+
+    year = Column(Integer, primary_key=True)
+    last_value = Column(Integer, default=0, nullable=False)  # Last allocated number in this year
+
 
 class ApprovalStatus(str, enum.Enum):
     PENDING = "pending"
@@ -100,6 +137,16 @@ class Approval(Base):
     request = relationship("AccessRequest", back_populates="approvals")
     approver = relationship("User")
 
+    __table_args__ = (
+        # "My approvals" inbox: approver + status lookup, request_id for index-only semi-joins
+        Index('ix_approvals_approver_status_request', 'approver_id', 'status', 'request_id'),
+        # Approvals of a request, and the approver's step when deciding
+        Index('ix_approvals_request_approver_status', 'request_id', 'approver_id', 'status'),
+        # Decision history (/my-decisions), newest decision first
+        Index('ix_approvals_approver_decision_date', 'approver_id', 'decision_date',
+              postgresql_ops={'decision_date': 'DESC NULLS LAST'}),
+    )
+
 
 class RequestComment(Base):
     """Comments on access requests"""
@@ -137,6 +184,13 @@ class AuditLog(Base):
     request = relationship("AccessRequest", back_populates="audit_logs")
     user = relationship("User")
 
+    __table_args__ = (
+        # Audit log listing, keyset-paginated on (created_at, id)
+        Index('ix_audit_logs_created_id', 'created_at', 'id'),
+        # Request history and cascading deletes
+        Index('ix_audit_logs_request_id', 'request_id'),
+    )
+
 
 class RequestAttachment(Base):
     """File attachments for access requests (regulations, letters, external approvals)"""
@@ -1,5 +1,5 @@
 """Segregation of Duties (SoD) model for conflict management"""
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -51,3 +51,9 @@ class SodConflict(Base):
     role_a = relationship("AccessRole", foreign_keys=[role_a_id])
     role_b = relationship("AccessRole", foreign_keys=[role_b_id])
     created_by = relationship("User", foreign_keys=[created_by_id])
+
+    __table_args__ = (
+        # Conflict lookups from either side; also used by ON DELETE CASCADE from access_roles
+        Index('ix_sod_conflicts_role_a_id', 'role_a_id'),
+        Index('ix_sod_conflicts_role_b_id', 'role_b_id'),
+    )
@@ -0,0 +1,59 @@
+"""Pre-aggregated request statistics (dashboard summary tables).
+
+These tables are maintained incrementally by app.services.request_stats whenever
+a request is created or changes status, so the dashboard never has to scan
+access_requests / approvals. A nightly job rebuilds them from scratch to repair drift.
+"""
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Enum, Index
+from app.db.session import Base
+from app.models.request import RequestStatus
+
+
+class RequestStatusCounter(Base):
+    """Total number of requests per status (O(1) status totals)"""
+    __tablename__ = "request_status_counters"
+
+    status = Column(Enum(RequestStatus), primary_key=True)
+    request_count = Column(Integer, default=0, nullable=False)
+
+
+class RequestStatsMonthly(Base):
+    """Request counts per creation month (YYYY-MM) and status"""
+    __tablename__ = "request_stats_monthly"
+
+    month = Column(String(7), primary_key=True)  # e.g., "2025-01"
+    status = Column(Enum(RequestStatus), primary_key=True)
+    request_count = Column(Integer, default=0, nullable=False)
+
+
+class RequestStatsSystem(Base):
+    """Request counts per system and status"""
+    __tablename__ = "request_stats_system"
+
+    system_id = Column(Integer, ForeignKey('systems.id', ondelete='CASCADE'), primary_key=True)
+    status = Column(Enum(RequestStatus), primary_key=True)
+    request_count = Column(Integer, default=0, nullable=False)
+
+
+class RequestStatsRequester(Base):
+    """Total number of requests created per requester"""
+    __tablename__ = "request_stats_requester"
+
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    request_count = Column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        Index('ix_request_stats_requester_count', 'request_count'),
+    )
+
+
+class ApprovalStatsMonthly(Base):
+    """Approved approval steps per decision month with approval time aggregates (hours)"""
+    __tablename__ = "approval_stats_monthly"
+
+    month = Column(String(7), primary_key=True)
+    approved_count = Column(Integer, default=0, nullable=False)  # All approved steps
+    timed_count = Column(Integer, default=0, nullable=False)  # Steps with a positive approval time
+    total_hours = Column(Float, default=0, nullable=False)
+    min_hours = Column(Float, nullable=True)
+    max_hours = Column(Float, nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.session import Base
@@ -18,3 +18,8 @@ class Subsystem(Base):
 
     # Relationships
     system = relationship("System", back_populates="subsystems")
+
+    __table_args__ = (
+        # Search: ILIKE '%q%' on name (pg_trgm)
+        Index('ix_subsystems_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+    )
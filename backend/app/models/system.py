@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -52,6 +52,11 @@ class System(Base):
     access_roles = relationship("AccessRole", back_populates="system", cascade="all, delete-orphan")
     approval_chains = relationship("ApprovalChain", back_populates="system", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Search: ILIKE '%q%' on name (pg_trgm)
+        Index('ix_systems_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+    )
+
 
 class AccessLevel(str, enum.Enum):
     READ = "read"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Table, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Table, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.session import Base
@@ -61,6 +61,11 @@ class User(Base):
     created_requests = relationship("AccessRequest", foreign_keys="AccessRequest.requester_id", back_populates="requester")
     target_requests = relationship("AccessRequest", foreign_keys="AccessRequest.target_user_id", back_populates="target_user")
 
+    __table_args__ = (
+        # Search: ILIKE '%q%' on full name (pg_trgm)
+        Index('ix_users_full_name_trgm', 'full_name', postgresql_using='gin', postgresql_ops={'full_name': 'gin_trgm_ops'}),
+    )
+
 
 class Role(Base):
     __tablename__ = "roles"
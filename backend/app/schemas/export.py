@@ -0,0 +1,62 @@
+"""Schemas for background export jobs"""
+from pydantic import BaseModel
+from typing import Optional, Dict, Any, Literal
+from datetime import datetime
+
+
+# ============ Export parameters per kind ============
+
+class RequestsExportParams(BaseModel):
+    """Full requests workbook (no parameters)"""
+    model_config = {"extra": "forbid"}
+
+
+class UserAccessExportParams(BaseModel):
+    """User access report"""
+    system_id: Optional[int] = None
+
+    model_config = {"extra": "forbid"}
+
+
+class AuditLogExportParams(BaseModel):
+    """Audit log, same filters as the audit log list"""
+    user_id: Optional[int] = None
+    action: Optional[str] = None
+    request_id: Optional[int] = None
+    date_from: Optional[str] = None
+    date_to: Optional[str] = None
+    search: Optional[str] = None
+
+    model_config = {"extra": "forbid"}
+
+
+class ColumnarExportParams(BaseModel):
+    """Parquet / Arrow IPC dataset (no parameters)"""
+    model_config = {"extra": "forbid"}
+
+
+# ============ Jobs ============
+
+class ExportJobCreate(BaseModel):
+    """Export spec"""
+    kind: Literal[
+        'requests_excel', 'user_access_excel', 'audit_logs_csv',
+        'requests_parquet', 'requests_arrow', 'approvals_parquet', 'approvals_arrow',
+        'audit_logs_parquet', 'audit_logs_arrow',
+    ]
+    params: Dict[str, Any] = {}
+
+
+class ExportJobResponse(BaseModel):
+    """Export job state"""
+    id: str
+    kind: str
+    params: Dict[str, Any]
+    status: str  # queued, running, completed, failed
+    rows: int = 0
+    cached: bool = False
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    download_url: Optional[str] = None
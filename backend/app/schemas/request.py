@@ -239,9 +239,12 @@ class MyRequestsSummary(BaseModel):
 
 
 # Bulk Request Schemas
+MAX_BULK_REQUEST_USERS = 1000
+
+
 class BulkRequestCreate(BaseModel):
     """Input data for creating multiple requests at once"""
-    user_ids: List[int] = Field(..., min_length=1, max_length=20)
+    user_ids: List[int] = Field(..., min_length=1, max_length=MAX_BULK_REQUEST_USERS)
     system_id: int
     subsystem_id: Optional[int] = None
     access_role_id: int
@@ -252,12 +255,22 @@ class BulkRequestCreate(BaseModel):
     valid_until: Optional[date] = None
 
 
+class BulkRequestResult(BaseModel):
+    """Outcome of bulk request creation for a single user"""
+    user_id: int
+    status: str  # created, skipped
+    request_id: Optional[int] = None
+    request_number: Optional[str] = None
+    reason: Optional[str] = None
+
+
 class BulkRequestResponse(BaseModel):
     """Response for bulk request creation"""
     total: int
     created: int
     skipped: List[dict] = []
     request_ids: List[int]
+    results: List[BulkRequestResult] = []
 
 
 # Attachment Schemas
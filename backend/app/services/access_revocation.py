@@ -9,6 +9,8 @@ import logging
 
 from app.models.request import AccessRequest, RequestStatus
 from app.models import AuditLog
+from app.services.request_stats import record_status_change, get_status_count
+from app.services.effective_access import record_access_change
 
 logger = logging.getLogger(__name__)
 
@@ -63,6 +65,8 @@ def revoke_expired_access(db: Session, request: AccessRequest, auto: bool = True
         old_status = request.status
         request.status = RequestStatus.EXPIRED
         request.updated_at = datetime.now(timezone.utc)
+        record_status_change(db, request, old_status)
+        record_access_change(db, request, old_status)
 
         # Create audit log entry
         audit_log = AuditLog(
@@ -120,10 +124,8 @@ def get_revocation_stats(db: Session) -> Dict[str, Any]:
         )
     ).scalar() or 0
 
-    # Already expired (status = EXPIRED)
-    already_expired = db.query(func.count(AccessRequest.id)).filter(
-        AccessRequest.status == RequestStatus.EXPIRED
-    ).scalar() or 0
+    # Already expired (status = EXPIRED), read from the status counters
+    already_expired = get_status_count(db, RequestStatus.EXPIRED)
 
     # Expiring today
     expiring_today = db.query(func.count(AccessRequest.id)).filter(
@@ -0,0 +1,186 @@
+"""
+Audit log export.
+
+Rows are selected as plain columns and read through a server-side cursor,
+EXPORT_CHUNK_SIZE at a time, and encoded (CSV or NDJSON, optionally gzip)
+into chunks of about STREAM_BUFFER_SIZE as they arrive. The export is not
+capped and memory does not grow with the number of log entries.
+"""
+from datetime import datetime
+from typing import Optional, List, Iterable, Iterator
+import csv
+import io
+import json
+import logging
+import zlib
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models import AuditLog, User
+from app.services.excel_export import EXPORT_CHUNK_SIZE, Progress, stream_rows
+
+logger = logging.getLogger(__name__)
+
+CSV_HEADERS = ['Date', 'User', 'Action', 'Details', 'Request ID', 'IP Address']
+
+# Export format -> media type
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+EXPORT_FORMAT_PATTERN = "^(csv|ndjson)$"
+
+# Encoded output is emitted once this much text has accumulated
+STREAM_BUFFER_SIZE = 64 * 1024
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+def audit_log_filters(
+    user_id: Optional[int] = None,
+    action: Optional[str] = None,
+    request_id: Optional[int] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    search: Optional[str] = None,
+) -> List:
+    """WHERE conditions of the audit log list filters (invalid dates are ignored)"""
+    conditions = []
+    if user_id:
+        conditions.append(AuditLog.user_id == user_id)
+    if action:
+        conditions.append(AuditLog.action == action)
+    if request_id:
+        conditions.append(AuditLog.request_id == request_id)
+    from_date = _parse_date(date_from)
+    if from_date:
+        conditions.append(AuditLog.created_at >= from_date)
+    to_date = _parse_date(date_to)
+    if to_date:
+        conditions.append(AuditLog.created_at <= to_date)
+    if search:
+        conditions.append(AuditLog.details.ilike(f"%{search}%"))
+    return conditions
+
+
+def audit_log_statement(**filters):
+    """Export rows, newest first"""
+    return select(
+        AuditLog.id,
+        AuditLog.created_at,
+        AuditLog.user_id,
+        User.full_name.label('user_name'),
+        AuditLog.action,
+        AuditLog.details,
+        AuditLog.request_id,
+        AuditLog.ip_address,
+    ).select_from(AuditLog).outerjoin(
+        User, User.id == AuditLog.user_id
+    ).where(
+        *audit_log_filters(**filters)
+    ).order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
+
+
+def csv_row(log) -> list:
+    return [
+        log.created_at.isoformat() if log.created_at else '',
+        log.user_name or 'System',
+        log.action,
+        log.details or '',
+        log.request_id or '',
+        log.ip_address or '',
+    ]
+
+
+def json_row(log) -> dict:
+    return {
+        'id': log.id,
+        'created_at': log.created_at.isoformat() if log.created_at else None,
+        'user_id': log.user_id,
+        'user': log.user_name or 'System',
+        'action': log.action,
+        'details': log.details,
+        'request_id': log.request_id,
+        'ip_address': log.ip_address,
+    }
+
+
+def encode_rows(rows: Iterable, format: str = 'csv') -> Iterator[str]:
+    """Encode export rows, yielding text chunks of about STREAM_BUFFER_SIZE"""
+    buffer = io.StringIO()
+    writer = None
+    if format == 'csv':
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_HEADERS)
+
+    for log in rows:
+        if writer:
+            writer.writerow(csv_row(log))
+        else:
+            buffer.write(json.dumps(json_row(log), ensure_ascii=False))
+            buffer.write('\n')
+        if buffer.tell() >= STREAM_BUFFER_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Compress a byte stream into a single gzip member"""
+    compressor = zlib.compressobj(wbits=31)  # 31: gzip header and trailer
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_audit_logs(format: str = 'csv', compress: bool = False, **filters) -> Iterator[bytes]:
+    """Encoded audit log export for a StreamingResponse.
+
+    Uses its own session: request-scoped sessions are closed before a
+    streaming response body is sent.
+    """
+    db = SessionLocal()
+    try:
+        chunks = (
+            chunk.encode('utf-8')
+            for chunk in encode_rows(stream_rows(db, audit_log_statement(**filters)), format)
+        )
+        if compress:
+            chunks = gzip_chunks(chunks)
+        yield from chunks
+    finally:
+        db.close()
+
+
+def write_audit_logs_csv(db: Session, path: str, progress: Progress = None, **filters) -> int:
+    """Write the filtered audit log to a CSV file; returns the number of rows"""
+    total = 0
+
+    def counted(rows):
+        nonlocal total
+        for row in rows:
+            total += 1
+            if progress and total % EXPORT_CHUNK_SIZE == 0:
+                progress(total)
+            yield row
+
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        for chunk in encode_rows(counted(stream_rows(db, audit_log_statement(**filters)))):
+            f.write(chunk)
+
+    logger.info(f"Audit log export written: {total} rows")
+    return total
@@ -0,0 +1,200 @@
+"""
+In-process autocomplete index for search suggestions.
+
+Every worker keeps the names of active systems, subsystems and active users
+in memory with a trigram index, so /requests/search/suggestions answers
+name lookups without touching the database. The index is built at startup
+(or on first use), updated incrementally when a session in this process
+commits changes to those entities, and fully rebuilt by the scheduler every
+REFRESH_INTERVAL seconds to pick up changes made by other workers.
+"""
+from collections import defaultdict
+from typing import NamedTuple, Dict, List, Set, Tuple, Optional
+import heapq
+import threading
+import time
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models import System, User
+from app.models.subsystem import Subsystem
+
+logger = logging.getLogger(__name__)
+
+# Full rebuild interval (seconds); bounds staleness across workers
+REFRESH_INTERVAL = 300
+
+# Shortest query answered from the index
+MIN_QUERY_LENGTH = 2
+
+# Suggestion kind of each indexed model
+KINDS = {System: 'system', Subsystem: 'subsystem', User: 'user'}
+
+
+class Suggestion(NamedTuple):
+    kind: str
+    id: int
+    name: str
+    folded: str  # casefolded name
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _visible_name(obj) -> Optional[str]:
+    """Name to index for a model instance, or None if it should not be suggested"""
+    if isinstance(obj, User):
+        return obj.full_name if obj.is_active else None
+    if isinstance(obj, System):
+        return obj.name if obj.is_active else None
+    return obj.name
+
+
+def _rank(entry: Suggestion, q: str) -> Tuple:
+    """Sort key: whole-name prefix, then word prefix, then shorter names"""
+    if entry.folded.startswith(q):
+        position = 0
+    elif any(word.startswith(q) for word in entry.folded.split()):
+        position = 1
+    else:
+        position = 2
+    return (position, len(entry.folded), entry.folded)
+
+
+class AutocompleteIndex:
+    """Thread-safe trigram index of suggestion names"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries: Dict[Tuple[str, int], Suggestion] = {}
+        self._postings: Dict[str, Set[Tuple[str, int]]] = defaultdict(set)
+        self._loaded_at: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def rebuild(self, db: Session):
+        """Load all suggestion names from the database"""
+        rows = [
+            ('system', system_id, name)
+            for system_id, name in db.query(System.id, System.name).filter(System.is_active == True)
+        ] + [
+            ('subsystem', subsystem_id, name)
+            for subsystem_id, name in db.query(Subsystem.id, Subsystem.name)
+        ] + [
+            ('user', user_id, name)
+            for user_id, name in db.query(User.id, User.full_name).filter(User.is_active == True)
+        ]
+
+        entries = {}
+        postings = defaultdict(set)
+        for kind, entity_id, name in rows:
+            entry = Suggestion(kind, entity_id, name, name.casefold())
+            entries[(kind, entity_id)] = entry
+            for trigram in _trigrams(entry.folded):
+                postings[trigram].add((kind, entity_id))
+
+        with self._lock:
+            self._entries = entries
+            self._postings = postings
+            self._loaded_at = time.time()
+
+        logger.info(f"Autocomplete index rebuilt: {len(entries)} entries")
+
+    def _discard(self, key: Tuple[str, int]):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for trigram in _trigrams(entry.folded):
+            keys = self._postings.get(trigram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[trigram]
+
+    def remove(self, kind: str, entity_id: int):
+        """Drop an entity from the index"""
+        with self._lock:
+            self._discard((kind, entity_id))
+
+    def upsert(self, kind: str, entity_id: int, name: str):
+        """Add or rename an entity"""
+        key = (kind, entity_id)
+        entry = Suggestion(kind, entity_id, name, name.casefold())
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = entry
+            for trigram in _trigrams(entry.folded):
+                self._postings[trigram].add(key)
+
+    def search(self, q: str, per_kind: int = 3) -> Dict[str, List[Suggestion]]:
+        """Best matches of q (substring, case-insensitive) per kind"""
+        folded = q.casefold()
+        if len(folded) < MIN_QUERY_LENGTH:
+            return {}
+
+        with self._lock:
+            if len(folded) < 3:
+                candidates = self._entries.values()
+            else:
+                # A substring contains every trigram of the query
+                postings = sorted(
+                    (self._postings.get(trigram, ()) for trigram in _trigrams(folded)),
+                    key=len
+                )
+                keys = set(postings[0]).intersection(*postings[1:])
+                candidates = [self._entries[key] for key in keys]
+
+            by_kind = defaultdict(list)
+            for entry in candidates:
+                if folded in entry.folded:
+                    by_kind[entry.kind].append(entry)
+
+        return {
+            kind: heapq.nsmallest(per_kind, entries, key=lambda entry: _rank(entry, folded))
+            for kind, entries in by_kind.items()
+        }
+
+
+# Global instance
+autocomplete_index = AutocompleteIndex()
+
+
+# ===== Incremental updates =====
+
+@event.listens_for(Session, "after_flush")
+def _collect_autocomplete_changes(session, flush_context):
+    """Remember indexed entities changed by a flush (ids are assigned by now)"""
+    if not autocomplete_index.loaded:
+        return
+    pending = session.info.setdefault('autocomplete_changes', {})
+    for obj in session.deleted:
+        kind = KINDS.get(type(obj))
+        if kind:
+            pending[(kind, obj.id)] = None
+    for obj in list(session.new) + list(session.dirty):
+        kind = KINDS.get(type(obj))
+        if kind:
+            pending[(kind, obj.id)] = _visible_name(obj)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_autocomplete_changes(session):
+    """Apply committed changes to the index"""
+    pending = session.info.pop('autocomplete_changes', None)
+    if not pending:
+        return
+    for (kind, entity_id), name in pending.items():
+        if name is None:
+            autocomplete_index.remove(kind, entity_id)
+        else:
+            autocomplete_index.upsert(kind, entity_id, name)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_autocomplete_changes(session):
+    session.info.pop('autocomplete_changes', None)
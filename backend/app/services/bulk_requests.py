@@ -0,0 +1,204 @@
+"""
+Set-based bulk creation of access requests.
+
+Instead of looking up each target user, the approval chain and the fallback
+security officer once per user, everything is prefetched with a handful of
+queries and requests, approvals and audit log entries are written with
+multi-row INSERTs. The number of statements does not depend on the number
+of users in the batch.
+"""
+from typing import List, Dict, Any, Optional
+import logging
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models import (
+    AccessRequest, Approval, AuditLog, User, ApprovalChain,
+    RequestStatus, ApprovalStatus
+)
+from app.core.constants import ApproverRoles
+from app.schemas.request import BulkRequestCreate
+from app.services.request_numbers import allocate_request_numbers
+from app.services.request_stats import record_requests_created
+from app.services.sod_graph import get_hard_block_conflicts
+
+logger = logging.getLogger(__name__)
+
+
+def _get_hard_block_conflicts(db: Session, role_id: int, user_ids: List[int]) -> Dict[int, dict]:
+    """Map user_id -> first hard-block SoD conflict between role_id and the user's existing roles"""
+    conflicting_roles = get_hard_block_conflicts(db, role_id)
+    if not conflicting_roles or not user_ids:
+        return {}
+
+    existing = db.query(AccessRequest.target_user_id, AccessRequest.access_role_id).filter(
+        AccessRequest.target_user_id.in_(user_ids),
+        AccessRequest.access_role_id.in_(list(conflicting_roles.keys())),
+        AccessRequest.status.in_([RequestStatus.APPROVED, RequestStatus.IMPLEMENTED])
+    ).distinct().all()
+
+    blocked = {}
+    for user_id, existing_role_id in existing:
+        blocked.setdefault(user_id, conflicting_roles[existing_role_id])
+    return blocked
+
+
+def create_bulk_requests(
+    db: Session,
+    request_in: BulkRequestCreate,
+    requester: User,
+    ip_address: Optional[str] = None
+) -> Dict[str, Any]:
+    """Create one DRAFT request per target user in a single set-based pass.
+
+    Returns dict matching BulkRequestResponse, including a per-user result list.
+    The caller is responsible for committing.
+    """
+    user_ids = list(request_in.user_ids)
+    results = {}  # position in user_ids -> result dict
+
+    # ===== Prefetch everything once =====
+    users = {
+        u.id: u for u in db.query(
+            User.id, User.full_name, User.is_active, User.manager_id
+        ).filter(User.id.in_(set(user_ids))).all()
+    }
+
+    approval_chains = db.query(ApprovalChain).filter(
+        ApprovalChain.system_id == request_in.system_id
+    ).order_by(ApprovalChain.step_number).all()
+
+    security_user_id = None
+    if not approval_chains:
+        security_user_id = db.query(User.id).filter(User.is_superuser == True).limit(1).scalar()
+
+    blocked = _get_hard_block_conflicts(db, request_in.access_role_id, list(users.keys()))
+
+    # ===== Validate =====
+    valid_positions = []
+    seen = set()
+    for position, user_id in enumerate(user_ids):
+        target_user = users.get(user_id)
+        reason = None
+        if user_id in seen:
+            reason = "Duplicate user in request"
+        elif not target_user:
+            reason = "User not found"
+        elif not target_user.is_active:
+            reason = "User is inactive"
+        elif user_id in blocked:
+            reason = f"SoD конфликт: {blocked[user_id]['conflict_name']}"
+        seen.add(user_id)
+
+        if reason:
+            results[position] = {"user_id": user_id, "status": "skipped", "reason": reason}
+        else:
+            valid_positions.append(position)
+
+    created = []
+    if valid_positions:
+        # ===== Insert requests (multi-row INSERT ... RETURNING) =====
+        request_numbers = allocate_request_numbers(db, len(valid_positions))
+        request_rows = [
+            {
+                "request_number": request_number,
+                "requester_id": requester.id,
+                "target_user_id": user_ids[position],
+                "system_id": request_in.system_id,
+                "subsystem_id": request_in.subsystem_id,
+                "access_role_id": request_in.access_role_id,
+                "request_type": request_in.request_type,
+                "purpose": request_in.purpose,
+                "is_temporary": request_in.is_temporary,
+                "valid_from": request_in.valid_from,
+                "valid_until": request_in.valid_until,
+                "status": RequestStatus.DRAFT,
+                "current_step": 1,
+            }
+            for position, request_number in zip(valid_positions, request_numbers)
+        ]
+        created = db.execute(
+            insert(AccessRequest).returning(
+                AccessRequest.id,
+                AccessRequest.request_number,
+                AccessRequest.target_user_id,
+                AccessRequest.requester_id,
+                AccessRequest.system_id,
+                AccessRequest.status,
+                AccessRequest.created_at,
+                sort_by_parameter_order=True
+            ),
+            request_rows
+        ).all()
+
+        # ===== Insert approvals and audit log entries =====
+        approval_rows = []
+        audit_rows = []
+        for row in created:
+            target_user = users[row.target_user_id]
+
+            if approval_chains:
+                for chain in approval_chains:
+                    approval_rows.append({
+                        "request_id": row.id,
+                        "step_number": chain.step_number,
+                        "approver_id": chain.approver_id,
+                        "approver_role": chain.approver_role,
+                        "status": ApprovalStatus.PENDING,
+                    })
+            else:
+                # Default fallback if no chain configured
+                if target_user.manager_id:
+                    approval_rows.append({
+                        "request_id": row.id,
+                        "step_number": 1,
+                        "approver_id": target_user.manager_id,
+                        "approver_role": ApproverRoles.MANAGER,
+                        "status": ApprovalStatus.PENDING,
+                    })
+                if security_user_id:
+                    approval_rows.append({
+                        "request_id": row.id,
+                        "step_number": 2,
+                        "approver_id": security_user_id,
+                        "approver_role": ApproverRoles.SECURITY_OFFICER,
+                        "status": ApprovalStatus.PENDING,
+                    })
+
+            audit_rows.append({
+                "request_id": row.id,
+                "user_id": requester.id,
+                "action": "created",
+                "details": f"Bulk request created for user {target_user.full_name}",
+                "ip_address": ip_address,
+            })
+
+        if approval_rows:
+            db.execute(insert(Approval), approval_rows)
+        db.execute(insert(AuditLog), audit_rows)
+
+        record_requests_created(db, created)
+
+        for position, row in zip(valid_positions, created):
+            results[position] = {
+                "user_id": row.target_user_id,
+                "status": "created",
+                "request_id": row.id,
+                "request_number": row.request_number,
+            }
+
+    ordered_results = [results[position] for position in range(len(user_ids))]
+    logger.info(f"Bulk request by user {requester.id}: {len(created)} created, "
+                f"{len(user_ids) - len(created)} skipped")
+
+    return {
+        "total": len(user_ids),
+        "created": len(created),
+        "skipped": [
+            {"user_id": r["user_id"], "reason": r["reason"]}
+            for r in ordered_results if r["status"] == "skipped"
+        ],
+        "request_ids": [row.id for row in created],
+        "results": ordered_results,
+    }
@@ -0,0 +1,279 @@
+"""
+Columnar export (Apache Parquet / Arrow IPC) for analytics.
+
+Requests, approvals and the audit log are read through a server-side
+cursor and converted to Arrow record batches of COLUMNAR_BATCH_SIZE rows,
+so memory does not grow with the table. Columns are typed (integers,
+timestamps with time zone, dates, booleans); enums and repeated names
+(status, system, role, action) are dictionary-encoded.
+
+The exports run as background jobs (kinds <dataset>_<format>, see
+app.services.export_jobs), never inside an HTTP request. pyarrow is
+imported on first use; without it these jobs fail and the rest of the
+application is unaffected.
+"""
+from typing import Dict, List
+import enum
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, aliased
+
+from app.models import AccessRequest, Approval, AuditLog, User, System, AccessRole
+from app.models.subsystem import Subsystem
+from app.services.excel_export import Progress
+
+logger = logging.getLogger(__name__)
+
+# Rows per record batch (and Parquet row group)
+COLUMNAR_BATCH_SIZE = 20000
+
+# Format -> (media type, file suffix)
+COLUMNAR_FORMATS = {
+    'parquet': ('application/vnd.apache.parquet', '.parquet'),
+    'arrow': ('application/vnd.apache.arrow.file', '.arrow'),
+}
+
+
+class ColumnarExportUnavailable(Exception):
+    """pyarrow is not installed"""
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ColumnarExportUnavailable("Columnar export requires pyarrow")
+    return pyarrow
+
+
+# ===== Datasets =====
+# Each dataset is a list of (column name, arrow type) matching its SELECT
+
+REQUEST_COLUMNS = [
+    ('id', 'int64'),
+    ('request_number', 'string'),
+    ('status', 'dictionary'),
+    ('request_type', 'dictionary'),
+    ('system_id', 'int32'),
+    ('system_name', 'dictionary'),
+    ('subsystem_id', 'int32'),
+    ('subsystem_name', 'dictionary'),
+    ('access_role_id', 'int32'),
+    ('access_role_name', 'dictionary'),
+    ('requester_id', 'int32'),
+    ('target_user_id', 'int32'),
+    ('target_user_name', 'string'),
+    ('target_user_department', 'dictionary'),
+    ('current_step', 'int16'),
+    ('is_temporary', 'bool'),
+    ('valid_from', 'date'),
+    ('valid_until', 'date'),
+    ('created_at', 'timestamp'),
+    ('updated_at', 'timestamp'),
+    ('submitted_at', 'timestamp'),
+    ('completed_at', 'timestamp'),
+    ('purpose', 'string'),
+]
+
+
+def _requests_statement():
+    target_user = aliased(User)
+    return select(
+        AccessRequest.id,
+        AccessRequest.request_number,
+        AccessRequest.status,
+        AccessRequest.request_type,
+        AccessRequest.system_id,
+        System.name,
+        AccessRequest.subsystem_id,
+        Subsystem.name,
+        AccessRequest.access_role_id,
+        AccessRole.name,
+        AccessRequest.requester_id,
+        AccessRequest.target_user_id,
+        target_user.full_name,
+        target_user.department,
+        AccessRequest.current_step,
+        AccessRequest.is_temporary,
+        AccessRequest.valid_from,
+        AccessRequest.valid_until,
+        AccessRequest.created_at,
+        AccessRequest.updated_at,
+        AccessRequest.submitted_at,
+        AccessRequest.completed_at,
+        AccessRequest.purpose,
+    ).select_from(AccessRequest).outerjoin(
+        System, System.id == AccessRequest.system_id
+    ).outerjoin(
+        Subsystem, Subsystem.id == AccessRequest.subsystem_id
+    ).outerjoin(
+        AccessRole, AccessRole.id == AccessRequest.access_role_id
+    ).outerjoin(
+        target_user, target_user.id == AccessRequest.target_user_id
+    ).order_by(AccessRequest.id)
+
+
+APPROVAL_COLUMNS = [
+    ('id', 'int64'),
+    ('request_id', 'int64'),
+    ('request_number', 'string'),
+    ('system_name', 'dictionary'),
+    ('access_role_name', 'dictionary'),
+    ('step_number', 'int16'),
+    ('approver_id', 'int32'),
+    ('approver_name', 'dictionary'),
+    ('approver_role', 'dictionary'),
+    ('status', 'dictionary'),
+    ('created_at', 'timestamp'),
+    ('decision_date', 'timestamp'),
+    ('comment', 'string'),
+]
+
+
+def _approvals_statement():
+    return select(
+        Approval.id,
+        Approval.request_id,
+        AccessRequest.request_number,
+        System.name,
+        AccessRole.name,
+        Approval.step_number,
+        Approval.approver_id,
+        User.full_name,
+        Approval.approver_role,
+        Approval.status,
+        Approval.created_at,
+        Approval.decision_date,
+        Approval.comment,
+    ).select_from(Approval).join(
+        AccessRequest, AccessRequest.id == Approval.request_id
+    ).outerjoin(
+        System, System.id == AccessRequest.system_id
+    ).outerjoin(
+        AccessRole, AccessRole.id == AccessRequest.access_role_id
+    ).outerjoin(
+        User, User.id == Approval.approver_id
+    ).order_by(Approval.id)
+
+
+AUDIT_LOG_COLUMNS = [
+    ('id', 'int64'),
+    ('created_at', 'timestamp'),
+    ('user_id', 'int32'),
+    ('user_name', 'dictionary'),
+    ('action', 'dictionary'),
+    ('request_id', 'int64'),
+    ('details', 'string'),
+    ('ip_address', 'dictionary'),
+]
+
+
+def _audit_logs_statement():
+    return select(
+        AuditLog.id,
+        AuditLog.created_at,
+        AuditLog.user_id,
+        User.full_name,
+        AuditLog.action,
+        AuditLog.request_id,
+        AuditLog.details,
+        AuditLog.ip_address,
+    ).select_from(AuditLog).outerjoin(
+        User, User.id == AuditLog.user_id
+    ).order_by(AuditLog.id)
+
+
+DATASETS = {
+    'requests': (REQUEST_COLUMNS, _requests_statement),
+    'approvals': (APPROVAL_COLUMNS, _approvals_statement),
+    'audit_logs': (AUDIT_LOG_COLUMNS, _audit_logs_statement),
+}
+
+
+# ===== Arrow conversion =====
+
+def _arrow_type(pa, type_name: str):
+    return {
+        'int16': pa.int16(),
+        'int32': pa.int32(),
+        'int64': pa.int64(),
+        'bool': pa.bool_(),
+        'string': pa.string(),
+        'date': pa.date32(),
+        'timestamp': pa.timestamp('us', tz='UTC'),
+        'dictionary': pa.dictionary(pa.int32(), pa.string()),
+    }[type_name]
+
+
+class _DictionaryEncoder:
+    """Dictionary of one column, grown across batches.
+
+    Every batch's dictionary extends the previous one, which the Arrow IPC
+    file format accepts as a delta (a replaced dictionary is not allowed).
+    """
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def encode(self, pa, column):
+        indices = []
+        for value in column:
+            if value is None:
+                indices.append(None)
+                continue
+            if isinstance(value, enum.Enum):
+                value = value.value
+            index = self._index.get(value)
+            if index is None:
+                index = self._index[value] = len(self.values)
+                self.values.append(value)
+            indices.append(index)
+        return pa.DictionaryArray.from_arrays(
+            pa.array(indices, type=pa.int32()), pa.array(self.values, type=pa.string())
+        )
+
+
+def _open_writer(pa, format: str, path: str, schema):
+    if format == 'parquet':
+        return pa.parquet.ParquetWriter(path, schema, compression='zstd')
+    return pa.ipc.new_file(path, schema, options=pa.ipc.IpcWriteOptions(
+        compression='zstd', emit_dictionary_deltas=True
+    ))
+
+
+def write_columnar(db: Session, path: str, dataset: str, format: str = 'parquet',
+                   progress: Progress = None) -> int:
+    """Write a dataset as Parquet or Arrow IPC (file format) to path.
+
+    Returns the number of exported rows. Raises ColumnarExportUnavailable
+    if pyarrow is missing.
+    """
+    pa = _pyarrow()
+    columns, statement = DATASETS[dataset]
+    schema = pa.schema([pa.field(name, _arrow_type(pa, type_name)) for name, type_name in columns])
+    encoders = {name: _DictionaryEncoder() for name, type_name in columns if type_name == 'dictionary'}
+
+    total = 0
+    result = db.execute(statement().execution_options(yield_per=COLUMNAR_BATCH_SIZE))
+    try:
+        with _open_writer(pa, format, path, schema) as writer:
+            for rows in result.partitions():
+                arrays = []
+                for (name, type_name), values in zip(columns, zip(*rows)):
+                    if name in encoders:
+                        arrays.append(encoders[name].encode(pa, values))
+                    else:
+                        arrays.append(pa.array(values, type=schema.field(name).type))
+                writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+                total += len(rows)
+                if progress:
+                    progress(total)
+    finally:
+        result.close()
+
+    logger.info(f"Columnar export written: {dataset} ({format}), {total} rows")
+    return total
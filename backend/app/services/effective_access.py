@@ -0,0 +1,180 @@
+"""
+Effective access: the denormalized set of currently granted accesses.
+
+Every request status change calls record_access_change() inside the same
+transaction: entering an approved / implemented status upserts the
+request's row in effective_access, leaving it (rejection, expiry,
+revocation) deletes it. The user access report reads this table and
+groups it by user in SQL, paging by user id. rebuild_effective_access()
+recomputes the table from access_requests and is run by the scheduler to
+repair any drift.
+"""
+from typing import Optional
+import logging
+
+from sqlalchemy import func, select, insert, delete, text, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert, aggregate_order_by
+from sqlalchemy.orm import Session
+
+from app.models import AccessRequest, User, System, AccessRole, RequestStatus, AccessLevel
+from app.models.subsystem import Subsystem
+from app.models.effective_access import EffectiveAccess
+
+logger = logging.getLogger(__name__)
+
+GRANTED_STATUSES = (RequestStatus.APPROVED, RequestStatus.IMPLEMENTED)
+
+# Advisory lock held while the table is rebuilt (one worker at a time)
+REBUILD_LOCK_KEY = 720025
+
+
+def record_access_change(db: Session, request: AccessRequest, old_status: RequestStatus):
+    """Grant, update or revoke a request's effective access after a status change"""
+    if request.status in GRANTED_STATUSES:
+        values = {
+            'request_id': request.id,
+            'user_id': request.target_user_id,
+            'system_id': request.system_id,
+            'subsystem_id': request.subsystem_id,
+            'access_role_id': request.access_role_id,
+            'request_number': request.request_number,
+            'status': request.status,
+            'is_temporary': request.is_temporary,
+            'valid_from': request.valid_from,
+            'valid_until': request.valid_until,
+            'granted_at': request.completed_at or request.created_at,
+        }
+        stmt = pg_insert(EffectiveAccess).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['request_id'],
+            set_={key: stmt.excluded[key] for key in values if key != 'request_id'}
+        )
+        db.execute(stmt)
+    elif old_status in GRANTED_STATUSES:
+        db.execute(delete(EffectiveAccess).where(EffectiveAccess.request_id == request.id))
+
+
+def rebuild_effective_access(db: Session) -> Optional[int]:
+    """Recompute effective_access from access_requests; returns the number of rows.
+
+    Returns None if another worker is already rebuilding it.
+    """
+    if not db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {'key': REBUILD_LOCK_KEY}).scalar():
+        db.rollback()
+        return None
+
+    # Block incremental writers while the table is rebuilt so no change is lost
+    db.execute(text("LOCK TABLE effective_access IN EXCLUSIVE MODE"))
+    db.query(EffectiveAccess).delete(synchronize_session=False)
+
+    result = db.execute(insert(EffectiveAccess).from_select(
+        ['request_id', 'user_id', 'system_id', 'subsystem_id', 'access_role_id', 'request_number',
+         'status', 'is_temporary', 'valid_from', 'valid_until', 'granted_at'],
+        select(
+            AccessRequest.id,
+            AccessRequest.target_user_id,
+            AccessRequest.system_id,
+            AccessRequest.subsystem_id,
+            AccessRequest.access_role_id,
+            AccessRequest.request_number,
+            AccessRequest.status,
+            AccessRequest.is_temporary,
+            AccessRequest.valid_from,
+            AccessRequest.valid_until,
+            func.coalesce(AccessRequest.completed_at, AccessRequest.created_at),
+        ).where(AccessRequest.status.in_(GRANTED_STATUSES))
+    ))
+
+    db.commit()
+    logger.info(f"Effective access rebuilt: {result.rowcount} accesses")
+    return result.rowcount
+
+
+# ===== User access report =====
+
+def report_users_query(
+    db: Session,
+    system_id: Optional[int] = None,
+    department: Optional[str] = None,
+    search: Optional[str] = None,
+):
+    """Distinct ids of users with effective access matching the report filters"""
+    query = db.query(EffectiveAccess.user_id).distinct()
+
+    if system_id:
+        query = query.filter(EffectiveAccess.system_id == system_id)
+
+    if department or search:
+        query = query.join(User, User.id == EffectiveAccess.user_id)
+        if department:
+            query = query.filter(User.department.ilike(f"%{department}%"))
+        if search:
+            query = query.filter(or_(
+                User.full_name.ilike(f"%{search}%"),
+                User.username.ilike(f"%{search}%"),
+                User.email.ilike(f"%{search}%")
+            ))
+
+    return query
+
+
+def report_page(db: Session, users_query, system_id: Optional[int] = None):
+    """Users of an (ordered, limited) users_query with their accesses aggregated to JSON"""
+    page = users_query.subquery()
+
+    access = func.json_build_object(
+        'request_id', EffectiveAccess.request_id,
+        'request_number', EffectiveAccess.request_number,
+        'system_id', EffectiveAccess.system_id,
+        'system_name', func.coalesce(System.name, '—'),
+        'system_code', func.coalesce(System.code, '—'),
+        'subsystem_name', Subsystem.name,
+        'access_role', func.coalesce(AccessRole.name, '—'),
+        'access_level', AccessRole.access_level,
+        'status', EffectiveAccess.status,
+        'is_temporary', EffectiveAccess.is_temporary,
+        'valid_from', EffectiveAccess.valid_from,
+        'valid_until', EffectiveAccess.valid_until,
+        'granted_at', EffectiveAccess.granted_at,
+    )
+
+    query = db.query(
+        User.id,
+        User.full_name,
+        User.username,
+        User.email,
+        User.department,
+        User.position,
+        func.json_agg(aggregate_order_by(access, EffectiveAccess.request_id)).label('systems'),
+    ).select_from(page).join(
+        User, User.id == page.c.user_id
+    ).join(
+        EffectiveAccess, EffectiveAccess.user_id == page.c.user_id
+    ).outerjoin(
+        System, System.id == EffectiveAccess.system_id
+    ).outerjoin(
+        Subsystem, Subsystem.id == EffectiveAccess.subsystem_id
+    ).outerjoin(
+        AccessRole, AccessRole.id == EffectiveAccess.access_role_id
+    )
+    if system_id:
+        query = query.filter(EffectiveAccess.system_id == system_id)
+
+    users = []
+    for row in query.group_by(User.id).order_by(User.id).all():
+        systems = row.systems
+        for item in systems:
+            # Enums are stored by name; the API uses their values
+            item['status'] = RequestStatus[item['status']].value
+            if item['access_level']:
+                item['access_level'] = AccessLevel[item['access_level']].value
+        users.append({
+            "user_id": row.id,
+            "full_name": row.full_name,
+            "username": row.username,
+            "email": row.email,
+            "department": row.department,
+            "position": row.position,
+            "systems": systems,
+        })
+    return users
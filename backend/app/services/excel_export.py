@@ -0,0 +1,388 @@
+"""
+Streaming Excel export.
+
+Workbooks are produced with openpyxl write-only mode (rows are serialized as
+they are appended, nothing is kept per cell) and fed by server-side cursors
+that fetch EXPORT_CHUNK_SIZE rows at a time, selecting plain columns instead
+of ORM entities. Memory stays flat regardless of the number of requests;
+the finished file is written to disk and streamed from there.
+
+Writers take an optional progress callback, called with the number of rows
+written so far after every chunk (see app.services.export_jobs).
+"""
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, Optional, Sequence
+import logging
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import NamedStyle, Font, PatternFill, Alignment, Border, Side
+from openpyxl.utils import get_column_letter
+from sqlalchemy import select
+from sqlalchemy.orm import Session, aliased
+
+from app.models import AccessRequest, Approval, User, System, AccessRole, RequestStatus, EffectiveAccess
+from app.models.subsystem import Subsystem
+
+logger = logging.getLogger(__name__)
+
+EXCEL_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_CHUNK_SIZE = 2000
+
+Progress = Optional[Callable[[int], None]]
+
+# Named styles: assigning a named style is one lookup per cell, while
+# per-cell font/border/alignment objects are hashed and registered each time
+HEADER_STYLE = 'idm_header'
+DATA_STYLE = 'idm_data'
+DATA_CENTER_STYLE = 'idm_data_center'
+
+
+def get_status_label(status_value):
+    """Получить русское название статуса"""
+    labels = {
+        'draft': 'Черновик',
+        'submitted': 'Отправлена',
+        'in_review': 'На рассмотрении',
+        'approved': 'Одобрена',
+        'rejected': 'Отклонена',
+        'implemented': 'Выполнена',
+        'cancelled': 'Отменена',
+        'expired': 'Истекла',
+    }
+    return labels.get(status_value, status_value)
+
+
+def get_type_label(type_value):
+    """Получить русское название типа заявки"""
+    labels = {
+        'new_access': 'Новый доступ',
+        'modify_access': 'Изменение доступа',
+        'revoke_access': 'Отзыв доступа',
+        'temporary_access': 'Временный доступ',
+    }
+    return labels.get(type_value, type_value)
+
+
+def get_approval_status_label(status_value):
+    """Получить русское название статуса согласования"""
+    labels = {
+        'pending': 'Ожидает',
+        'approved': 'Одобрено',
+        'rejected': 'Отклонено',
+    }
+    return labels.get(status_value, status_value)
+
+
+def format_date(dt):
+    """Форматировать дату"""
+    if not dt:
+        return '—'
+    if isinstance(dt, str):
+        return dt[:10]
+    return dt.strftime('%d.%m.%Y %H:%M')
+
+
+def new_workbook() -> Workbook:
+    """Write-only workbook with the export styles registered"""
+    wb = Workbook(write_only=True)
+
+    thin_border = Border(
+        left=Side(style='thin', color='CCCCCC'),
+        right=Side(style='thin', color='CCCCCC'),
+        top=Side(style='thin', color='CCCCCC'),
+        bottom=Side(style='thin', color='CCCCCC')
+    )
+    center_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    left_alignment = Alignment(horizontal='left', vertical='center', wrap_text=True)
+
+    wb.add_named_style(NamedStyle(
+        name=HEADER_STYLE,
+        font=Font(bold=True, color="FFFFFF", size=11),
+        fill=PatternFill(start_color="16306C", end_color="16306C", fill_type="solid"),
+        border=thin_border,
+        alignment=center_alignment
+    ))
+    wb.add_named_style(NamedStyle(
+        name=DATA_STYLE, font=Font(size=10), border=thin_border, alignment=left_alignment
+    ))
+    wb.add_named_style(NamedStyle(
+        name=DATA_CENTER_STYLE, font=Font(size=10), border=thin_border, alignment=center_alignment
+    ))
+    return wb
+
+
+def add_sheet(wb: Workbook, title: str, headers: Sequence[str], widths: Sequence[int]):
+    """Create a sheet with column widths, a frozen styled header row"""
+    ws = wb.create_sheet(title)
+    for col, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(col)].width = width
+    ws.freeze_panes = 'A2'
+    append_row(ws, headers, style=HEADER_STYLE)
+    return ws
+
+
+def append_row(ws, values: Iterable, style: str = DATA_STYLE, center_columns: int = 0):
+    """Append a styled row; the first center_columns cells are centered"""
+    row = []
+    for col_idx, value in enumerate(values):
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = DATA_CENTER_STYLE if col_idx < center_columns else style
+        row.append(cell)
+    ws.append(row)
+
+
+def stream_rows(db: Session, stmt, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator:
+    """Iterate over a SELECT through a server-side cursor, chunk_size rows at a time"""
+    result = db.execute(stmt.execution_options(yield_per=chunk_size))
+    try:
+        yield from result
+    finally:
+        result.close()
+
+
+def _requests_statement():
+    target_user = aliased(User)
+    requester = aliased(User)
+    return select(
+        AccessRequest.id,
+        AccessRequest.request_number,
+        AccessRequest.status,
+        AccessRequest.request_type,
+        System.name.label('system_name'),
+        Subsystem.name.label('subsystem_name'),
+        AccessRole.name.label('access_role_name'),
+        target_user.full_name.label('target_user_name'),
+        target_user.email.label('target_user_email'),
+        requester.full_name.label('requester_name'),
+        requester.email.label('requester_email'),
+        AccessRequest.created_at,
+        AccessRequest.submitted_at,
+        AccessRequest.completed_at,
+        AccessRequest.current_step,
+        AccessRequest.is_temporary,
+        AccessRequest.valid_from,
+        AccessRequest.valid_until,
+        AccessRequest.purpose,
+    ).select_from(AccessRequest).outerjoin(
+        System, System.id == AccessRequest.system_id
+    ).outerjoin(
+        Subsystem, Subsystem.id == AccessRequest.subsystem_id
+    ).outerjoin(
+        AccessRole, AccessRole.id == AccessRequest.access_role_id
+    ).outerjoin(
+        target_user, target_user.id == AccessRequest.target_user_id
+    ).outerjoin(
+        requester, requester.id == AccessRequest.requester_id
+    ).order_by(AccessRequest.created_at.desc(), AccessRequest.id.desc())
+
+
+def _approvals_statement():
+    return select(
+        AccessRequest.id,
+        AccessRequest.request_number,
+        Approval.step_number,
+        User.full_name,
+        User.email,
+        Approval.approver_role,
+        Approval.status,
+        Approval.decision_date,
+        Approval.comment,
+    ).select_from(Approval).join(
+        AccessRequest, AccessRequest.id == Approval.request_id
+    ).outerjoin(
+        User, User.id == Approval.approver_id
+    ).order_by(AccessRequest.created_at.desc(), AccessRequest.id.desc(), Approval.step_number)
+
+
+def write_requests_workbook(db: Session, path: str, progress: Progress = None) -> int:
+    """Write the full requests export (requests, approvals, statistics) to path.
+
+    Returns the number of exported requests.
+    """
+    wb = new_workbook()
+
+    # ===== Лист 1: Все заявки =====
+    ws = add_sheet(wb, "Заявки", [
+        'ID', 'Номер заявки', 'Статус', 'Тип заявки', 'Система', 'Подсистема',
+        'Роль доступа', 'Для сотрудника', 'Email получателя', 'Инициатор', 'Email инициатора',
+        'Дата создания', 'Дата отправки', 'Дата завершения', 'Текущий этап',
+        'Временный доступ', 'Действителен с', 'Действителен до', 'Цель / Обоснование'
+    ], [6, 18, 15, 18, 20, 15, 18, 22, 25, 22, 25, 16, 16, 16, 12, 15, 16, 16, 40])
+
+    status_counts = {}
+    total = 0
+    for req in stream_rows(db, _requests_statement()):
+        total += 1
+        status_counts[req.status] = status_counts.get(req.status, 0) + 1
+        append_row(ws, [
+            req.id,
+            req.request_number,
+            get_status_label(req.status.value if req.status else '—'),
+            get_type_label(req.request_type.value if req.request_type else '—'),
+            req.system_name or '—',
+            req.subsystem_name or '—',
+            req.access_role_name or '—',
+            req.target_user_name or '—',
+            req.target_user_email or '—',
+            req.requester_name or '—',
+            req.requester_email or '—',
+            format_date(req.created_at),
+            format_date(req.submitted_at),
+            format_date(req.completed_at),
+            req.current_step,
+            'Да' if req.is_temporary else 'Нет',
+            format_date(req.valid_from) if req.is_temporary else '—',
+            format_date(req.valid_until) if req.is_temporary else '—',
+            req.purpose or '—',
+        ], center_columns=1)
+        if progress and total % EXPORT_CHUNK_SIZE == 0:
+            progress(total)
+
+    # ===== Лист 2: Согласования =====
+    ws2 = add_sheet(wb, "Согласования", [
+        'ID заявки', 'Номер заявки', 'Этап', 'Согласующий', 'Email', 'Роль',
+        'Статус', 'Дата решения', 'Комментарий'
+    ], [10, 18, 8, 25, 30, 20, 15, 18, 40])
+
+    approvals = 0
+    for (request_id, request_number, step_number, approver_name, approver_email,
+         approver_role, approval_status, decision_date, comment) in stream_rows(db, _approvals_statement()):
+        approvals += 1
+        # Heartbeat only: progress counts requests, which are all written by now
+        if progress and approvals % EXPORT_CHUNK_SIZE == 0:
+            progress(total)
+        append_row(ws2, [
+            request_id,
+            request_number,
+            step_number,
+            approver_name or '—',
+            approver_email or '—',
+            approver_role or '—',
+            get_approval_status_label(approval_status.value if approval_status else '—'),
+            format_date(decision_date),
+            comment or '—',
+        ], center_columns=2)
+
+    # ===== Лист 3: Статистика =====
+    ws3 = wb.create_sheet("Статистика")
+    ws3.column_dimensions['A'].width = 25
+    ws3.column_dimensions['B'].width = 20
+
+    title = WriteOnlyCell(ws3, value="Статистика по заявкам")
+    title.font = Font(bold=True, size=14)
+    ws3.append([title])
+    ws3.append([])
+
+    stats = [
+        ('Всего заявок', total),
+        ('Черновики', status_counts.get(RequestStatus.DRAFT, 0)),
+        ('На рассмотрении', status_counts.get(RequestStatus.IN_REVIEW, 0)),
+        ('Одобрено', status_counts.get(RequestStatus.APPROVED, 0)),
+        ('Отклонено', status_counts.get(RequestStatus.REJECTED, 0)),
+        ('Выполнено', status_counts.get(RequestStatus.IMPLEMENTED, 0)),
+        ('Отменено', status_counts.get(RequestStatus.CANCELLED, 0)),
+        None,
+        ('Дата выгрузки', datetime.now().strftime('%d.%m.%Y %H:%M')),
+    ]
+    for item in stats:
+        if item is None:
+            ws3.append([])
+            continue
+        label, value = item
+        label_cell = WriteOnlyCell(ws3, value=label)
+        label_cell.style = DATA_STYLE
+        label_cell.font = Font(bold=True, size=11)
+        value_cell = WriteOnlyCell(ws3, value=value)
+        value_cell.style = DATA_STYLE
+        value_cell.font = Font(size=11)
+        ws3.append([label_cell, value_cell])
+
+    # Saving assembles the whole file and can take a while on large exports
+    if progress:
+        progress(total)
+    wb.save(path)
+    if progress:
+        progress(total)
+    logger.info(f"Requests export written: {total} requests")
+    return total
+
+
+def _user_access_statement(system_id: Optional[int] = None):
+    stmt = select(
+        User.full_name,
+        User.username,
+        User.email,
+        User.department,
+        User.position,
+        System.name.label('system_name'),
+        System.code.label('system_code'),
+        Subsystem.name.label('subsystem_name'),
+        AccessRole.name.label('access_role_name'),
+        AccessRole.access_level,
+        EffectiveAccess.status,
+        EffectiveAccess.is_temporary,
+        EffectiveAccess.valid_from,
+        EffectiveAccess.valid_until,
+        EffectiveAccess.granted_at,
+    ).select_from(EffectiveAccess).join(
+        User, User.id == EffectiveAccess.user_id
+    ).outerjoin(
+        System, System.id == EffectiveAccess.system_id
+    ).outerjoin(
+        Subsystem, Subsystem.id == EffectiveAccess.subsystem_id
+    ).outerjoin(
+        AccessRole, AccessRole.id == EffectiveAccess.access_role_id
+    )
+    if system_id:
+        stmt = stmt.where(EffectiveAccess.system_id == system_id)
+    return stmt.order_by(EffectiveAccess.user_id, EffectiveAccess.system_id, EffectiveAccess.request_id)
+
+
+def write_user_access_workbook(db: Session, path: str, system_id: Optional[int] = None,
+                               progress: Progress = None) -> int:
+    """Write the user access report (granted requests per user) to path.
+
+    Returns the number of exported rows.
+    """
+    wb = new_workbook()
+
+    # ===== Лист: Доступы пользователей =====
+    ws = add_sheet(wb, "Доступы пользователей", [
+        'Пользователь', 'Логин', 'Email', 'Отдел', 'Должность',
+        'Система', 'Код системы', 'Подсистема', 'Роль доступа', 'Уровень доступа',
+        'Статус', 'Временный', 'Действует с', 'Действует до', 'Дата выдачи'
+    ], [25, 15, 30, 20, 20, 20, 12, 15, 18, 15, 12, 10, 14, 14, 16])
+
+    total = 0
+    for row in stream_rows(db, _user_access_statement(system_id)):
+        total += 1
+        append_row(ws, [
+            row.full_name or '—',
+            row.username or '—',
+            row.email or '—',
+            row.department or '—',
+            row.position or '—',
+            row.system_name or '—',
+            row.system_code or '—',
+            row.subsystem_name or '—',
+            row.access_role_name or '—',
+            row.access_level.value if row.access_level else '—',
+            get_status_label(row.status.value if row.status else '—'),
+            'Да' if row.is_temporary else 'Нет',
+            format_date(row.valid_from),
+            format_date(row.valid_until),
+            format_date(row.granted_at),
+        ])
+        if progress and total % EXPORT_CHUNK_SIZE == 0:
+            progress(total)
+
+    if progress:
+        progress(total)
+    wb.save(path)
+    if progress:
+        progress(total)
+    logger.info(f"User access export written: {total} rows")
+    return total
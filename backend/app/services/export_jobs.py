@@ -0,0 +1,352 @@
+"""
+Background export jobs.
+
+A client submits an export spec (kind + params); the file is generated by a
+small thread pool in the worker process that accepted it, using its own
+database session, so API workers are not blocked and large exports do not
+run into proxy timeouts. Job state is a JSON file under EXPORT_DIR/jobs, so
+any gunicorn worker can report progress and serve the download.
+
+Running jobs report progress (which also serves as a heartbeat) at least
+every EXPORT_CHUNK_SIZE rows; a running job not heard from for
+STALE_AFTER_SECONDS is reported as failed. Queued jobs may wait in the
+executor for any length of time, so they record the pid of their worker
+instead and are reported as failed once that process is gone. Jobs still
+queued when the worker shuts down are marked failed.
+
+Artifacts are cached: their file name is derived from the spec and a
+fingerprint of the tables the export reads (cumulative insert/update/delete
+counters from pg_stat_user_tables). Submitting the same spec again returns
+the existing artifact until one of those tables is written to. The
+fingerprint is best-effort, see data_fingerprint().
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+from functools import partial
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple, Type
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+
+from pydantic import BaseModel
+from sqlalchemy import text, bindparam
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.schemas.export import (
+    RequestsExportParams, UserAccessExportParams, AuditLogExportParams, ColumnarExportParams
+)
+from app.services.audit_export import write_audit_logs_csv
+from app.services.columnar_export import COLUMNAR_FORMATS, write_columnar
+from app.services.excel_export import EXCEL_MEDIA_TYPE, write_requests_workbook, write_user_access_workbook
+
+logger = logging.getLogger(__name__)
+
+# A running job whose record was not touched for this long is considered
+# lost (its worker was restarted)
+STALE_AFTER_SECONDS = 600
+
+JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+class ExportKind(NamedTuple):
+    writer: Callable[..., int]  # writer(db, path, progress=..., **params) -> rows
+    params: Type[BaseModel]
+    tables: Tuple[str, ...]  # tables read by the export (cache fingerprint)
+    suffix: str
+    media_type: str
+    filename: str
+    superuser_only: bool = True
+
+
+EXPORT_KINDS: Dict[str, ExportKind] = {
+    'requests_excel': ExportKind(
+        writer=write_requests_workbook,
+        params=RequestsExportParams,
+        tables=('access_requests', 'approvals', 'users', 'systems', 'subsystems', 'access_roles'),
+        suffix='.xlsx',
+        media_type=EXCEL_MEDIA_TYPE,
+        filename='zajavki',
+    ),
+    'user_access_excel': ExportKind(
+        writer=write_user_access_workbook,
+        params=UserAccessExportParams,
+        tables=('effective_access', 'users', 'systems', 'subsystems', 'access_roles'),
+        suffix='.xlsx',
+        media_type=EXCEL_MEDIA_TYPE,
+        filename='user_access_report',
+    ),
+    'audit_logs_csv': ExportKind(
+        writer=write_audit_logs_csv,
+        params=AuditLogExportParams,
+        tables=('audit_logs', 'users'),
+        suffix='.csv',
+        media_type='text/csv',
+        filename='audit_logs',
+        superuser_only=False,
+    ),
+}
+
+# Tables read by each columnar dataset
+COLUMNAR_TABLES = {
+    'requests': ('access_requests', 'users', 'systems', 'subsystems', 'access_roles'),
+    'approvals': ('approvals', 'access_requests', 'users', 'systems', 'access_roles'),
+    'audit_logs': ('audit_logs', 'users'),
+}
+
+# One kind per dataset and format, e.g. 'approvals_parquet'
+EXPORT_KINDS.update({
+    f'{dataset}_{format}': ExportKind(
+        writer=partial(write_columnar, dataset=dataset, format=format),
+        params=ColumnarExportParams,
+        tables=tables,
+        suffix=suffix,
+        media_type=media_type,
+        filename=dataset,
+    )
+    for dataset, tables in COLUMNAR_TABLES.items()
+    for format, (media_type, suffix) in COLUMNAR_FORMATS.items()
+})
+
+_executor = ThreadPoolExecutor(max_workers=settings.EXPORT_WORKERS, thread_name_prefix='export')
+
+# Jobs of this worker that have not started yet: id -> (future, job)
+_queued: Dict[str, Tuple[Future, Dict[str, Any]]] = {}
+_queued_lock = threading.Lock()
+
+
+# ===== Storage =====
+
+def _jobs_dir() -> str:
+    path = os.path.join(settings.EXPORT_DIR, 'jobs')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _artifacts_dir() -> str:
+    path = os.path.join(settings.EXPORT_DIR, 'artifacts')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _save(job: Dict[str, Any]):
+    """Atomically replace the job record"""
+    job['updated_at'] = _now()
+    path = os.path.join(_jobs_dir(), f"{job['id']}.json")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(job, f)
+    os.replace(tmp_path, path)
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Job record, or None if unknown"""
+    if not JOB_ID_PATTERN.match(job_id):
+        return None
+    try:
+        with open(os.path.join(_jobs_dir(), f"{job_id}.json")) as f:
+            job = json.load(f)
+    except FileNotFoundError:
+        return None
+    if _is_lost(job):
+        job['status'] = 'failed'
+        job['error'] = 'Export was interrupted'
+    return job
+
+
+def _is_lost(job: Dict[str, Any]) -> bool:
+    """Queued job whose worker is gone, or running job without a recent heartbeat"""
+    if job['status'] == 'queued':
+        return 'pid' not in job or not _process_alive(job['pid'])
+    if job['status'] == 'running':
+        updated_at = datetime.fromisoformat(job['updated_at'])
+        return datetime.now(timezone.utc) - updated_at > timedelta(seconds=STALE_AFTER_SECONDS)
+    return False
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Exists, owned by another user
+    return True
+
+
+def can_access(kind_name: str, user) -> bool:
+    """Anyone allowed to submit a kind may read its jobs (the artifact only depends on the spec)"""
+    return user.is_superuser or not EXPORT_KINDS[kind_name].superuser_only
+
+
+def artifact_path(job: Dict[str, Any]) -> str:
+    kind = EXPORT_KINDS[job['kind']]
+    return os.path.join(_artifacts_dir(), job['cache_key'] + kind.suffix)
+
+
+def download_filename(job: Dict[str, Any]) -> str:
+    kind = EXPORT_KINDS[job['kind']]
+    finished_at = datetime.fromisoformat(job['finished_at'])
+    return f"{kind.filename}_{finished_at.strftime('%Y%m%d_%H%M%S')}{kind.suffix}"
+
+
+# ===== Cache key =====
+
+def data_fingerprint(db: Session, tables: Tuple[str, ...]) -> str:
+    """Changes whenever a row of one of the tables is inserted, updated or deleted.
+
+    Best-effort, the counters are not transactional: backends flush them
+    asynchronously (up to about a second after commit, longer under load),
+    so an export submitted right after a write may still get the previous
+    artifact. pg_stat_reset() or a crash resets them, which only causes
+    a cache miss; a reset followed by exactly as many writes as before
+    would reuse a stale artifact.
+    """
+    rows = db.execute(
+        text(
+            "SELECT relname, n_tup_ins, n_tup_upd, n_tup_del "
+            "FROM pg_stat_user_tables WHERE relname IN :tables ORDER BY relname"
+        ).bindparams(bindparam('tables', expanding=True)),
+        {'tables': list(tables)}
+    ).all()
+    return ';'.join(f"{name}:{ins}:{upd}:{dele}" for name, ins, upd, dele in rows)
+
+
+def _cache_key(kind_name: str, params: Dict[str, Any], fingerprint: str) -> str:
+    spec = json.dumps({'kind': kind_name, 'params': params, 'data': fingerprint}, sort_keys=True)
+    return hashlib.sha256(spec.encode()).hexdigest()
+
+
+def _find_active_job(cache_key: str) -> Optional[Dict[str, Any]]:
+    """Queued or running job producing the same artifact"""
+    for name in os.listdir(_jobs_dir()):
+        if not name.endswith('.json'):
+            continue
+        job = get_job(name[:-5])
+        if job and job['cache_key'] == cache_key and job['status'] in ('queued', 'running'):
+            return job
+    return None
+
+
+# ===== Jobs =====
+
+def submit_export(db: Session, kind_name: str, params: Dict[str, Any], user_id: int) -> Dict[str, Any]:
+    """Create an export job, reusing a cached artifact or a job in progress.
+
+    params must already be validated against the kind's params model.
+    """
+    kind = EXPORT_KINDS[kind_name]
+    cache_key = _cache_key(kind_name, params, data_fingerprint(db, kind.tables))
+
+    active = _find_active_job(cache_key)
+    if active:
+        return active
+
+    job = {
+        'id': uuid.uuid4().hex,
+        'kind': kind_name,
+        'params': params,
+        'cache_key': cache_key,
+        'status': 'queued',
+        'rows': 0,
+        'cached': False,
+        'error': None,
+        'created_by_id': user_id,
+        'pid': os.getpid(),  # Worker whose executor runs the job
+        'created_at': _now(),
+        'started_at': None,
+        'finished_at': None,
+    }
+
+    path = artifact_path(job)
+    if os.path.exists(path):
+        job.update(
+            status='completed',
+            cached=True,
+            started_at=job['created_at'],
+            finished_at=job['created_at'],
+        )
+        # Keep the artifact for another retention period
+        os.utime(path)
+        _save(job)
+        return job
+
+    _save(job)
+    with _queued_lock:
+        _queued[job['id']] = (_executor.submit(_run_job, job), job)
+    logger.info(f"Export job {job['id']} queued: {kind_name} {params}")
+    return job
+
+
+def _run_job(job: Dict[str, Any]):
+    """Generate the artifact of a job (runs in the export thread pool)"""
+    kind = EXPORT_KINDS[job['kind']]
+    path = artifact_path(job)
+    partial_path = f"{path}.{job['id']}.partial"
+
+    with _queued_lock:
+        _queued.pop(job['id'], None)
+    job.update(status='running', started_at=_now())
+    _save(job)
+
+    def progress(rows: int):
+        job['rows'] = rows
+        _save(job)
+
+    db = SessionLocal()
+    started = time.monotonic()
+    try:
+        rows = kind.writer(db, partial_path, progress=progress, **job['params'])
+        os.replace(partial_path, path)
+        job.update(status='completed', rows=rows, finished_at=_now())
+        logger.info(f"Export job {job['id']} completed: {rows} rows in {time.monotonic() - started:.1f}s")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Export job {job['id']} failed: {e}")
+        job.update(status='failed', error=str(e), finished_at=_now())
+        if os.path.exists(partial_path):
+            os.unlink(partial_path)
+    finally:
+        db.close()
+        _save(job)
+
+
+def cleanup_exports():
+    """Delete job records and artifacts older than EXPORT_RETENTION_HOURS"""
+    cutoff = time.time() - settings.EXPORT_RETENTION_HOURS * 3600
+    removed = 0
+    for directory in (_jobs_dir(), _artifacts_dir()):
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.unlink(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+    if removed:
+        logger.info(f"Removed {removed} expired export files")
+    return removed
+
+
+def shutdown_export_jobs():
+    """Stop accepting jobs; queued jobs of this worker are cancelled and marked failed"""
+    _executor.shutdown(wait=False, cancel_futures=True)
+    with _queued_lock:
+        queued = list(_queued.values())
+        _queued.clear()
+    for future, job in queued:
+        if future.cancelled():
+            job.update(status='failed', error='Export was cancelled (server shutdown)', finished_at=_now())
+            _save(job)
+            logger.info(f"Export job {job['id']} cancelled by shutdown")
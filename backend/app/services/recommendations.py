@@ -0,0 +1,245 @@
+"""
+Access recommendations for the create-request form.
+
+Three signals are merged into a 0-100 score per system (or per role of a
+selected system):
+1. The target user's own granted requests (live, indexed by target user)
+2. Colleagues: same department for systems, same position for roles
+3. Organization-wide popularity
+
+Signals 2 and 3 come from the precomputed frequency tables in
+app.models.recommendation over the last POPULARITY_WINDOW_DAYS days.
+rebuild_recommendation_model() recomputes them and is run by the scheduler;
+the user's own recent grants are subtracted from the colleague counts at
+read time, so colleagues still means "other users".
+"""
+from collections import Counter
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Optional, Any
+import logging
+
+from sqlalchemy import func, select, insert, text
+from sqlalchemy.orm import Session
+
+from app.models import AccessRequest, User, System, AccessRole, RequestStatus
+from app.models.recommendation import (
+    RecommendationDepartmentSystem, RecommendationPositionRole,
+    RecommendationPopularSystem, RecommendationPopularRole
+)
+
+logger = logging.getLogger(__name__)
+
+POPULARITY_WINDOW_DAYS = 90
+GRANTED_STATUSES = [RequestStatus.APPROVED, RequestStatus.IMPLEMENTED]
+
+# Popular items considered per signal
+POPULAR_LIMIT = 10
+
+# Recommendations returned
+TOP_N = 5
+
+# pg_try_advisory_xact_lock key: one rebuild at a time across workers
+REBUILD_LOCK_KEY = 720020
+
+
+def _window_start() -> datetime:
+    return datetime.now(timezone.utc) - timedelta(days=POPULARITY_WINDOW_DAYS)
+
+
+def rebuild_recommendation_model(db: Session) -> bool:
+    """Recompute the recommendation frequency tables.
+
+    Returns False if another worker is already rebuilding them.
+    """
+    if not db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {'key': REBUILD_LOCK_KEY}).scalar():
+        db.rollback()
+        return False
+
+    for model in (RecommendationDepartmentSystem, RecommendationPositionRole,
+                  RecommendationPopularSystem, RecommendationPopularRole):
+        db.query(model).delete(synchronize_session=False)
+
+    granted = (
+        AccessRequest.status.in_(GRANTED_STATUSES),
+        AccessRequest.created_at >= _window_start()
+    )
+
+    db.execute(insert(RecommendationDepartmentSystem).from_select(
+        ['department', 'system_id', 'request_count'],
+        select(User.department, AccessRequest.system_id, func.count())
+        .join(User, User.id == AccessRequest.target_user_id)
+        .where(*granted, User.department.isnot(None), User.department != '')
+        .group_by(User.department, AccessRequest.system_id)
+    ))
+
+    db.execute(insert(RecommendationPositionRole).from_select(
+        ['position', 'system_id', 'access_role_id', 'request_count'],
+        select(User.position, AccessRequest.system_id, AccessRequest.access_role_id, func.count())
+        .join(User, User.id == AccessRequest.target_user_id)
+        .where(*granted, User.position.isnot(None), User.position != '')
+        .group_by(User.position, AccessRequest.system_id, AccessRequest.access_role_id)
+    ))
+
+    db.execute(insert(RecommendationPopularSystem).from_select(
+        ['system_id', 'request_count'],
+        select(AccessRequest.system_id, func.count())
+        .where(*granted)
+        .group_by(AccessRequest.system_id)
+    ))
+
+    db.execute(insert(RecommendationPopularRole).from_select(
+        ['system_id', 'access_role_id', 'request_count'],
+        select(AccessRequest.system_id, AccessRequest.access_role_id, func.count())
+        .where(*granted)
+        .group_by(AccessRequest.system_id, AccessRequest.access_role_id)
+    ))
+
+    db.commit()
+    logger.info("Recommendation model rebuilt")
+    return True
+
+
+def _add_signal(scores: Dict[int, Dict], counts: Dict[int, int], weight: float, reason: str):
+    """Add counts normalized to the signal's maximum, scaled by weight"""
+    max_count = max(counts.values(), default=1)
+    for item_id, count in counts.items():
+        entry = scores.setdefault(item_id, {'score': 0, 'reasons': []})
+        entry['score'] += (count / max_count) * weight
+        entry['reasons'].append(reason)
+
+
+def _colleague_counts(rows, own_recent: Counter) -> Dict[int, int]:
+    """Frequency table rows minus the user's own grants in the window"""
+    counts = {}
+    for item_id, count in rows:
+        count -= own_recent[item_id]
+        if count > 0:
+            counts[item_id] = count
+    return counts
+
+
+def _user_grants(db: Session, user_id: int, system_id: Optional[int] = None):
+    """User's granted requests, flagged if created within the popularity window"""
+    query = db.query(
+        AccessRequest.system_id,
+        AccessRequest.access_role_id,
+        (AccessRequest.created_at >= _window_start()).label('recent')
+    ).filter(
+        AccessRequest.target_user_id == user_id,
+        AccessRequest.status.in_(GRANTED_STATUSES)
+    )
+    if system_id:
+        query = query.filter(AccessRequest.system_id == system_id)
+    return query.all()
+
+
+def recommend_systems(db: Session, user: User) -> List[Dict[str, Any]]:
+    """Top systems for a user (SystemRecommendation data)"""
+    grants = _user_grants(db, user.id)
+    scores = {}
+
+    # Signal 1: User's past approved requests (40%)
+    _add_signal(scores, Counter(g.system_id for g in grants), 40, 'user_history')
+
+    # Signal 2: Colleagues from same department (35%)
+    if user.department:
+        rows = db.query(
+            RecommendationDepartmentSystem.system_id, RecommendationDepartmentSystem.request_count
+        ).filter(RecommendationDepartmentSystem.department == user.department).all()
+        own_recent = Counter(g.system_id for g in grants if g.recent)
+        _add_signal(scores, _colleague_counts(rows, own_recent), 35, 'department')
+
+    # Signal 3: Popular systems in organization (25%)
+    popular = db.query(
+        RecommendationPopularSystem.system_id, RecommendationPopularSystem.request_count
+    ).order_by(RecommendationPopularSystem.request_count.desc()).limit(POPULAR_LIMIT).all()
+    _add_signal(scores, dict(popular), 25, 'popular')
+
+    if not scores:
+        return []
+
+    systems = db.query(System.id, System.name, System.code).filter(
+        System.id.in_(list(scores.keys())),
+        System.is_active == True
+    ).all()
+
+    result = []
+    for system in systems:
+        data = scores[system.id]
+        reasons = data['reasons']
+        if 'user_history' in reasons:
+            reason = "На основе ваших заявок"
+        elif 'department' in reasons:
+            reason = "Популярно в вашем отделе"
+        else:
+            reason = "Популярно в организации"
+
+        result.append({
+            'system_id': system.id,
+            'system_name': system.name,
+            'system_code': system.code,
+            'score': round(data['score'], 1),
+            'reason': reason,
+        })
+
+    result.sort(key=lambda x: x['score'], reverse=True)
+    return result[:TOP_N]
+
+
+def recommend_roles(db: Session, user: User, system_id: int) -> List[Dict[str, Any]]:
+    """Top roles of a system for a user (RoleRecommendation data)"""
+    grants = _user_grants(db, user.id, system_id)
+    scores = {}
+
+    # Signal 1: User's past role choices for this system (45%)
+    _add_signal(scores, Counter(g.access_role_id for g in grants), 45, 'user_history')
+
+    # Signal 2: Colleagues in the same position (35%)
+    if user.position:
+        rows = db.query(
+            RecommendationPositionRole.access_role_id, RecommendationPositionRole.request_count
+        ).filter(
+            RecommendationPositionRole.position == user.position,
+            RecommendationPositionRole.system_id == system_id
+        ).all()
+        own_recent = Counter(g.access_role_id for g in grants if g.recent)
+        _add_signal(scores, _colleague_counts(rows, own_recent), 35, 'position')
+
+    # Signal 3: Popular roles for this system (20%)
+    popular = db.query(
+        RecommendationPopularRole.access_role_id, RecommendationPopularRole.request_count
+    ).filter(
+        RecommendationPopularRole.system_id == system_id
+    ).order_by(RecommendationPopularRole.request_count.desc()).limit(POPULAR_LIMIT).all()
+    _add_signal(scores, dict(popular), 20, 'popular')
+
+    if not scores:
+        return []
+
+    roles = db.query(AccessRole).filter(
+        AccessRole.id.in_(list(scores.keys())),
+        AccessRole.is_active == True
+    ).all()
+
+    result = []
+    for role in roles:
+        data = scores[role.id]
+        reasons = data['reasons']
+        if 'user_history' in reasons:
+            reason = "На основе ваших заявок"
+        elif 'position' in reasons:
+            reason = "Популярно у коллег на вашей должности"
+        else:
+            reason = "Популярно для этой системы"
+
+        result.append({
+            'access_role_id': role.id,
+            'role_name': role.name,
+            'access_level': role.access_level.value if role.access_level else "read",
+            'risk_level': role.risk_level,
+            'score': round(data['score'], 1),
+            'reason': reason,
+        })
+
+    result.sort(key=lambda x: x['score'], reverse=True)
+    return result[:TOP_N]
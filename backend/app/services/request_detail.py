@@ -0,0 +1,101 @@
+"""
+Loader and serializer for the access request detail view.
+
+The request, its to-one relations and its approvals (with approvers) come from
+one joined query; comments (with authors) and attachments (with uploaders)
+are fetched by one SELECT ... IN query each, so a detail view costs exactly
+three round trips regardless of how many children the request has. The
+serializer reads plain column values instead of copying ORM __dict__s and
+re-validating them.
+"""
+from typing import Dict, Any
+
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.models import AccessRequest, Approval, RequestComment, RequestAttachment
+
+
+def request_detail_statement(request_id: int):
+    """SELECT for a request with everything the detail view shows"""
+    return select(AccessRequest).options(
+        joinedload(AccessRequest.requester),
+        joinedload(AccessRequest.target_user),
+        joinedload(AccessRequest.system),
+        joinedload(AccessRequest.subsystem),
+        joinedload(AccessRequest.access_role),
+        joinedload(AccessRequest.approvals).joinedload(Approval.approver),
+        selectinload(AccessRequest.comments).joinedload(RequestComment.user),
+        selectinload(AccessRequest.attachments).joinedload(RequestAttachment.uploaded_by)
+    ).where(AccessRequest.id == request_id)
+
+
+def serialize_request_detail(request: AccessRequest) -> Dict[str, Any]:
+    """Build AccessRequestDetailResponse data from a request loaded by request_detail_statement"""
+    return {
+        'id': request.id,
+        'request_number': request.request_number,
+        'requester_id': request.requester_id,
+        'target_user_id': request.target_user_id,
+        'system_id': request.system_id,
+        'subsystem_id': request.subsystem_id,
+        'access_role_id': request.access_role_id,
+        'request_type': request.request_type,
+        'status': request.status,
+        'purpose': request.purpose,
+        'is_temporary': request.is_temporary,
+        'valid_from': request.valid_from,
+        'valid_until': request.valid_until,
+        'current_step': request.current_step,
+        'created_at': request.created_at,
+        'updated_at': request.updated_at,
+        'submitted_at': request.submitted_at,
+        'completed_at': request.completed_at,
+        'requester_name': request.requester.full_name if request.requester else None,
+        'target_user_name': request.target_user.full_name if request.target_user else None,
+        'system_name': request.system.name if request.system else None,
+        'subsystem_name': request.subsystem.name if request.subsystem else None,
+        'access_role_name': request.access_role.name if request.access_role else None,
+        'approvals': [
+            {
+                'id': approval.id,
+                'request_id': approval.request_id,
+                'step_number': approval.step_number,
+                'approver_id': approval.approver_id,
+                'approver_role': approval.approver_role,
+                'status': approval.status,
+                'decision_date': approval.decision_date,
+                'comment': approval.comment,
+                'created_at': approval.created_at,
+                'approver_name': approval.approver.full_name if approval.approver else None,
+                'approver_email': approval.approver.email if approval.approver else None,
+            }
+            for approval in request.approvals
+        ],
+        'comments': [
+            {
+                'id': comment.id,
+                'request_id': comment.request_id,
+                'user_id': comment.user_id,
+                'comment': comment.comment,
+                'is_internal': comment.is_internal,
+                'created_at': comment.created_at,
+                'user_name': comment.user.full_name if comment.user else None,
+            }
+            for comment in request.comments
+        ],
+        'attachments': [
+            {
+                'id': attachment.id,
+                'filename': attachment.filename,
+                'file_size': attachment.file_size,
+                'content_type': attachment.content_type,
+                'description': attachment.description,
+                'attachment_type': attachment.attachment_type,
+                'uploaded_by_id': attachment.uploaded_by_id,
+                'uploaded_by_name': attachment.uploaded_by.full_name if attachment.uploaded_by else None,
+                'uploaded_at': attachment.uploaded_at,
+            }
+            for attachment in request.attachments
+        ],
+    }
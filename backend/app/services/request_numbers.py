@@ -0,0 +1,44 @@
+"""
+Request number allocation (REQ-YYYY-NNNNN).
+
+Numbers come from a per-year counter row bumped with
+INSERT ... ON CONFLICT DO UPDATE ... RETURNING on its own short autocommit
+connection, so the row lock is held only for that single statement and never
+for the caller's transaction. Allocation never scans access_requests and never
+hands out the same number twice. Like a database sequence, numbers taken by a
+transaction that later rolls back are not reused (gaps are possible).
+"""
+from datetime import date
+from typing import List
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.request import RequestNumberSequence
+
+
+def format_request_number(year: int, number: int) -> str:
+    """Format request number like REQ-2025-00001"""
+    return f"REQ-{year}-{number:05d}"
+
+
+def allocate_request_numbers(db: Session, count: int = 1) -> List[str]:
+    """Reserve a contiguous block of `count` request numbers for the current year"""
+    if count < 1:
+        return []
+
+    year = date.today().year
+
+    stmt = pg_insert(RequestNumberSequence).values(year=year, last_value=count)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['year'],
+        set_={'last_value': RequestNumberSequence.last_value + count}
+    ).returning(RequestNumberSequence.last_value)
+
+    # Separate connection, committed immediately: concurrent creators only
+    # serialize on this one statement, not on each other's transactions.
+    with db.get_bind().begin() as conn:
+        last_value = conn.execute(stmt).scalar_one()
+
+    first_value = last_value - count + 1
+    return [format_request_number(year, n) for n in range(first_value, last_value + 1)]
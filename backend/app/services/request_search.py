@@ -0,0 +1,83 @@
+"""
+Ranked text search over access requests.
+
+Matching uses ILIKE '%q%' as before, but every searched column has a pg_trgm
+GIN index (see the add_search_trgm_indexes migration), and each column is
+matched in its own branch of a UNION so the planner can use those indexes:
+a single OR across joined tables always ends up as a sequential scan of
+access_requests. Matches are ranked by pg_trgm word_similarity, which
+scores how well q matches a word-aligned part of the value.
+
+A broad term (a common word, a frequent name) matches a large part of the
+table; scoring and sorting all of those matches would cost as much as the
+old sequential scan. Each branch therefore contributes only its newest
+SEARCH_BRANCH_LIMIT matches, and ranking happens within that set.
+"""
+from sqlalchemy import select, func, union_all
+
+from app.models import AccessRequest, User, System, Subsystem
+
+# Matches per searched field that are ranked (the newest ones)
+SEARCH_BRANCH_LIMIT = 500
+
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards (use with escape='\\')"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def like_pattern(q: str) -> str:
+    """ILIKE pattern for a substring match (use with escape='\\')"""
+    return f"%{escape_like(q)}%"
+
+
+def rank(q: str, column):
+    """Relevance of column for q in [0, 1]"""
+    return func.word_similarity(q, column)
+
+
+def request_match_scores(q: str, *conditions):
+    """Subquery (request_id, score) of requests matching q in any searched field.
+
+    `conditions` are the caller's other filters on AccessRequest. They are
+    applied in every branch before the SEARCH_BRANCH_LIMIT cut, so a
+    filtered search still finds older matches of a broad term.
+    """
+    pattern = like_pattern(q)
+
+    def newest(branch):
+        return branch.where(*conditions).order_by(AccessRequest.id.desc()).limit(SEARCH_BRANCH_LIMIT)
+
+    # Name matches are resolved first (small tables), then requests by FK
+    system_ids = select(System.id, rank(q, System.name).label('score')).where(
+        System.name.ilike(pattern, escape='\\')
+    ).subquery()
+    subsystem_ids = select(Subsystem.id, rank(q, Subsystem.name).label('score')).where(
+        Subsystem.name.ilike(pattern, escape='\\')
+    ).subquery()
+    user_ids = select(User.id, rank(q, User.full_name).label('score')).where(
+        User.full_name.ilike(pattern, escape='\\')
+    ).subquery()
+
+    matches = union_all(
+        newest(select(AccessRequest.id.label('request_id'), rank(q, AccessRequest.request_number).label('score')).where(
+            AccessRequest.request_number.ilike(pattern, escape='\\')
+        )),
+        newest(select(AccessRequest.id, rank(q, AccessRequest.purpose)).where(
+            AccessRequest.purpose.ilike(pattern, escape='\\')
+        )),
+        newest(select(AccessRequest.id, system_ids.c.score).join(
+            system_ids, AccessRequest.system_id == system_ids.c.id
+        )),
+        newest(select(AccessRequest.id, subsystem_ids.c.score).join(
+            subsystem_ids, AccessRequest.subsystem_id == subsystem_ids.c.id
+        )),
+        newest(select(AccessRequest.id, user_ids.c.score).join(
+            user_ids, AccessRequest.target_user_id == user_ids.c.id
+        )),
+    ).subquery()
+
+    return select(
+        matches.c.request_id,
+        func.max(matches.c.score).label('score')
+    ).group_by(matches.c.request_id).subquery()
@@ -0,0 +1,331 @@
+"""
+Incrementally maintained request statistics for the dashboard.
+
+Every request creation / status transition / approval decision calls one of the
+record_* helpers inside the same transaction, which bumps the summary tables with
+a single multi-row upsert. Readers (dashboard, /statistics) only touch the small
+summary tables. rebuild_request_stats() recomputes everything from the source
+tables and is run by the scheduler to repair any drift; the per-status counters
+are checked more often by reconcile_status_counters().
+"""
+from collections import Counter
+from datetime import datetime, timezone, timedelta
+from typing import Iterable, Dict, Any, Optional
+import logging
+
+from sqlalchemy import func, case, select, insert, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models import AccessRequest, Approval, User, System, RequestStatus, ApprovalStatus
+from app.models.stats import (
+    RequestStatusCounter, RequestStatsMonthly, RequestStatsSystem, RequestStatsRequester, ApprovalStatsMonthly
+)
+
+logger = logging.getLogger(__name__)
+
+# pg_try_advisory_xact_lock key: the scheduler runs in every worker, one rebuild at a time
+REBUILD_LOCK_KEY = 720001
+RECONCILE_LOCK_KEY = 720002
+
+
+def month_key(dt: Optional[datetime]) -> str:
+    """Return YYYY-MM month key (UTC) used by the summary tables"""
+    if dt is None:
+        dt = datetime.now(timezone.utc)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    return dt.strftime('%Y-%m')
+
+
+def _bump_counts(db: Session, model, key_columns: list, deltas: Counter):
+    """Apply count deltas to a summary table with one multi-row upsert"""
+    rows = [
+        {**dict(zip(key_columns, key)), 'request_count': delta}
+        for key, delta in deltas.items() if delta
+    ]
+    if not rows:
+        return
+
+    stmt = pg_insert(model).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=key_columns,
+        set_={'request_count': model.request_count + stmt.excluded.request_count}
+    )
+    db.execute(stmt)
+
+
+def _apply_request_deltas(db: Session, items: Iterable[tuple]):
+    """Apply (request, status, delta) triples to all request summary tables"""
+    by_status = Counter()
+    monthly = Counter()
+    by_system = Counter()
+
+    for request, status, delta in items:
+        by_status[(status,)] += delta
+        monthly[(month_key(request.created_at), status)] += delta
+        by_system[(request.system_id, status)] += delta
+
+    _bump_counts(db, RequestStatusCounter, ['status'], by_status)
+    _bump_counts(db, RequestStatsMonthly, ['month', 'status'], monthly)
+    _bump_counts(db, RequestStatsSystem, ['system_id', 'status'], by_system)
+
+
+def record_requests_created(db: Session, requests: Iterable[Any]):
+    """Account for newly created requests.
+
+    Accepts AccessRequest instances or result rows exposing created_at,
+    status, system_id and requester_id.
+    """
+    requests = list(requests)
+    if not requests:
+        return
+
+    _apply_request_deltas(db, ((r, r.status, 1) for r in requests))
+
+    by_requester = Counter((r.requester_id,) for r in requests if r.requester_id)
+    _bump_counts(db, RequestStatsRequester, ['user_id'], by_requester)
+
+
+def record_status_change(db: Session, request: AccessRequest, old_status: RequestStatus):
+    """Move a request from old_status to its current status in the summary tables"""
+    if old_status == request.status:
+        return
+    _apply_request_deltas(db, [(request, old_status, -1), (request, request.status, 1)])
+
+
+def record_approval_decision(db: Session, approval: Approval, request: AccessRequest):
+    """Account for an approval step that has just been approved"""
+    if approval.status != ApprovalStatus.APPROVED or not approval.decision_date:
+        return
+
+    hours = None
+    if request.submitted_at:
+        hours = (approval.decision_date - request.submitted_at).total_seconds() / 3600
+        if hours <= 0:
+            hours = None
+
+    stmt = pg_insert(ApprovalStatsMonthly).values(
+        month=month_key(approval.decision_date),
+        approved_count=1,
+        timed_count=1 if hours is not None else 0,
+        total_hours=hours or 0,
+        min_hours=hours,
+        max_hours=hours
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['month'],
+        set_={
+            'approved_count': ApprovalStatsMonthly.approved_count + stmt.excluded.approved_count,
+            'timed_count': ApprovalStatsMonthly.timed_count + stmt.excluded.timed_count,
+            'total_hours': ApprovalStatsMonthly.total_hours + stmt.excluded.total_hours,
+            'min_hours': func.least(ApprovalStatsMonthly.min_hours, stmt.excluded.min_hours),
+            'max_hours': func.greatest(ApprovalStatsMonthly.max_hours, stmt.excluded.max_hours),
+        }
+    )
+    db.execute(stmt)
+
+
+def rebuild_request_stats(db: Session) -> bool:
+    """Recompute all summary tables from access_requests / approvals.
+
+    Returns False if another worker is already rebuilding them.
+    """
+    if not db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {'key': REBUILD_LOCK_KEY}).scalar():
+        db.rollback()
+        return False
+
+    # Block incremental writers while the tables are rebuilt so no delta is lost.
+    # Tables are locked in the order writers touch them (an approval updates
+    # approval_stats_monthly before the request tables) to avoid deadlocks.
+    db.execute(text(
+        "LOCK TABLE approval_stats_monthly, request_stats_monthly, "
+        "request_stats_system, request_stats_requester IN EXCLUSIVE MODE"
+    ))
+
+    db.query(RequestStatsMonthly).delete(synchronize_session=False)
+    db.query(RequestStatsSystem).delete(synchronize_session=False)
+    db.query(RequestStatsRequester).delete(synchronize_session=False)
+    db.query(ApprovalStatsMonthly).delete(synchronize_session=False)
+
+    created_month = func.to_char(func.timezone('UTC', AccessRequest.created_at), 'YYYY-MM')
+    db.execute(insert(RequestStatsMonthly).from_select(
+        ['month', 'status', 'request_count'],
+        select(created_month, AccessRequest.status, func.count())
+        .group_by(created_month, AccessRequest.status)
+    ))
+
+    db.execute(insert(RequestStatsSystem).from_select(
+        ['system_id', 'status', 'request_count'],
+        select(AccessRequest.system_id, AccessRequest.status, func.count())
+        .group_by(AccessRequest.system_id, AccessRequest.status)
+    ))
+
+    db.execute(insert(RequestStatsRequester).from_select(
+        ['user_id', 'request_count'],
+        select(AccessRequest.requester_id, func.count())
+        .where(AccessRequest.requester_id.isnot(None))
+        .group_by(AccessRequest.requester_id)
+    ))
+
+    decision_month = func.to_char(func.timezone('UTC', Approval.decision_date), 'YYYY-MM')
+    hours = func.extract('epoch', Approval.decision_date - AccessRequest.submitted_at) / 3600
+    positive_hours = case((hours > 0, hours))
+    db.execute(insert(ApprovalStatsMonthly).from_select(
+        ['month', 'approved_count', 'timed_count', 'total_hours', 'min_hours', 'max_hours'],
+        select(
+            decision_month,
+            func.count(),
+            func.count(positive_hours),
+            func.coalesce(func.sum(positive_hours), 0),
+            func.min(positive_hours),
+            func.max(positive_hours)
+        ).select_from(Approval).outerjoin(
+            AccessRequest, AccessRequest.id == Approval.request_id
+        ).where(
+            Approval.status == ApprovalStatus.APPROVED,
+            Approval.decision_date.isnot(None)
+        ).group_by(decision_month)
+    ))
+
+    db.commit()
+    logger.info("Request statistics rebuilt")
+    return True
+
+
+def _status_counter_drift(db: Session):
+    """Per-status counts from access_requests and {status: drift} of the counters"""
+    actual = dict(
+        db.query(AccessRequest.status, func.count()).group_by(AccessRequest.status).all()
+    )
+    stored = dict(
+        db.query(RequestStatusCounter.status, RequestStatusCounter.request_count).all()
+    )
+
+    drift = {}
+    for status in RequestStatus:
+        expected = actual.get(status, 0)
+        current = stored.get(status, 0)
+        if expected != current:
+            drift[status.value] = current - expected
+    return actual, drift
+
+
+def reconcile_status_counters(db: Session) -> Optional[Dict[str, int]]:
+    """Compare status counters with access_requests and repair any drift.
+
+    Returns {status: drift} for every status whose counter was wrong, or
+    None if another worker is already reconciling.
+    """
+    if not db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {'key': RECONCILE_LOCK_KEY}).scalar():
+        db.rollback()
+        return None
+
+    # Compare without blocking writers; a transition committed during the
+    # scan can show up as drift, so any drift is confirmed under the lock
+    _, drift = _status_counter_drift(db)
+    if not drift:
+        db.commit()
+        return drift
+
+    db.execute(text("LOCK TABLE request_status_counters IN EXCLUSIVE MODE"))
+    actual, drift = _status_counter_drift(db)
+
+    if drift:
+        logger.warning(f"Request status counter drift detected, repairing: {drift}")
+        stmt = pg_insert(RequestStatusCounter).values([
+            {'status': status, 'request_count': actual.get(status, 0)}
+            for status in RequestStatus
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['status'],
+            set_={'request_count': stmt.excluded.request_count}
+        )
+        db.execute(stmt)
+
+    db.commit()
+    return drift
+
+
+def get_status_totals(db: Session) -> Dict[RequestStatus, int]:
+    """Get number of requests per status"""
+    rows = db.query(RequestStatusCounter.status, RequestStatusCounter.request_count).all()
+    return {status: int(count or 0) for status, count in rows}
+
+
+def get_status_count(db: Session, status: RequestStatus) -> int:
+    """Get number of requests in a single status"""
+    count = db.query(RequestStatusCounter.request_count).filter(
+        RequestStatusCounter.status == status
+    ).scalar()
+    return int(count or 0)
+
+
+def get_dashboard_aggregates(db: Session, months: int = 6) -> Dict[str, Any]:
+    """Read all dashboard chart data from the summary tables"""
+    now = datetime.now(timezone.utc)
+    since_month = month_key(now - timedelta(days=30 * months))
+
+    # Monthly trend
+    monthly = {}
+    monthly_rows = db.query(RequestStatsMonthly).filter(
+        RequestStatsMonthly.month >= since_month,
+        RequestStatsMonthly.request_count > 0
+    ).all()
+    for row in monthly_rows:
+        entry = monthly.setdefault(row.month, {'month': row.month, 'total': 0, 'approved': 0, 'rejected': 0})
+        entry['total'] += row.request_count
+        if row.status == RequestStatus.APPROVED:
+            entry['approved'] += row.request_count
+        elif row.status == RequestStatus.REJECTED:
+            entry['rejected'] += row.request_count
+
+    # Requests by system (top 5)
+    total_expr = func.sum(RequestStatsSystem.request_count)
+    top_systems = db.query(
+        System.id,
+        System.name,
+        System.code,
+        total_expr.label('total'),
+        func.sum(case((RequestStatsSystem.status == RequestStatus.APPROVED, RequestStatsSystem.request_count), else_=0)).label('approved'),
+        func.sum(case((RequestStatsSystem.status == RequestStatus.IN_REVIEW, RequestStatsSystem.request_count), else_=0)).label('pending')
+    ).join(
+        RequestStatsSystem, RequestStatsSystem.system_id == System.id
+    ).group_by(
+        System.id, System.name, System.code
+    ).having(total_expr > 0).order_by(total_expr.desc()).limit(5).all()
+
+    # Top requesters (top 5)
+    top_requesters = db.query(
+        User.id,
+        User.full_name,
+        User.department,
+        RequestStatsRequester.request_count.label('total_requests')
+    ).join(
+        RequestStatsRequester, RequestStatsRequester.user_id == User.id
+    ).filter(
+        RequestStatsRequester.request_count > 0
+    ).order_by(RequestStatsRequester.request_count.desc()).limit(5).all()
+
+    # Approval metrics
+    approval_totals = db.query(
+        func.sum(ApprovalStatsMonthly.timed_count),
+        func.sum(ApprovalStatsMonthly.total_hours),
+        func.min(ApprovalStatsMonthly.min_hours),
+        func.max(ApprovalStatsMonthly.max_hours),
+        func.sum(case((ApprovalStatsMonthly.month == month_key(now), ApprovalStatsMonthly.approved_count), else_=0))
+    ).one()
+    timed_count, total_hours, min_hours, max_hours, approved_this_month = approval_totals
+
+    return {
+        'status_totals': get_status_totals(db),
+        'monthly_trend': [monthly[m] for m in sorted(monthly)],
+        'top_systems': top_systems,
+        'top_requesters': top_requesters,
+        'approval_metrics': {
+            'avg_hours': (total_hours / timed_count) if timed_count else 0,
+            'min_hours': min_hours or 0,
+            'max_hours': max_hours or 0,
+            'approved_this_month': int(approved_this_month or 0),
+        },
+    }
@@ -4,6 +4,7 @@ Background scheduler for periodic tasks like access revocation.
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
+from datetime import datetime
 import logging
 
 from app.db.session import SessionLocal
@@ -38,6 +39,117 @@ def check_expired_accesses():
         db.close()
 
 
+def rebuild_dashboard_stats():
+    """Background job to rebuild dashboard summary tables and repair drift."""
+    from app.services.request_stats import rebuild_request_stats
+
+    logger.info("Rebuilding dashboard statistics...")
+
+    db = SessionLocal()
+    try:
+        if not rebuild_request_stats(db):
+            logger.info("Dashboard statistics rebuild already running in another worker")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error during dashboard statistics rebuild: {e}")
+    finally:
+        db.close()
+
+
+def rebuild_effective_access():
+    """Background job to recompute the effective access table."""
+    from app.services.effective_access import rebuild_effective_access as rebuild
+
+    db = SessionLocal()
+    try:
+        if rebuild(db) is None:
+            logger.info("Effective access rebuild already running in another worker")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error rebuilding effective access: {e}")
+    finally:
+        db.close()
+
+
+def reconcile_status_counters():
+    """Background job to check request status counters for drift and repair it."""
+    from app.services.request_stats import reconcile_status_counters as reconcile
+
+    db = SessionLocal()
+    try:
+        drift = reconcile(db)
+        if drift is None:
+            logger.info("Status counter reconciliation already running in another worker")
+        elif not drift:
+            logger.info("Request status counters are consistent")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error during status counter reconciliation: {e}")
+    finally:
+        db.close()
+
+
+def scan_sod_violations():
+    """Background job to scan all users for SoD violations and log a summary."""
+    from app.services.sod_scan import run_scheduled_scan
+
+    db = SessionLocal()
+    try:
+        summary = run_scheduled_scan(db)
+        if summary is None:
+            logger.info("SoD violation scan already running in another worker")
+        elif summary['total_violations']:
+            logger.warning(
+                f"SoD scan: {summary['total_violations']} violations "
+                f"across {summary['total_users']} users, by severity: {summary['by_severity']}"
+            )
+        else:
+            logger.info("SoD scan: no violations found")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error during SoD violation scan: {e}")
+    finally:
+        db.close()
+
+
+def rebuild_recommendations():
+    """Background job to recompute the recommendation frequency tables."""
+    from app.services.recommendations import rebuild_recommendation_model
+
+    db = SessionLocal()
+    try:
+        if not rebuild_recommendation_model(db):
+            logger.info("Recommendation model rebuild already running in another worker")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error rebuilding recommendation model: {e}")
+    finally:
+        db.close()
+
+
+def build_autocomplete_index():
+    """Background job to rebuild this worker's autocomplete index."""
+    from app.services.autocomplete import autocomplete_index
+
+    db = SessionLocal()
+    try:
+        autocomplete_index.rebuild(db)
+    except Exception as e:
+        logger.error(f"Error rebuilding autocomplete index: {e}")
+    finally:
+        db.close()
+
+
+def cleanup_export_files():
+    """Background job to delete expired export jobs and artifacts."""
+    from app.services.export_jobs import cleanup_exports
+
+    try:
+        cleanup_exports()
+    except Exception as e:
+        logger.error(f"Error cleaning up exports: {e}")
+
+
 def start_scheduler():
     """Start the background scheduler with configured jobs."""
     if scheduler.running:
@@ -62,6 +174,71 @@ def start_scheduler():
         replace_existing=True
     )
 
+    # Rebuild dashboard summary tables every night at 2:00 AM
+    scheduler.add_job(
+        rebuild_dashboard_stats,
+        CronTrigger(hour=2, minute=0),
+        id='rebuild_dashboard_stats_daily',
+        name='Daily dashboard statistics rebuild',
+        replace_existing=True
+    )
+
+    # Rebuild the effective access table every night at 2:30 AM
+    scheduler.add_job(
+        rebuild_effective_access,
+        CronTrigger(hour=2, minute=30),
+        id='rebuild_effective_access_daily',
+        name='Daily effective access rebuild',
+        replace_existing=True
+    )
+
+    # Check status counters for drift every hour
+    scheduler.add_job(
+        reconcile_status_counters,
+        IntervalTrigger(hours=1),
+        id='reconcile_status_counters_hourly',
+        name='Hourly request status counter reconciliation',
+        replace_existing=True
+    )
+
+    # Scan the organization for SoD violations every night at 3:00 AM
+    scheduler.add_job(
+        scan_sod_violations,
+        CronTrigger(hour=3, minute=0),
+        id='scan_sod_violations_daily',
+        name='Daily SoD violation scan',
+        replace_existing=True
+    )
+
+    # Recompute recommendation frequency tables every hour (and once on startup)
+    scheduler.add_job(
+        rebuild_recommendations,
+        IntervalTrigger(hours=1),
+        id='rebuild_recommendations_hourly',
+        name='Hourly recommendation model rebuild',
+        next_run_time=datetime.now(),
+        replace_existing=True
+    )
+
+    # Rebuild the autocomplete index to pick up changes made by other workers
+    from app.services.autocomplete import REFRESH_INTERVAL
+    scheduler.add_job(
+        build_autocomplete_index,
+        IntervalTrigger(seconds=REFRESH_INTERVAL),
+        id='build_autocomplete_index',
+        name='Autocomplete index refresh',
+        replace_existing=True
+    )
+
+    # Delete expired export artifacts every hour
+    scheduler.add_job(
+        cleanup_export_files,
+        IntervalTrigger(hours=1),
+        id='cleanup_export_files_hourly',
+        name='Hourly export artifact cleanup',
+        replace_existing=True
+    )
+
     scheduler.start()
     logger.info("Background scheduler started")
 
@@ -0,0 +1,194 @@
+"""
+In-memory Segregation of Duties conflict graph.
+
+All active SodConflict rules are loaded once into an adjacency map keyed by
+role id, with role and system names denormalized onto each edge, so conflict
+checks never touch the database. The graph is rebuilt when invalidated (SoD
+rule create/update/delete, system rename/delete in this worker) and at most
+GRAPH_TTL seconds after the last load so other workers pick up changes too.
+
+Invalidation only reaches the worker that handled the change: every other
+worker keeps checking against its previous graph for up to GRAPH_TTL
+seconds. That is acceptable for the advisory checks, but not for the
+hard-block gates of request creation, which use get_hard_block_conflicts()
+to read the active HARD_BLOCK rules from the database on every call.
+"""
+from typing import Dict, List, Iterable, Optional
+import threading
+import time
+import logging
+
+from sqlalchemy import or_, and_
+from sqlalchemy.orm import Session, aliased
+
+from app.models import SodConflict, SodSeverity
+from app.models.system import AccessRole, System
+
+logger = logging.getLogger(__name__)
+
+# Maximum age of the graph before it is reloaded
+GRAPH_TTL = 60  # seconds
+
+
+class SodConflictGraph:
+    """Thread-safe process-wide SoD conflict graph"""
+
+    def __init__(self, ttl: int = GRAPH_TTL):
+        self._ttl = ttl
+        self._lock = threading.RLock()
+        self._adjacency: Dict[int, Dict[int, List[dict]]] = {}
+        self._roles: Dict[int, dict] = {}
+        self._loaded_at: Optional[float] = None
+
+    def _load(self, db: Session):
+        """Build adjacency map from all active conflict rules"""
+        role_a = aliased(AccessRole)
+        role_b = aliased(AccessRole)
+        system_a = aliased(System)
+        system_b = aliased(System)
+
+        rows = db.query(
+            SodConflict.id,
+            SodConflict.role_a_id,
+            SodConflict.role_b_id,
+            SodConflict.conflict_name,
+            SodConflict.description,
+            SodConflict.severity,
+            role_a.name.label('role_a_name'),
+            system_a.name.label('role_a_system'),
+            role_b.name.label('role_b_name'),
+            system_b.name.label('role_b_system'),
+        ).join(
+            role_a, role_a.id == SodConflict.role_a_id
+        ).join(
+            role_b, role_b.id == SodConflict.role_b_id
+        ).outerjoin(
+            system_a, system_a.id == role_a.system_id
+        ).outerjoin(
+            system_b, system_b.id == role_b.system_id
+        ).filter(
+            SodConflict.is_active == True
+        ).order_by(SodConflict.id).all()
+
+        adjacency = {}
+        roles = {}
+        for row in rows:
+            edge = {
+                'conflict_id': row.id,
+                'conflict_name': row.conflict_name,
+                'description': row.description,
+                'severity': row.severity.value if hasattr(row.severity, 'value') else row.severity,
+            }
+            roles[row.role_a_id] = {'name': row.role_a_name, 'system': row.role_a_system or 'Unknown'}
+            roles[row.role_b_id] = {'name': row.role_b_name, 'system': row.role_b_system or 'Unknown'}
+            # Conflicts are bidirectional
+            adjacency.setdefault(row.role_a_id, {}).setdefault(row.role_b_id, []).append(edge)
+            if row.role_b_id != row.role_a_id:
+                adjacency.setdefault(row.role_b_id, {}).setdefault(row.role_a_id, []).append(edge)
+
+        # Swap in the new maps; readers holding the old ones are unaffected
+        self._adjacency = adjacency
+        self._roles = roles
+        self._loaded_at = time.monotonic()
+        logger.debug(f"SoD conflict graph loaded: {len(rows)} rules, {len(roles)} roles")
+
+    def _snapshot(self, db: Session):
+        """Return current (adjacency, roles), reloading if invalidated or expired"""
+        with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at > self._ttl:
+                self._load(db)
+            return self._adjacency, self._roles
+
+    def invalidate(self):
+        """Force reload on next check"""
+        with self._lock:
+            self._loaded_at = None
+
+    def find_conflicts(
+        self,
+        db: Session,
+        requested_role_id: int,
+        existing_role_ids: Iterable[int],
+        severity: Optional[SodSeverity] = None
+    ) -> List[dict]:
+        """Return violations between requested role and existing roles.
+
+        Each violation has the same shape as the SodViolation schema.
+        """
+        adjacency, roles = self._snapshot(db)
+        neighbours = adjacency.get(requested_role_id)
+        if not neighbours:
+            return []
+
+        violations = []
+        for existing_role_id in dict.fromkeys(existing_role_ids):
+            for edge in neighbours.get(existing_role_id, ()):
+                if severity is not None and edge['severity'] != severity.value:
+                    continue
+                requested_role = roles[requested_role_id]
+                existing_role = roles[existing_role_id]
+                violations.append({
+                    **edge,
+                    'requested_role_id': requested_role_id,
+                    'requested_role_name': requested_role['name'],
+                    'requested_role_system': requested_role['system'],
+                    'existing_role_id': existing_role_id,
+                    'existing_role_name': existing_role['name'],
+                    'existing_role_system': existing_role['system'],
+                })
+        return violations
+
+    def find_pairwise_conflicts(self, db: Session, role_ids: List[int]) -> List[dict]:
+        """Return violations between every pair of the given roles"""
+        violations = []
+        for i, role_a in enumerate(role_ids):
+            violations.extend(self.find_conflicts(db, role_a, role_ids[i+1:]))
+        return violations
+
+
+def get_hard_block_conflicts(
+    db: Session,
+    role_id: int,
+    other_role_ids: Optional[Iterable[int]] = None
+) -> Dict[int, dict]:
+    """Map conflicting role id -> first active HARD_BLOCK rule for the given role.
+
+    Read from the database rather than the graph, so a rule added in another
+    worker is enforced immediately. `other_role_ids` limits the result to
+    conflicts with those roles.
+    """
+    query = db.query(
+        SodConflict.id,
+        SodConflict.role_a_id,
+        SodConflict.role_b_id,
+        SodConflict.conflict_name,
+        SodConflict.description,
+        SodConflict.severity,
+    ).filter(
+        SodConflict.is_active == True,
+        SodConflict.severity == SodSeverity.HARD_BLOCK
+    )
+
+    if other_role_ids is None:
+        query = query.filter(or_(SodConflict.role_a_id == role_id, SodConflict.role_b_id == role_id))
+    else:
+        other_role_ids = list(other_role_ids)
+        query = query.filter(or_(
+            and_(SodConflict.role_a_id == role_id, SodConflict.role_b_id.in_(other_role_ids)),
+            and_(SodConflict.role_b_id == role_id, SodConflict.role_a_id.in_(other_role_ids)),
+        ))
+
+    result = {}
+    for row in query.order_by(SodConflict.id):
+        other_role_id = row.role_b_id if row.role_a_id == role_id else row.role_a_id
+        result.setdefault(other_role_id, {
+            'conflict_id': row.id,
+            'conflict_name': row.conflict_name,
+            'description': row.description,
+            'severity': row.severity.value if hasattr(row.severity, 'value') else row.severity,
+        })
+    return result
+
+
+# Global instance
+sod_graph = SodConflictGraph()
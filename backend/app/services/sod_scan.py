@@ -0,0 +1,151 @@
+"""
+Organization-wide Segregation of Duties violation scan.
+
+Joins every user's effective role set (roles granted by APPROVED/IMPLEMENTED
+requests) against the active SodConflict rules in a single set-based query,
+instead of checking users one by one. Results are streamed from a server-side
+cursor so the scan runs in constant memory regardless of the number of users.
+"""
+from typing import Iterator, Dict, Any, Optional
+import logging
+
+from sqlalchemy import select, func, or_, text
+from sqlalchemy.orm import Session, aliased
+
+from app.models import AccessRequest, User, RequestStatus, SodConflict, SodSeverity
+from app.models.system import AccessRole, System
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched from the server-side cursor per round trip
+SCAN_BATCH_SIZE = 1000
+
+# pg_try_advisory_xact_lock key: the nightly scan runs in one worker at a time
+SCAN_LOCK_KEY = 720006
+
+
+def _effective_roles():
+    """Subquery of distinct (user_id, role_id) pairs the users currently hold"""
+    return select(
+        AccessRequest.target_user_id.label('user_id'),
+        AccessRequest.access_role_id.label('role_id')
+    ).where(
+        AccessRequest.status.in_([RequestStatus.APPROVED, RequestStatus.IMPLEMENTED])
+    ).distinct().subquery('effective_roles')
+
+
+def _violation_pairs(system_id: Optional[int], severity: Optional[SodSeverity]):
+    """Build (role_a holder, role_b holder, conflict) join with filters applied.
+
+    Returns (statement, role_a, role_b, system_a, system_b) for callers to select from.
+    """
+    holds_a = _effective_roles()
+    holds_b = aliased(holds_a, name='effective_roles_b')
+    role_a = aliased(AccessRole)
+    role_b = aliased(AccessRole)
+    system_a = aliased(System)
+    system_b = aliased(System)
+
+    stmt = select(SodConflict).join(
+        holds_a, holds_a.c.role_id == SodConflict.role_a_id
+    ).join(
+        holds_b,
+        (holds_b.c.user_id == holds_a.c.user_id) & (holds_b.c.role_id == SodConflict.role_b_id)
+    ).join(
+        User, User.id == holds_a.c.user_id
+    ).join(
+        role_a, role_a.id == SodConflict.role_a_id
+    ).join(
+        role_b, role_b.id == SodConflict.role_b_id
+    ).outerjoin(
+        system_a, system_a.id == role_a.system_id
+    ).outerjoin(
+        system_b, system_b.id == role_b.system_id
+    ).where(
+        SodConflict.is_active == True
+    )
+
+    if system_id is not None:
+        stmt = stmt.where(or_(role_a.system_id == system_id, role_b.system_id == system_id))
+    if severity is not None:
+        stmt = stmt.where(SodConflict.severity == severity)
+
+    return stmt, role_a, role_b, system_a, system_b
+
+
+def scan_sod_violations(
+    db: Session,
+    system_id: Optional[int] = None,
+    severity: Optional[SodSeverity] = None,
+    batch_size: int = SCAN_BATCH_SIZE
+) -> Iterator[Dict[str, Any]]:
+    """Yield one dict per (user, violated conflict rule), ordered by user"""
+    stmt, role_a, role_b, system_a, system_b = _violation_pairs(system_id, severity)
+    stmt = stmt.with_only_columns(
+        User.id.label('user_id'),
+        User.username,
+        User.full_name,
+        User.department,
+        SodConflict.id.label('conflict_id'),
+        SodConflict.conflict_name,
+        SodConflict.severity,
+        role_a.id.label('role_a_id'),
+        role_a.name.label('role_a_name'),
+        system_a.name.label('role_a_system'),
+        role_b.id.label('role_b_id'),
+        role_b.name.label('role_b_name'),
+        system_b.name.label('role_b_system'),
+        maintain_column_froms=True
+    ).order_by(User.id, SodConflict.id)
+
+    result = db.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+    for row in result:
+        violation = dict(row._mapping)
+        violation['severity'] = row.severity.value if hasattr(row.severity, 'value') else row.severity
+        yield violation
+
+
+def summarize_sod_violations(
+    db: Session,
+    system_id: Optional[int] = None,
+    severity: Optional[SodSeverity] = None
+) -> Dict[str, Any]:
+    """Count violations and affected users per severity without fetching rows"""
+    stmt, *_ = _violation_pairs(system_id, severity)
+    stmt = stmt.with_only_columns(
+        SodConflict.severity,
+        func.count().label('violations'),
+        func.count(func.distinct(User.id)).label('users'),
+        maintain_column_froms=True
+    ).group_by(SodConflict.severity)
+
+    by_severity = {}
+    for row in db.execute(stmt):
+        key = row.severity.value if hasattr(row.severity, 'value') else row.severity
+        by_severity[key] = {'violations': row.violations, 'users': row.users}
+
+    total_stmt, *_ = _violation_pairs(system_id, severity)
+    total_users = db.execute(total_stmt.with_only_columns(
+        func.count(func.distinct(User.id)), maintain_column_froms=True
+    )).scalar()
+
+    return {
+        'total_violations': sum(v['violations'] for v in by_severity.values()),
+        'total_users': int(total_users or 0),
+        'by_severity': by_severity,
+    }
+
+
+def run_scheduled_scan(db: Session) -> Optional[Dict[str, Any]]:
+    """Organization-wide summary for the nightly job.
+
+    Returns None if another worker is already running the scan.
+    """
+    if not db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {'key': SCAN_LOCK_KEY}).scalar():
+        db.rollback()
+        return None
+    try:
+        return summarize_sod_violations(db)
+    finally:
+        # Ends the read-only transaction and releases the lock
+        db.rollback()
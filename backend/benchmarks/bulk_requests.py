@@ -0,0 +1,63 @@
+"""
+Bulk request creation throughput at 10 / 100 / 1000 target users.
+
+    cd backend && python -m benchmarks.bulk_requests [--repeat 5]
+
+Each batch is created with create_bulk_requests() and committed, as the
+POST /requests/bulk endpoint does. The system gets a two-step approval
+chain, so every created request also inserts two approvals and an audit
+log entry.
+"""
+import argparse
+import statistics
+
+from app.db.session import SessionLocal
+from app.models import ApprovalChain, RequestType, User
+from app.schemas.request import BulkRequestCreate, MAX_BULK_REQUEST_USERS
+from app.services.bulk_requests import create_bulk_requests
+from benchmarks.common import run_tag, create_users, create_system, measure, summary
+
+BATCH_SIZES = (10, 100, MAX_BULK_REQUEST_USERS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        tag = run_tag()
+        approver_id, requester_id = create_users(db, f"{tag}a", 2, is_superuser=True)
+        system, role = create_system(db, tag)
+        db.add_all([
+            ApprovalChain(system_id=system.id, step_number=1, approver_id=approver_id, approver_role='manager'),
+            ApprovalChain(system_id=system.id, step_number=2, approver_id=approver_id, approver_role='security_officer'),
+        ])
+        target_ids = create_users(db, tag, max(BATCH_SIZES))
+        db.commit()
+        requester = db.get(User, requester_id)
+
+        for size in BATCH_SIZES:
+            request_in = BulkRequestCreate(
+                user_ids=target_ids[:size],
+                system_id=system.id,
+                access_role_id=role.id,
+                request_type=RequestType.NEW_ACCESS,
+                purpose="Benchmark bulk request",
+            )
+
+            def run():
+                result = create_bulk_requests(db, request_in, requester)
+                db.commit()
+                assert result['created'] == size, result['skipped'][:3]
+
+            samples = measure(run, args.repeat)
+            rate = size / statistics.median(samples)
+            print(f"{size:>5} users: {rate:,.0f} requests/s ({summary(samples)})")
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Helpers shared by the benchmark scripts.
+
+The benchmarks write their own fixture data (tagged with a random run id so
+they can be repeated) and commit it: run them against a scratch database
+with the migrations applied, never against production.
+"""
+from typing import Callable, List, Tuple
+import statistics
+import time
+import uuid
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models import User, System, AccessRole, AccessLevel
+
+
+def run_tag() -> str:
+    return uuid.uuid4().hex[:8]
+
+
+def create_users(db: Session, tag: str, count: int, **values) -> List[int]:
+    """Insert `count` active users; returns their ids"""
+    rows = [
+        {
+            "username": f"bench_{tag}_{i}",
+            "email": f"bench_{tag}_{i}@bench.example.com",
+            "full_name": f"Bench User {tag} {i}",
+            "hashed_password": "!",
+            **values,
+        }
+        for i in range(count)
+    ]
+    return list(db.execute(insert(User).returning(User.id, sort_by_parameter_order=True), rows).scalars())
+
+
+def create_system(db: Session, tag: str) -> Tuple[System, AccessRole]:
+    """A system with one role"""
+    system = System(name=f"Bench system {tag}", code=f"B{tag}")
+    db.add(system)
+    db.flush()
+    role = AccessRole(system_id=system.id, name=f"Bench role {tag}", code="BENCH", access_level=AccessLevel.READ)
+    db.add(role)
+    db.flush()
+    return system, role
+
+
+def measure(fn: Callable[[], object], repeat: int) -> List[float]:
+    """Wall-clock seconds of `repeat` calls of fn"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def percentile(samples: List[float], p: float) -> float:
+    """p-th percentile (nearest rank)"""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def summary(samples: List[float]) -> str:
+    return (f"median {statistics.median(samples) * 1000:.1f} ms, "
+            f"p99 {percentile(samples, 99) * 1000:.1f} ms, n={len(samples)}")
@@ -0,0 +1,190 @@
+"""
+Latency of the hot read endpoints under 200 concurrent clients.
+
+    cd backend && python -m benchmarks.hot_reads [--clients 200] [--rounds 10] [--mode both]
+
+The application runs in-process on one event loop, like a single uvicorn
+worker, and every client is a different user with its own token. Each
+round, every client calls each endpoint once; p50 / p99 latency is
+reported per endpoint, with the connection checkout waits of the pools.
+
+The same endpoints run twice. In "async" mode they use the AsyncSession as
+deployed. In "sync" mode get_async_db (and the principal lookup of
+get_current_user) use SyncSessionShim instead, which runs the same
+statements on a synchronous Session inline on the event loop, as these
+async endpoints did before they moved to asyncpg. An unmeasured warm-up
+round precedes each mode, so both start with established connections and
+a filled principal cache.
+
+Postgres should run on other cores than the benchmark: on a single core
+the two compete for the CPU, nothing is left to overlap with the database
+round trips, and both modes reach the same throughput.
+"""
+from contextlib import asynccontextmanager
+import argparse
+import asyncio
+import logging
+import time
+from typing import Dict, List
+
+import httpx
+from sqlalchemy import insert
+
+from app.api import deps
+from app.core.security import create_access_token
+from app.db.pool_metrics import get_pool_stats
+from app.db.session import SessionLocal, async_session, get_async_db
+from app.main import app
+from app.models import AccessRequest, RequestStatus, RequestType
+from benchmarks.common import run_tag, create_users, create_system, percentile
+
+REQUESTS_PER_USER = 20
+
+ENDPOINTS = {
+    'my-requests': '/api/requests/my-requests',
+    'dashboard': '/api/requests/dashboard',
+    'search/suggestions': '/api/requests/search/suggestions?q=bench',
+    'request detail': '/api/requests/{request_id}',
+}
+
+
+class SyncSessionShim:
+    """The subset of the AsyncSession API the endpoints use, run on a sync Session"""
+
+    def __init__(self, db):
+        self.db = db
+
+    async def execute(self, statement, *args, **kwargs):
+        return self.db.execute(statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        return self.db.scalar(statement, *args, **kwargs)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return fn(self.db, *args, **kwargs)
+
+
+@asynccontextmanager
+async def sync_shim_session():
+    db = SessionLocal()
+    try:
+        yield SyncSessionShim(db)
+    finally:
+        db.close()
+
+
+async def get_sync_shim_db():
+    async with sync_shim_session() as db:
+        yield db
+
+
+def create_fixtures(clients: int):
+    """Users with REQUESTS_PER_USER requests each; returns [(token, request_id)]"""
+    db = SessionLocal()
+    try:
+        tag = run_tag()
+        system, role = create_system(db, tag)
+        user_ids = create_users(db, tag, clients)
+        rows = [
+            {
+                "request_number": f"BENCH-{tag}-{user_id}-{i}",
+                "requester_id": user_id,
+                "target_user_id": user_id,
+                "system_id": system.id,
+                "access_role_id": role.id,
+                "request_type": RequestType.NEW_ACCESS,
+                "purpose": "Benchmark request",
+                "status": RequestStatus.IMPLEMENTED if i % 2 else RequestStatus.IN_REVIEW,
+            }
+            for user_id in user_ids for i in range(REQUESTS_PER_USER)
+        ]
+        request_ids = db.execute(
+            insert(AccessRequest).returning(AccessRequest.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+        db.commit()
+    finally:
+        db.close()
+
+    return [
+        (create_access_token({"sub": str(user_id)}), request_ids[n * REQUESTS_PER_USER])
+        for n, user_id in enumerate(user_ids)
+    ]
+
+
+async def client(http: httpx.AsyncClient, token: str, request_id: int, rounds: int,
+                 samples: Dict[str, List[float]]):
+    headers = {"Authorization": f"Bearer {token}"}
+    for _ in range(rounds):
+        for name, url in ENDPOINTS.items():
+            started = time.perf_counter()
+            response = await http.get(url.format(request_id=request_id), headers=headers)
+            samples[name].append(time.perf_counter() - started)
+            response.raise_for_status()
+
+
+def pool_waits() -> Dict[str, tuple]:
+    """(checkouts, total checkout ms, session slot waits, total slot wait ms) per pool"""
+    return {
+        name: (pool['checkouts'], pool['checkout_time_ms_total'], pool['queue_waits'], pool['queue_time_ms_total'])
+        for name, pool in get_pool_stats()['pools'].items()
+    }
+
+
+async def run_mode(http: httpx.AsyncClient, fixtures, rounds: int):
+    # Warm-up round, not measured
+    await asyncio.gather(*(client(http, token, request_id, 1, {name: [] for name in ENDPOINTS})
+                           for token, request_id in fixtures))
+
+    samples = {name: [] for name in ENDPOINTS}
+    before = pool_waits()
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        client(http, token, request_id, rounds, samples) for token, request_id in fixtures
+    ))
+    elapsed = time.perf_counter() - started
+    after = pool_waits()
+
+    total = sum(len(s) for s in samples.values())
+    print(f"  {total} requests in {elapsed:.1f}s ({total / elapsed:,.0f} req/s)")
+    for name, values in samples.items():
+        print(f"  {name:<28} p50 {percentile(values, 50) * 1000:7.1f} ms   p99 {percentile(values, 99) * 1000:7.1f} ms")
+    for name, values in after.items():
+        checkouts, checkout_ms, queued, queue_ms = (
+            value - previous for value, previous in zip(values, before.get(name, (0, 0, 0, 0)))
+        )
+        if checkouts:
+            line = f"  {name} pool: {checkouts} checkouts, avg checkout {checkout_ms / checkouts:.2f} ms"
+            if queued:
+                line += f", avg slot wait {queue_ms / queued:.2f} ms"
+            print(line)
+
+
+async def run(clients: int, rounds: int, modes: List[str]):
+    fixtures = create_fixtures(clients)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        for mode in modes:
+            if mode == 'sync':
+                app.dependency_overrides[get_async_db] = get_sync_shim_db
+                deps.async_session = sync_shim_session  # Principal cache misses
+            print(f"{mode}: {clients} clients x {rounds} rounds")
+            try:
+                await run_mode(http, fixtures, rounds)
+            finally:
+                app.dependency_overrides.pop(get_async_db, None)
+                deps.async_session = async_session
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--mode', choices=['sync', 'async', 'both'], default='both')
+    args = parser.parse_args()
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    modes = ['sync', 'async'] if args.mode == 'both' else [args.mode]
+    asyncio.run(run(args.clients, args.rounds, modes))
+
+
+if __name__ == '__main__':
+    main()
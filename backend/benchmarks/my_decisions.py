@@ -0,0 +1,120 @@
+"""
+/requests/my-decisions latency for an approver with 100,000 decisions.
+
+    cd backend && python -m benchmarks.my_decisions [--decisions 100000] [--repeat 20]
+
+The fixture gives one approver DECISIONS decided approvals on as many
+requests; every tenth request has a second, older decision by the same
+approver so the latest-decision de-duplication has work to do. The first,
+a middle and the last page are timed, plus the first page filtered to
+rejections.
+"""
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from sqlalchemy import insert, text
+
+from app.core.security import create_access_token
+from app.db.session import SessionLocal
+from app.main import app
+from app.models import AccessRequest, Approval, ApprovalStatus, RequestStatus, RequestType
+from benchmarks.common import run_tag, create_users, create_system, summary
+
+BATCH_SIZE = 10000
+PAGE_SIZE = 50
+
+
+def create_fixtures(decisions: int) -> str:
+    """Approver with `decisions` decided requests; returns the approver's token"""
+    db = SessionLocal()
+    try:
+        tag = run_tag()
+        system, role = create_system(db, tag)
+        requester_id, approver_id = create_users(db, tag, 2)
+        decided_at = datetime.now(timezone.utc)
+
+        for start in range(0, decisions, BATCH_SIZE):
+            count = min(BATCH_SIZE, decisions - start)
+            request_ids = db.execute(
+                insert(AccessRequest).returning(AccessRequest.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "request_number": f"BENCH-{tag}-{start + i}",
+                        "requester_id": requester_id,
+                        "target_user_id": requester_id,
+                        "system_id": system.id,
+                        "access_role_id": role.id,
+                        "request_type": RequestType.NEW_ACCESS,
+                        "purpose": "Benchmark request",
+                        "status": RequestStatus.APPROVED,
+                    }
+                    for i in range(count)
+                ]
+            ).scalars().all()
+
+            approvals = []
+            for i, request_id in enumerate(request_ids):
+                n = start + i
+                approvals.append({
+                    "request_id": request_id,
+                    "step_number": 1,
+                    "approver_id": approver_id,
+                    "status": ApprovalStatus.REJECTED if n % 7 == 0 else ApprovalStatus.APPROVED,
+                    "decision_date": decided_at - timedelta(minutes=n),
+                })
+                if n % 10 == 0:
+                    approvals.append({
+                        "request_id": request_id,
+                        "step_number": 2,
+                        "approver_id": approver_id,
+                        "status": ApprovalStatus.APPROVED,
+                        "decision_date": decided_at - timedelta(minutes=n, days=30),
+                    })
+            db.execute(insert(Approval), approvals)
+            db.commit()
+
+        # Fresh statistics, as autovacuum would have them on a real table
+        db.execute(text("ANALYZE access_requests, approvals"))
+        db.commit()
+    finally:
+        db.close()
+    return create_access_token({"sub": str(approver_id)})
+
+
+async def run(decisions: int, repeat: int):
+    token = create_fixtures(decisions)
+    headers = {"Authorization": f"Bearer {token}"}
+    pages = {
+        'first page': f"skip=0&limit={PAGE_SIZE}",
+        'middle page': f"skip={decisions // 2}&limit={PAGE_SIZE}",
+        'last page': f"skip={decisions - PAGE_SIZE}&limit={PAGE_SIZE}",
+        'rejected, first page': f"skip=0&limit={PAGE_SIZE}&decision_filter=rejected",
+    }
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as http:
+        for name, query in pages.items():
+            samples = []
+            for _ in range(repeat + 1):
+                started = asyncio.get_running_loop().time()
+                response = await http.get(f"/api/requests/my-decisions?{query}")
+                samples.append(asyncio.get_running_loop().time() - started)
+                response.raise_for_status()
+                assert len(response.json()) == PAGE_SIZE
+            # The first call warms up the principal cache and connection pool
+            print(f"{name:<22} {summary(samples[1:])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--decisions', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    asyncio.run(run(args.decisions, args.repeat))
+
+
+if __name__ == '__main__':
+    main()
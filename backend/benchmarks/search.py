@@ -0,0 +1,123 @@
+"""
+Search latency with 1,000,000 access requests.
+
+    cd backend && python -m benchmarks.search [--requests 1000000] [--repeat 20]
+
+access_requests is topped up to REQUESTS rows (server-side INSERT ... SELECT
+from generate_series), spread over 1,000 target users and 20 systems. Then
+search suggestions (the autocomplete) and global search are timed for a
+short, a broad and a narrow term each.
+
+Global search needs pg_trgm (word_similarity); on a server without it only
+the suggestions are measured.
+"""
+import argparse
+import asyncio
+import logging
+
+import httpx
+from sqlalchemy import text
+
+from app.core.security import create_access_token
+from app.db.session import SessionLocal
+from app.main import app
+from app.models import System, AccessRole, AccessLevel
+from app.services.autocomplete import autocomplete_index
+from benchmarks.common import run_tag, create_users, summary
+
+USERS = 1000
+SYSTEMS = 20
+
+PURPOSE_WORDS = ['reporting', 'payments', 'audit', 'payroll', 'procurement', 'treasury', 'logistics', 'billing']
+
+
+def create_fixtures(requests: int):
+    """Top access_requests up to `requests` rows; returns (token, run tag, whether pg_trgm is installed)"""
+    db = SessionLocal()
+    try:
+        tag = run_tag()
+        user_ids = create_users(db, tag, USERS)
+        roles = []
+        for i in range(SYSTEMS):
+            system = System(name=f"Bench {PURPOSE_WORDS[i % len(PURPOSE_WORDS)]} system {tag} {i}", code=f"B{tag}{i}")
+            db.add(system)
+            db.flush()
+            role = AccessRole(system_id=system.id, name=f"Bench role {tag} {i}", code="BENCH",
+                              access_level=AccessLevel.READ)
+            db.add(role)
+            db.flush()
+            roles.append((system.id, role.id))
+
+        missing = requests - db.execute(text("SELECT count(*) FROM access_requests")).scalar()
+        if missing > 0:
+            db.execute(text("""
+                INSERT INTO access_requests (
+                    request_number, requester_id, target_user_id, system_id, access_role_id,
+                    request_type, status, purpose, is_temporary, current_step, created_at
+                )
+                SELECT
+                    'BENCH-' || :tag || '-' || n,
+                    (:user_ids)[1 + n % :users],
+                    (:user_ids)[1 + n % :users],
+                    (:system_ids)[1 + n % :systems],
+                    (:role_ids)[1 + n % :systems],
+                    'NEW_ACCESS', 'IMPLEMENTED',
+                    'Access for ' || (:words)[1 + n % :word_count] || ' work, ticket ' || n,
+                    false, 1, now() - n * interval '1 minute'
+                FROM generate_series(1, :missing) AS n
+            """), {
+                'tag': tag, 'user_ids': user_ids, 'users': USERS,
+                'system_ids': [system_id for system_id, _ in roles],
+                'role_ids': [role_id for _, role_id in roles], 'systems': SYSTEMS,
+                'words': PURPOSE_WORDS, 'word_count': len(PURPOSE_WORDS), 'missing': missing,
+            })
+        db.commit()
+
+        # Fresh statistics, as autovacuum would have them on a real table
+        db.execute(text("ANALYZE access_requests"))
+        db.commit()
+        autocomplete_index.rebuild(db)
+        has_trgm = db.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).scalar() is not None
+    finally:
+        db.close()
+    return create_access_token({"sub": str(user_ids[0])}), tag, has_trgm
+
+
+async def run(requests: int, repeat: int):
+    token, tag, has_trgm = create_fixtures(requests)
+    terms = {
+        'short': 'be',
+        'broad': 'payments',
+        'narrow': f"BENCH-{tag}-12345",
+    }
+    urls = {f"suggestions, {name}": f"/api/requests/search/suggestions?q={term}" for name, term in terms.items()}
+    if has_trgm:
+        urls.update({f"global search, {name}": f"/api/requests/search/global?q={term}" for name, term in terms.items()})
+    else:
+        print("pg_trgm is not installed: global search is not measured")
+
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as http:
+        for name, url in urls.items():
+            samples = []
+            for _ in range(repeat + 1):
+                started = asyncio.get_running_loop().time()
+                response = await http.get(url)
+                samples.append(asyncio.get_running_loop().time() - started)
+                response.raise_for_status()
+            # The first call warms up the principal cache and connection pool
+            print(f"{name:<24} {summary(samples[1:])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    asyncio.run(run(args.requests, args.repeat))
+
+
+if __name__ == '__main__':
+    main()
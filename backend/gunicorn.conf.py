@@ -0,0 +1,8 @@
+"""Gunicorn server hooks (loaded automatically from the working directory)"""
+
+
+def child_exit(server, worker):
+    """Drop Prometheus multiprocess files of an exited worker (see app.core.metrics)"""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
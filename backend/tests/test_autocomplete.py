@@ -0,0 +1,79 @@
+import pytest
+
+from app.models import System, User
+from app.services import autocomplete
+from app.services.autocomplete import AutocompleteIndex
+
+
+def names(results, kind):
+    return [entry.name for entry in results.get(kind, [])]
+
+
+@pytest.fixture
+def index():
+    index = AutocompleteIndex()
+    for entity_id, name in enumerate(["Payments Gateway", "Payroll", "Treasury Payments", "ABCAB"]):
+        index.upsert('system', entity_id, name)
+    return index
+
+
+def test_trigram_candidates_must_contain_the_query(index):
+    assert names(index.search("ayme"), 'system') == ["Payments Gateway", "Treasury Payments"]
+    # "abcab" has both trigrams of "cabc" but does not contain it
+    assert index.search("cabc") == {}
+
+
+def test_two_character_query_scans_all_entries(index):
+    assert names(index.search("ll"), 'system') == ["Payroll"]
+    assert names(index.search("ay", per_kind=10), 'system') == ["Payroll", "Payments Gateway", "Treasury Payments"]
+    assert index.search("p") == {}
+
+
+def test_ranking_prefers_name_prefix_then_word_prefix_then_shorter_names():
+    index = AutocompleteIndex()
+    for entity_id, name in enumerate(["Legacy ERP Archive", "ERP", "Old ERP", "ERP Finance", "Superpower"]):
+        index.upsert('system', entity_id, name)
+
+    assert names(index.search("erp", per_kind=5), 'system') == [
+        "ERP", "ERP Finance", "Old ERP", "Legacy ERP Archive", "Superpower",
+    ]
+
+
+def test_rename_and_remove(index):
+    index.upsert('system', 1, "Salaries")
+    index.remove('system', 0)
+
+    assert names(index.search("pay"), 'system') == ["Treasury Payments"]
+    assert names(index.search("sala"), 'system') == ["Salaries"]
+
+
+@pytest.fixture
+def loaded_index(db, monkeypatch):
+    """A fresh global index, loaded from the (empty) test database"""
+    index = AutocompleteIndex()
+    monkeypatch.setattr(autocomplete, 'autocomplete_index', index)
+    index.rebuild(db)
+    return index
+
+
+def test_committed_changes_are_indexed(db, loaded_index):
+    db.add(System(name="Payments Gateway", code="PAY"))
+    db.add(User(username="ann", email="ann@example.com", full_name="Ann Payne", hashed_password="!"))
+    db.commit()
+
+    results = loaded_index.search("pay")
+    assert names(results, 'system') == ["Payments Gateway"]
+    assert names(results, 'user') == ["Ann Payne"]
+
+
+def test_rollback_discards_pending_changes(db, loaded_index):
+    db.add(User(username="ann", email="ann@example.com", full_name="Ann Payne", hashed_password="!"))
+    db.flush()
+    db.rollback()
+
+    # The next commit of the session must not apply the rolled-back flush
+    db.add(System(name="Treasury", code="TRE"))
+    db.commit()
+
+    assert loaded_index.search("pay") == {}
+    assert names(loaded_index.search("treas"), 'system') == ["Treasury"]
@@ -0,0 +1,63 @@
+from datetime import datetime, timezone, timedelta
+import json
+import os
+import subprocess
+import sys
+import typing
+import uuid
+
+import pytest
+
+from app.core.config import settings
+from app.schemas.export import ExportJobCreate
+from app.services import export_jobs
+
+
+@pytest.fixture(autouse=True)
+def export_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'EXPORT_DIR', str(tmp_path))
+
+
+def save_job(status, pid, age_seconds):
+    job = {'id': uuid.uuid4().hex, 'kind': 'audit_logs_csv', 'cache_key': 'key', 'status': status, 'pid': pid}
+    export_jobs._save(job)
+    # _save() stamps updated_at; age the record afterwards
+    job['updated_at'] = (datetime.now(timezone.utc) - timedelta(seconds=age_seconds)).isoformat()
+    with open(os.path.join(export_jobs._jobs_dir(), f"{job['id']}.json"), 'w') as f:
+        json.dump(job, f)
+    return job['id']
+
+
+def exited_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def test_long_queued_job_of_a_live_worker_is_still_queued():
+    job_id = save_job('queued', os.getpid(), export_jobs.STALE_AFTER_SECONDS * 2)
+
+    assert export_jobs.get_job(job_id)['status'] == 'queued'
+    assert export_jobs._find_active_job('key')['id'] == job_id
+
+
+def test_queued_job_of_an_exited_worker_is_failed():
+    job_id = save_job('queued', exited_pid(), 0)
+
+    assert export_jobs.get_job(job_id)['status'] == 'failed'
+    assert export_jobs._find_active_job('key') is None
+
+
+def test_running_job_without_heartbeat_is_failed():
+    fresh = save_job('running', os.getpid(), 0)
+    stale = save_job('running', os.getpid(), export_jobs.STALE_AFTER_SECONDS + 1)
+
+    assert export_jobs.get_job(fresh)['status'] == 'running'
+    assert export_jobs.get_job(stale)['status'] == 'failed'
+
+
+def test_every_export_kind_can_be_submitted():
+    kinds = typing.get_args(ExportJobCreate.model_fields['kind'].annotation)
+
+    assert set(kinds) == set(export_jobs.EXPORT_KINDS)
+    assert export_jobs.EXPORT_KINDS['approvals_parquet'].suffix == '.parquet'
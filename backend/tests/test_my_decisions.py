@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta, timezone
+
+from app.api.endpoints.requests import my_decisions_statement
+from app.models import (
+    User, System, AccessRole, AccessLevel, AccessRequest, Approval, ApprovalStatus, RequestStatus, RequestType
+)
+
+DECIDED = [ApprovalStatus.APPROVED, ApprovalStatus.REJECTED]
+NOW = datetime(2026, 10, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def create_requests(db, count):
+    """Approver and `count` requests; returns (approver id, request ids)"""
+    requester = User(username="requester", email="requester@example.com", full_name="Requester", hashed_password="!")
+    approver = User(username="approver", email="approver@example.com", full_name="Approver", hashed_password="!")
+    system = System(name="ERP", code="ERP")
+    db.add_all([requester, approver, system])
+    db.flush()
+    role = AccessRole(system_id=system.id, name="Reader", code="READER", access_level=AccessLevel.READ)
+    db.add(role)
+    db.flush()
+    requests = [
+        AccessRequest(request_number=f"REQ-{i}", requester_id=requester.id, target_user_id=requester.id,
+                      system_id=system.id, access_role_id=role.id, request_type=RequestType.NEW_ACCESS,
+                      status=RequestStatus.IN_REVIEW, purpose="Reporting")
+        for i in range(count)
+    ]
+    db.add_all(requests)
+    db.flush()
+    return approver.id, [request.id for request in requests]
+
+
+def decide(db, request_id, approver_id, step, status, minutes_ago, comment=None):
+    db.add(Approval(request_id=request_id, step_number=step, approver_id=approver_id, status=status,
+                    decision_date=NOW - timedelta(minutes=minutes_ago), comment=comment))
+
+
+def test_latest_decision_per_request_newest_first(db):
+    approver_id, (first, second, third) = create_requests(db, 3)
+    decide(db, first, approver_id, 1, ApprovalStatus.APPROVED, 30, "early")
+    decide(db, first, approver_id, 3, ApprovalStatus.REJECTED, 5, "late")
+    decide(db, second, approver_id, 1, ApprovalStatus.APPROVED, 10)
+    db.add(Approval(request_id=third, step_number=1, approver_id=approver_id, status=ApprovalStatus.PENDING))
+    db.commit()
+
+    rows = db.execute(my_decisions_statement(approver_id, DECIDED)).all()
+
+    assert [(request.id, status, comment) for request, status, _, comment in rows] == [
+        (first, ApprovalStatus.REJECTED, "late"),
+        (second, ApprovalStatus.APPROVED, None),
+    ]
+
+
+def test_filtered_history_uses_latest_matching_decision(db):
+    approver_id, (request_id,) = create_requests(db, 1)
+    decide(db, request_id, approver_id, 1, ApprovalStatus.APPROVED, 30)
+    decide(db, request_id, approver_id, 3, ApprovalStatus.REJECTED, 5)
+    db.commit()
+
+    rows = db.execute(my_decisions_statement(approver_id, [ApprovalStatus.APPROVED])).all()
+
+    assert [(request.id, status) for request, status, _, _ in rows] == [(request_id, ApprovalStatus.APPROVED)]
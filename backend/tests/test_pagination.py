@@ -0,0 +1,61 @@
+from datetime import datetime, timezone
+import asyncio
+
+import pytest
+from fastapi import HTTPException, Response
+
+from app.api.endpoints.users import list_users
+from app.core.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor, keyset_after
+from app.models import User
+
+NOW = datetime(2026, 1, 15, 12, 30, tzinfo=timezone.utc)
+KEY = (User.created_at, User.id)
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor([NOW, 42]), 2) == (NOW, 42)
+
+
+def test_keyset_after_accepts_matching_values():
+    clause = keyset_after(KEY, encode_cursor([NOW, 42]))
+    assert clause.compile().params == {'param_1': NOW, 'param_2': 42}
+
+
+@pytest.mark.parametrize('values', [
+    [NOW],  # wrong size
+    [42, NOW],  # swapped
+    [NOW, "42"],
+    [NOW, True],
+    [NOW, None],
+    [NOW, 2 ** 40],  # outside INTEGER
+    [NOW.isoformat(), 42],  # untagged datetime
+])
+def test_keyset_after_rejects_mismatched_values(values):
+    with pytest.raises(HTTPException) as error:
+        keyset_after(KEY, encode_cursor(values))
+    assert error.value.status_code == 400
+
+
+def test_keyset_after_rejects_garbage():
+    with pytest.raises(HTTPException) as error:
+        keyset_after(KEY, "not-a-cursor")
+    assert error.value.status_code == 400
+
+
+def test_user_list_pages_in_id_order(db):
+    db.add_all([
+        User(username=f"user{i}", email=f"user{i}@example.com", full_name=f"User {i}", hashed_password="!")
+        for i in range(5)
+    ])
+    db.commit()
+
+    pages, cursor = [], None
+    while True:
+        response = Response()
+        users = asyncio.run(list_users(response, limit=2, cursor=cursor, current_user=None, db=db))
+        pages.append([user.username for user in users])
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+
+    assert pages == [["user0", "user1"], ["user2", "user3"], ["user4"]]
@@ -0,0 +1,146 @@
+"""
+Query budgets of the hot routes (settings.SQL_QUERY_BUDGETS).
+
+The routes run on the in-memory SQLite database with SQL profiling on;
+assert_within_budget() fails a test whose request executed more statements
+than its route's budget. AsyncSession endpoints get SyncSessionShim, which
+runs their statements on a synchronous Session.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_user
+from app.core import query_profiler
+from app.core.config import settings
+from app.db.session import get_db, get_async_db
+from app.main import app
+from app.services.autocomplete import autocomplete_index
+from app.models import (
+    User, System, AccessRole, AccessLevel, AccessRequest, Approval, ApprovalStatus,
+    RequestComment, RequestAttachment, RequestStatus, RequestType
+)
+
+HOT_ROUTES = [
+    "/api/requests/my-requests",
+    "/api/requests/{request_id}",
+    "/api/requests/{request_id}/attachments",
+    "/api/requests/search/suggestions?q=ERP",
+    "/api/requests/dashboard",
+]
+
+
+class SyncSessionShim:
+    """The subset of the AsyncSession API the endpoints use, run on a sync Session"""
+
+    def __init__(self, db):
+        self.db = db
+
+    async def execute(self, statement, *args, **kwargs):
+        return self.db.execute(statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        return self.db.scalar(statement, *args, **kwargs)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return fn(self.db, *args, **kwargs)
+
+
+def assert_within_budget(response):
+    """Fail unless the response reports a query budget and stayed within it"""
+    route = f"{response.request.method} {response.request.url.path}"
+    budget = response.headers.get("X-DB-Query-Budget")
+    if budget is None:
+        pytest.fail(f"{route} has no query budget")
+    count = int(response.headers["X-DB-Query-Count"])
+    if count > int(budget):
+        pytest.fail(f"{route} executed {count} SQL queries (budget {budget})")
+
+
+@pytest.fixture
+def seed(sqlite_engine):
+    """A requester with requests that have approvals, comments and attachments; returns (user, request id)"""
+    with Session(sqlite_engine, expire_on_commit=False) as db:
+        users = [
+            User(username=f"user{i}", email=f"user{i}@example.com", full_name=f"User {i}", hashed_password="!")
+            for i in range(6)
+        ]
+        system = System(name="ERP", code="ERP")
+        db.add_all(users + [system])
+        db.flush()
+        role = AccessRole(system_id=system.id, name="Reader", code="READER", access_level=AccessLevel.READ)
+        db.add(role)
+        db.flush()
+
+        requests = [
+            AccessRequest(
+                request_number=f"REQ-2026-{i:05d}", requester_id=users[0].id, target_user_id=users[0].id,
+                system_id=system.id, access_role_id=role.id, request_type=RequestType.NEW_ACCESS,
+                status=RequestStatus.IN_REVIEW, purpose="Quarterly reporting",
+            )
+            for i in range(5)
+        ]
+        db.add_all(requests)
+        db.flush()
+        for request in requests:
+            db.add_all([
+                Approval(request_id=request.id, step_number=step + 1, approver_id=users[step + 1].id,
+                         status=ApprovalStatus.PENDING)
+                for step in range(2)
+            ])
+            db.add_all([
+                RequestComment(request_id=request.id, user_id=users[3 + i].id, comment=f"Comment {i}")
+                for i in range(3)
+            ])
+            db.add(RequestAttachment(request_id=request.id, filename="file.pdf", stored_filename=f"{request.id}.pdf",
+                                     file_path=f"/uploads/{request.id}.pdf", file_size=100,
+                                     content_type="application/pdf", uploaded_by_id=users[5].id))
+        db.commit()
+        db.expunge_all()
+        return users[0], requests[0].id
+
+
+@pytest.fixture
+def client(sqlite_engine, seed, monkeypatch):
+    """TestClient on the SQLite database, authenticated as the seeded requester"""
+    user, _ = seed
+
+    def get_test_db():
+        with Session(sqlite_engine) as db:
+            yield db
+
+    async def get_test_async_db():
+        with Session(sqlite_engine) as db:
+            yield SyncSessionShim(db)
+
+    with Session(sqlite_engine) as db:
+        autocomplete_index.rebuild(db)  # Otherwise the first suggestions call loads it
+
+    monkeypatch.setattr(settings, "SQL_PROFILING", True)
+    app.dependency_overrides[get_db] = get_test_db
+    app.dependency_overrides[get_async_db] = get_test_async_db
+    app.dependency_overrides[get_current_user] = lambda: user
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize("route", HOT_ROUTES)
+def test_hot_route_within_budget(client, seed, route):
+    _, request_id = seed
+    response = client.get(route.format(request_id=request_id))
+
+    assert response.status_code == 200
+    assert_within_budget(response)
+
+
+def test_route_over_budget_fails(client, seed, monkeypatch):
+    _, request_id = seed
+    monkeypatch.setitem(query_profiler.QUERY_BUDGETS, "GET /api/requests/{request_id}", 2)
+
+    response = client.get(f"/api/requests/{request_id}")
+
+    # Over budget is reported, the response itself is unchanged
+    assert response.status_code == 200
+    assert response.headers["X-DB-Query-Count"] == "3"
+    with pytest.raises(pytest.fail.Exception, match=r"executed 3 SQL queries \(budget 2\)"):
+        assert_within_budget(response)
@@ -0,0 +1,86 @@
+from sqlalchemy import event
+
+from app.models import (
+    User, System, AccessRole, AccessLevel, AccessRequest, Approval, ApprovalStatus,
+    RequestComment, RequestAttachment, RequestStatus, RequestType
+)
+from app.services.request_detail import request_detail_statement, serialize_request_detail
+
+
+def create_request(db, approvals=3, comments=4, attachments=2):
+    # Requester, target user and approvers, then comment authors and uploaders
+    # (distinct users, so their relations cannot come from the identity map)
+    users = [
+        User(username=f"user{i}", email=f"user{i}@example.com", full_name=f"User {i}", hashed_password="!")
+        for i in range(approvals + 2 + comments + attachments)
+    ]
+    authors = users[approvals + 2:]
+    system = System(name="ERP", code="ERP")
+    db.add_all(users + [system])
+    db.flush()
+    role = AccessRole(system_id=system.id, name="Reader", code="READER", access_level=AccessLevel.READ)
+    db.add(role)
+    db.flush()
+
+    request = AccessRequest(
+        request_number="REQ-2026-00001",
+        requester_id=users[0].id,
+        target_user_id=users[1].id,
+        system_id=system.id,
+        access_role_id=role.id,
+        request_type=RequestType.NEW_ACCESS,
+        status=RequestStatus.IN_REVIEW,
+        purpose="Quarterly reporting",
+    )
+    db.add(request)
+    db.flush()
+
+    db.add_all([
+        Approval(request_id=request.id, step_number=step + 1, approver_id=users[step + 2].id,
+                 status=ApprovalStatus.PENDING)
+        for step in range(approvals)
+    ])
+    db.add_all([
+        RequestComment(request_id=request.id, user_id=authors[i].id, comment=f"Comment {i}")
+        for i in range(comments)
+    ])
+    db.add_all([
+        RequestAttachment(request_id=request.id, filename=f"file{i}.pdf", stored_filename=f"{i}.pdf",
+                          file_path=f"/uploads/{i}.pdf", file_size=100, content_type="application/pdf",
+                          uploaded_by_id=authors[comments + i].id)
+        for i in range(attachments)
+    ])
+    request_id = request.id
+    db.commit()
+    db.expunge_all()
+    return request_id
+
+
+def count_statements(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    return statements
+
+
+def test_request_detail_runs_three_queries(db, sqlite_engine):
+    request_id = create_request(db)
+    statements = count_statements(sqlite_engine)
+
+    request = db.execute(request_detail_statement(request_id)).unique().scalar_one()
+    detail = serialize_request_detail(request)
+
+    assert len(statements) == 3
+    assert len(detail['approvals']) == 3
+    assert len(detail['comments']) == 4
+    assert len(detail['attachments']) == 2
+    assert all(approval['approver_name'] for approval in detail['approvals'])
+
+
+def test_request_detail_query_count_does_not_grow_with_children(db, sqlite_engine):
+    request_id = create_request(db, approvals=8, comments=30, attachments=12)
+    statements = count_statements(sqlite_engine)
+
+    serialize_request_detail(db.execute(request_detail_statement(request_id)).unique().scalar_one())
+
+    assert len(statements) == 3
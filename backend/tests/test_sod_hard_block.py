@@ -0,0 +1,52 @@
+from app.models import System, AccessRole, AccessLevel, SodConflict, SodSeverity
+from app.services.sod_graph import SodConflictGraph, get_hard_block_conflicts
+
+
+def create_roles(db, count=3):
+    system = System(name="ERP", code="ERP")
+    db.add(system)
+    db.flush()
+    roles = [
+        AccessRole(system_id=system.id, name=f"Role {i}", code=f"ROLE{i}", access_level=AccessLevel.READ)
+        for i in range(count)
+    ]
+    db.add_all(roles)
+    db.flush()
+    return [role.id for role in roles]
+
+
+def add_conflict(db, role_a_id, role_b_id, severity=SodSeverity.HARD_BLOCK, is_active=True):
+    conflict = SodConflict(role_a_id=role_a_id, role_b_id=role_b_id, conflict_name=f"{role_a_id}-{role_b_id}",
+                           severity=severity, is_active=is_active)
+    db.add(conflict)
+    db.commit()
+    return conflict.id
+
+
+def test_rule_added_elsewhere_is_enforced_while_graph_is_cached(db):
+    role_ids = create_roles(db)
+    graph = SodConflictGraph(ttl=3600)
+    assert graph.find_conflicts(db, role_ids[0], [role_ids[1]]) == []
+
+    # Added through another worker: this worker's graph is not invalidated
+    conflict_id = add_conflict(db, role_ids[1], role_ids[0])
+
+    assert graph.find_conflicts(db, role_ids[0], [role_ids[1]]) == []
+    conflicts = get_hard_block_conflicts(db, role_ids[0], [role_ids[1]])
+    assert list(conflicts) == [role_ids[1]]
+    assert conflicts[role_ids[1]]['conflict_id'] == conflict_id
+
+
+def test_only_active_hard_block_rules_with_the_given_roles(db):
+    role_ids = create_roles(db, 5)
+    add_conflict(db, role_ids[0], role_ids[1], severity=SodSeverity.WARNING)
+    add_conflict(db, role_ids[0], role_ids[2], is_active=False)
+    first = add_conflict(db, role_ids[3], role_ids[0])
+    add_conflict(db, role_ids[0], role_ids[3])
+    add_conflict(db, role_ids[0], role_ids[4])
+
+    assert get_hard_block_conflicts(db, role_ids[0], role_ids[1:4]) == {
+        role_ids[3]: {'conflict_id': first, 'conflict_name': f"{role_ids[3]}-{role_ids[0]}",
+                      'description': None, 'severity': 'hard_block'},
+    }
+    assert set(get_hard_block_conflicts(db, role_ids[0])) == {role_ids[3], role_ids[4]}
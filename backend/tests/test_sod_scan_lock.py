@@ -0,0 +1,49 @@
+"""
+The nightly SoD scan runs in one worker at a time (advisory lock).
+
+Needs a PostgreSQL database: set TEST_DATABASE_URL.
+"""
+import os
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.db.session import Base
+from app.services.sod_scan import run_scheduled_scan, SCAN_LOCK_KEY
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+SCHEMA = "idm_sod_scan_test"
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL (PostgreSQL) is not set")
+
+
+@pytest.fixture(scope="module")
+def pg_engine():
+    engine = create_engine(TEST_DATABASE_URL, connect_args={"options": f"-csearch_path={SCHEMA},public"})
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    Base.metadata.create_all(engine)
+    yield engine
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+    engine.dispose()
+
+
+def test_scan_is_skipped_while_another_worker_runs_it(pg_engine):
+    with pg_engine.connect() as other_worker, Session(pg_engine) as db:
+        other_worker.execute(text("SELECT pg_advisory_xact_lock(:key)"), {'key': SCAN_LOCK_KEY})
+
+        assert run_scheduled_scan(db) is None
+
+        other_worker.rollback()
+        assert run_scheduled_scan(db)['total_violations'] == 0
+
+
+def test_scan_releases_the_lock(pg_engine):
+    with Session(pg_engine) as db:
+        run_scheduled_scan(db)
+
+    with pg_engine.connect() as conn:
+        assert conn.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {'key': SCAN_LOCK_KEY}).scalar()